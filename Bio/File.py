@@ -24,6 +24,7 @@ import os
 import sys
 import contextlib
 import itertools
+from array import array
 
 from Bio._py3k import basestring
 
@@ -45,6 +46,13 @@ except ImportError:
 
 __docformat__ = "restructuredtext en"
 
+try:
+    array("Q")
+    _OFFSET_TYPECODE = "Q"
+except ValueError:
+    # Python 2 arrays lack unsigned long long, use unsigned long
+    _OFFSET_TYPECODE = "L"
+
 
 @contextlib.contextmanager
 def as_handle(handleish, mode='r', **kwargs):
@@ -93,11 +101,16 @@ def as_handle(handleish, mode='r', **kwargs):
         yield handleish
 
 
-def _open_for_random_access(filename):
+def _open_for_random_access(filename, use_mmap=False):
     """Open a file in binary mode, spot if it is BGZF format etc (PRIVATE).
 
     This functionality is used by the Bio.SeqIO and Bio.SearchIO index
     and index_db functions.
+
+    If use_mmap is true, an uncompressed file is memory mapped (read only)
+    and the mmap object returned in place of the handle. This offers the
+    same seek, tell, read and readline methods but without a system call
+    for each one. BGZF and empty files are opened as usual.
     """
     handle = open(filename, "rb")
     from . import bgzf
@@ -107,6 +120,16 @@ def _open_for_random_access(filename):
         assert "BGZF" in str(e)
         # Not a BGZF file after all, rewind to start:
         handle.seek(0)
+    if use_mmap:
+        import mmap
+        try:
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Cannot mmap an empty file
+            return handle
+        # The mmap object keeps its own file descriptor
+        handle.close()
+        return mapped
     return handle
 
 
@@ -424,6 +447,159 @@ class _IndexedSeqFileDict(_dict_base):
         self._proxy._handle.close()
 
 
+def _scan_offsets(args):
+    """Return a list of (key, offset, length) tuples for one file (PRIVATE).
+
+    Used by worker processes when building an SQLite index in parallel,
+    the argument is a tuple of the proxy factory, format and filename.
+    """
+    proxy_factory, format, filename = args
+    random_access_proxy = proxy_factory(format, filename)
+    try:
+        return list(random_access_proxy)
+    finally:
+        random_access_proxy._handle.close()
+
+
+class _CompactOffsetTable(object):
+    """Read only mapping of string keys to file offsets, using arrays (PRIVATE).
+
+    Instead of a Python dictionary (with a string and an integer object per
+    entry), all the keys are held in a single bytes string (encoded as UTF-8
+    on Python 3), with the key end positions and record offsets in arrays.
+    Lookups use an open addressing hash table holding record numbers, also
+    in an array. Iteration gives the keys in the order they were added.
+
+    As with the dictionary backend, the record lengths are not stored.
+    """
+
+    def __init__(self, offset_iter):
+        """Build the table from an iterator of (key, offset, length) tuples.
+
+        Raises a ValueError for duplicate keys or non-string keys.
+        """
+        blob = bytearray()
+        ends = array(_OFFSET_TYPECODE)
+        offsets = array(_OFFSET_TYPECODE)
+        for key, offset, length in offset_iter:
+            blob.extend(self._encode(key))
+            ends.append(len(blob))
+            offsets.append(offset)
+        self._keys = bytes(blob)
+        del blob
+        self._ends = ends
+        self.offsets = offsets
+        # Hash table of record numbers, at most half full, -1 for empty
+        size = 8
+        while size < 2 * len(offsets):
+            size *= 2
+        self._mask = mask = size - 1
+        self._slots = slots = array("i" if size < 2 ** 31 else "l",
+                                    [-1]) * size
+        start = 0
+        for i, end in enumerate(ends):
+            key = self._keys[start:end]
+            j = hash(key) & mask
+            while slots[j] != -1:
+                if self._key(slots[j]) == key:
+                    raise ValueError("Duplicate key '%s'" % self._decode(key))
+                j = (j + 1) & mask
+            slots[j] = i
+            start = end
+
+    if sys.version_info[0] >= 3:
+        @staticmethod
+        def _encode(key):
+            if not isinstance(key, str):
+                raise ValueError("Compact index requires string keys, "
+                                 "not %r" % (key,))
+            return key.encode("utf-8")
+
+        @staticmethod
+        def _decode(key):
+            return key.decode("utf-8")
+    else:
+        @staticmethod
+        def _encode(key):
+            if not isinstance(key, basestring):
+                raise ValueError("Compact index requires string keys, "
+                                 "not %r" % (key,))
+            return key if isinstance(key, str) else key.encode("utf-8")
+
+        @staticmethod
+        def _decode(key):
+            return key
+
+    def _key(self, index):
+        """Return the encoded key for the given record number (PRIVATE)."""
+        start = self._ends[index - 1] if index else 0
+        return self._keys[start:self._ends[index]]
+
+    def index(self, key):
+        """Return the record number for the key, or -1 if not present."""
+        try:
+            key = self._encode(key)
+        except ValueError:
+            return -1
+        slots = self._slots
+        mask = self._mask
+        j = hash(key) & mask
+        while slots[j] != -1:
+            if self._key(slots[j]) == key:
+                return slots[j]
+            j = (j + 1) & mask
+        return -1
+
+    def __getitem__(self, key):
+        """Return the offset of the record with the given key."""
+        index = self.index(key)
+        if index == -1:
+            raise KeyError(key)
+        return self.offsets[index]
+
+    def __contains__(self, key):
+        return self.index(key) != -1
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __iter__(self):
+        """Iterate over the keys in the order they were added."""
+        keys = self._keys
+        decode = self._decode
+        start = 0
+        for end in self._ends:
+            yield decode(keys[start:end])
+            start = end
+
+
+class _CompactIndexedSeqFileDict(_IndexedSeqFileDict):
+    """Read only dictionary interface to a sequential record file, compact version.
+
+    As _IndexedSeqFileDict, but holds the keys and offsets in a
+    _CompactOffsetTable rather than a dictionary. For millions of short
+    records this takes several times less memory. The keys (including any
+    produced by a key_function) must be strings.
+    """
+    def __init__(self, random_access_proxy, key_function,
+                 repr, obj_repr):
+        # Use key_function=None for default value
+        self._proxy = random_access_proxy
+        self._key_function = key_function
+        self._repr = repr
+        self._obj_repr = obj_repr
+        if key_function:
+            offset_iter = (
+                (key_function(k), o, l) for (k, o, l) in random_access_proxy)
+        else:
+            offset_iter = random_access_proxy
+        try:
+            self._offsets = _CompactOffsetTable(offset_iter)
+        except ValueError:
+            self._proxy._handle.close()
+            raise
+
+
 class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
     """Read only dictionary interface to many sequential record files.
 
@@ -437,10 +613,15 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
     There are OS limits on the number of files that can be open at once,
     so a pool are kept. If a record is required from a closed file, then
     one of the open handles is closed first.
+
+    When building a new index from many files, workers greater than one
+    will scan the files in parallel using a pool of processes (in which
+    case the proxy_factory must be picklable). The offsets are sent back
+    to this process, which is the only one writing to the database.
     """
     def __init__(self, index_filename, filenames,
                  proxy_factory, format,
-                 key_function, repr, max_open=10):
+                 key_function, repr, max_open=10, workers=1):
         """Loads or creates an SQLite based index."""
         # TODO? - Don't keep filename list in memory (just in DB)?
         # Should save a chunk of memory if dealing with 1000s of files.
@@ -464,6 +645,9 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
         self._repr = repr
         self._max_open = max_open
         self._proxies = {}
+        if workers < 1:
+            raise ValueError("Use workers with a minimum of 1")
+        self._workers = workers
 
         # Note if using SQLite :memory: trick index filename, this will
         # give $PWD as the relative path (which is fine).
@@ -567,6 +751,7 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
         proxy_factory = self._proxy_factory
         max_open = self._max_open
         random_access_proxies = self._proxies
+        workers = min(self._workers, len(filenames or []))
 
         if not format or not filenames:
             raise ValueError("Filenames to index and format required to build %r" % index_filename)
@@ -594,7 +779,6 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
         con.execute(
             "CREATE TABLE file_data (file_number INTEGER, name TEXT);")
         con.execute("CREATE TABLE offset_data (key TEXT, file_number INTEGER, offset INTEGER, length INTEGER);")
-        count = 0
         for i, filename in enumerate(filenames):
             # Default to storing as an absolute path,
             f = os.path.abspath(filename)
@@ -614,28 +798,30 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
             con.execute(
                 "INSERT INTO file_data (file_number, name) VALUES (?,?);",
                 (i, f))
-            random_access_proxy = proxy_factory(format, filename)
-            if key_function:
-                offset_iter = ((key_function(k), i, o, l)
-                               for (k, o, l) in random_access_proxy)
-            else:
-                offset_iter = ((k, i, o, l)
-                               for (k, o, l) in random_access_proxy)
-            while True:
-                batch = list(itertools.islice(offset_iter, 100))
-                if not batch:
-                    break
-                # print("Inserting batch of %i offsets, %s ... %s"
-                #       % (len(batch), batch[0][0], batch[-1][0]))
-                con.executemany(
-                    "INSERT INTO offset_data (key,file_number,offset,length) VALUES (?,?,?,?);",
-                    batch)
-                con.commit()
-                count += len(batch)
-            if len(random_access_proxies) < max_open:
-                random_access_proxies[i] = random_access_proxy
-            else:
-                random_access_proxy._handle.close()
+        count = 0
+        if workers > 1:
+            # Scan the files in other processes, but only this process
+            # writes to the database (all in one transaction)
+            import multiprocessing
+            pool = multiprocessing.Pool(workers)
+            try:
+                offsets = pool.imap(_scan_offsets,
+                                    [(proxy_factory, format, filename)
+                                     for filename in filenames])
+                for i, file_offsets in enumerate(offsets):
+                    count += self._insert_offsets(con, i, file_offsets)
+            finally:
+                pool.terminate()
+                pool.join()
+        else:
+            for i, filename in enumerate(filenames):
+                random_access_proxy = proxy_factory(format, filename)
+                count += self._insert_offsets(con, i, random_access_proxy)
+                if len(random_access_proxies) < max_open:
+                    random_access_proxies[i] = random_access_proxy
+                else:
+                    random_access_proxy._handle.close()
+        con.commit()
         self._length = count
         # print("About to index %i entries" % count)
         try:
@@ -652,6 +838,31 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
         con.commit()
         # print("Index created")
 
+    def _insert_offsets(self, con, file_number, offsets):
+        """Add (key, offset, length) tuples for one file to the index (PRIVATE).
+
+        Returns the number of entries added. This does not commit.
+        """
+        key_function = self._key_function
+        if key_function:
+            offset_iter = ((key_function(k), file_number, o, l)
+                           for (k, o, l) in offsets)
+        else:
+            offset_iter = ((k, file_number, o, l)
+                           for (k, o, l) in offsets)
+        count = 0
+        while True:
+            batch = list(itertools.islice(offset_iter, 1000))
+            if not batch:
+                break
+            # print("Inserting batch of %i offsets, %s ... %s"
+            #       % (len(batch), batch[0][0], batch[-1][0]))
+            con.executemany(
+                "INSERT INTO offset_data (key,file_number,offset,length) VALUES (?,?,?,?);",
+                batch)
+            count += len(batch)
+        return count
+
     def __repr__(self):
         return self._repr
 
@@ -55,9 +55,13 @@ class Atom(object):
         # the atomic data
         self.name = name  # eg. CA, spaces are removed from atom name
         self.fullname = fullname  # e.g. " CA ", spaces included
-        self.coord = coord
-        self.bfactor = bfactor
-        self.occupancy = occupancy
+        # Set if the coordinates, B factor and occupancy are held in an
+        # AtomArray (see the get_atom_array method of the Structure)
+        self._atom_array = None
+        self._index = None
+        self._coord = coord
+        self._bfactor = bfactor
+        self._occupancy = occupancy
         self.altloc = altloc
         self.full_id = None  # (structure id, model id, chain id, residue id, atom id)
         self.id = name  # id of atom is the atom name (e.g. "CA")
@@ -108,6 +112,66 @@ class Atom(object):
         else:
             return float('NaN')
 
+    # Coordinates, B factor and occupancy are properties, as they may
+    # be stored in an AtomArray instead of in the Atom itself.
+
+    def _get_coord(self):
+        if self._atom_array is None:
+            return self._coord
+        # A copy, so later changes to the AtomArray (e.g. by the transform
+        # method of the Structure) don't alter coordinates already taken
+        return self._atom_array.coord[self._index].copy()
+
+    def _set_coord(self, coord):
+        if self._atom_array is None:
+            self._coord = coord
+        else:
+            self._atom_array.coord[self._index] = coord
+
+    coord = property(_get_coord, _set_coord,
+                     doc="Atomic coordinates (x, y, z) as a NumPy array "
+                         "(a copy if held in an AtomArray, so assign a new "
+                         "array to change them).")
+
+    def _get_bfactor(self):
+        if self._atom_array is None:
+            return self._bfactor
+        return self._atom_array.bfactor[self._index]
+
+    def _set_bfactor(self, bfactor):
+        if self._atom_array is None:
+            self._bfactor = bfactor
+        else:
+            self._atom_array.bfactor[self._index] = bfactor
+
+    bfactor = property(_get_bfactor, _set_bfactor,
+                       doc="Isotropic B factor.")
+
+    def _get_occupancy(self):
+        if self._atom_array is None:
+            return self._occupancy
+        return self._atom_array._get_occupancy(self._index)
+
+    def _set_occupancy(self, occupancy):
+        if self._atom_array is None:
+            self._occupancy = occupancy
+        elif occupancy is None:
+            self._atom_array.occupancy[self._index] = numpy.nan
+        else:
+            self._atom_array.occupancy[self._index] = occupancy
+
+    occupancy = property(_get_occupancy, _set_occupancy,
+                         doc="Occupancy (or None if missing).")
+
+    def _set_atom_array(self, atom_array, index):
+        """Use the given row of an AtomArray to hold the atom's data (PRIVATE).
+
+        The AtomArray must already hold the values for this atom.
+        """
+        self._atom_array = atom_array
+        self._index = index
+        self._coord = self._bfactor = self._occupancy = None
+
     # Special methods
 
     def __repr__(self):
@@ -287,6 +351,10 @@ class Atom(object):
         # Do a shallow copy then explicitly copy what needs to be deeper.
         shallow = copy.copy(self)
         shallow.detach_parent()
+        # The copy has its own data, not shared with any AtomArray
+        shallow._atom_array = None
+        shallow.set_bfactor(self.get_bfactor())
+        shallow.set_occupancy(self.get_occupancy())
         shallow.set_coord(copy.copy(self.get_coord()))
         shallow.xtra = self.xtra.copy()
         return shallow
@@ -327,6 +395,8 @@ class DisorderedAtom(DisorderedEntityWrapper):
         altloc = atom.get_altloc()
         occupancy = atom.get_occupancy()
         self[altloc] = atom
+        if residue is not None:
+            residue._atom_array_changed()
         if occupancy > self.last_occupancy:
             self.last_occupancy = occupancy
             self.disordered_select(altloc)
@@ -0,0 +1,205 @@
+# Copyright 2016 by Biopython contributors.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Contiguous coordinate, B factor and occupancy arrays for Bio.PDB atoms.
+
+Normally every Atom object holds its own small NumPy array of coordinates,
+which means operations on a whole structure (like rotating it) have to loop
+over the atoms in Python. An AtomArray instead holds the coordinates of all
+the atoms in a structure as a single N x 3 array, with matching arrays of
+the B factors and occupancies. The Atom objects are then backed by these
+arrays, so changes made via either route are seen by both. Note atom.coord
+(and the get_coord method of the atom) gives a copy of its row in the
+coordinate array, while the get_coord_array method of an Entity gives a
+view. The AtomArray always holds the coordinates as float64, even if the
+atoms had float32 coordinates (as from the parsers).
+
+You would not normally create an AtomArray directly, instead use the
+get_atom_array or get_coord_array methods of a Structure (or Model, Chain
+or Residue):
+
+>>> from Bio.PDB import PDBParser
+>>> structure = PDBParser().get_structure("1A8O", "PDB/1A8O.pdb")
+>>> atom_array = structure.get_atom_array()
+>>> len(atom_array)
+644
+>>> atom_array.coord.shape
+(644, 3)
+
+Row i of the arrays corresponds to atom_array.atoms[i]. The atoms are in
+the same order as the get_atoms method of the Structure, except that all
+the alternative locations of disordered atoms (and all the residues of a
+disordered residue) are included.
+"""
+
+import numpy
+
+from Bio.PDB.Entity import DisorderedEntityWrapper
+
+__docformat__ = "restructuredtext en"
+
+
+def _collect_atoms(entity, atoms, ranges):
+    """Add the atoms of the entity to the list, recording its range (PRIVATE).
+
+    Disordered atoms and residues are unpacked, and the start and end row
+    of each Entity are recorded in the ranges dictionary (keyed on id).
+    """
+    start = len(atoms)
+    if entity.level == "R":
+        for atom in entity.child_list:
+            if isinstance(atom, DisorderedEntityWrapper):
+                atoms.extend(atom.disordered_get_list())
+            else:
+                atoms.append(atom)
+    else:
+        for child in entity.child_list:
+            if isinstance(child, DisorderedEntityWrapper):
+                for residue in child.disordered_get_list():
+                    _collect_atoms(residue, atoms, ranges)
+            else:
+                _collect_atoms(child, atoms, ranges)
+    ranges[id(entity)] = (entity, start, len(atoms))
+
+
+class AtomArray(object):
+    """Contiguous arrays holding the data for all the atoms in an Entity.
+
+    Attributes:
+
+     - atoms - list of the Atom objects, in row order
+     - coord - N x 3 array of the atomic coordinates (float64)
+     - bfactor - array of the N isotropic B factors
+     - occupancy - array of the N occupancies, with NaN for missing values
+
+    You may modify the values in these arrays (e.g. atom_array.coord[:] =
+    new_coord) but should not replace the arrays themselves.
+
+    The AtomArray is only valid while the atoms in the Entity are unchanged.
+    Adding or removing children with the add, insert and detach_child methods
+    marks it as out of date, and a new one is created the next time you call
+    the get_atom_array method of the Entity.
+    """
+
+    def __init__(self, entity, coord=None, bfactor=None, occupancy=None):
+        """Create an AtomArray from the atoms in an Entity.
+
+        Arguments:
+
+         - entity - Structure, Model, Chain or Residue object
+         - coord - optional N x 3 array of coordinates to use, otherwise
+           taken from the atoms
+         - bfactor - optional array of B factors, otherwise taken from the
+           atoms
+         - occupancy - optional array of occupancies (NaN for missing),
+           otherwise taken from the atoms
+
+        Each atom is then bound to its row in the arrays.
+        """
+        atoms = []
+        self._ranges = {}
+        self._stale = False
+        _collect_atoms(entity, atoms, self._ranges)
+        if coord is None:
+            coord = [atom.coord for atom in atoms]
+        if bfactor is None:
+            bfactor = [atom.bfactor for atom in atoms]
+        if occupancy is None:
+            occupancy = [atom.occupancy for atom in atoms]
+            occupancy = [numpy.nan if o is None else o for o in occupancy]
+        self.atoms = atoms
+        self.coord = numpy.array(coord, "d").reshape((len(atoms), 3))
+        self.bfactor = numpy.array(bfactor, "d").reshape(len(atoms))
+        self.occupancy = numpy.array(occupancy, "d").reshape(len(atoms))
+        for index, atom in enumerate(atoms):
+            atom._set_atom_array(self, index)
+
+    def __len__(self):
+        """Return the number of atoms."""
+        return len(self.atoms)
+
+    def __repr__(self):
+        """Return a short summary of the AtomArray."""
+        return "<AtomArray with %i atoms>" % len(self)
+
+    def get_range(self, entity):
+        """Return the (start, end) rows holding the atoms of an Entity.
+
+        The atoms of a Residue, Chain or Model are always consecutive
+        rows in the arrays. Raises a KeyError if the entity is not part
+        of this AtomArray.
+        """
+        try:
+            value = self._ranges[id(entity)]
+        except KeyError:
+            raise KeyError("%r is not in this AtomArray" % entity)
+        if value[0] is not entity:
+            raise KeyError("%r is not in this AtomArray" % entity)
+        return value[1], value[2]
+
+    def mask(self, select, start=0, end=None):
+        """Return a boolean array marking the atoms accepted by select.
+
+        Arguments:
+
+         - select - either a function taking an Atom and returning True
+           or False, or a Bio.PDB.PDBIO.Select style object (in which case
+           the atom, its residue, chain and model must all be accepted)
+         - start, end - optional range of rows to consider
+
+        For simple criteria you can compare the arrays directly instead,
+        e.g. atom_array.bfactor > 50.0 is also a valid mask.
+        """
+        atoms = self.atoms[start:end]
+        if hasattr(select, "accept_atom"):
+            cache = {}
+
+            def accept_parent(entity, method):
+                try:
+                    return cache[id(entity)]
+                except KeyError:
+                    pass
+                parent = entity.get_parent()
+                if parent is None:
+                    answer = bool(method(entity))
+                elif entity.level == "R":
+                    answer = bool(accept_parent(parent, select.accept_chain) and
+                                  method(entity))
+                elif entity.level == "C":
+                    answer = bool(accept_parent(parent, select.accept_model) and
+                                  method(entity))
+                else:
+                    answer = bool(method(entity))
+                cache[id(entity)] = answer
+                return answer
+
+            def accept(atom):
+                return (accept_parent(atom.get_parent(), select.accept_residue) and
+                        select.accept_atom(atom))
+        else:
+            accept = select
+        return numpy.fromiter((bool(accept(atom)) for atom in atoms),
+                              dtype=bool, count=len(atoms))
+
+    def release(self):
+        """Detach the atoms, giving them back their own copies of the data.
+
+        After this the atoms no longer share memory with these arrays.
+        """
+        for index, atom in enumerate(self.atoms):
+            if atom._atom_array is self:
+                atom._atom_array = None
+                atom._coord = self.coord[index].copy()
+                atom._bfactor = self.bfactor[index]
+                atom._occupancy = self._get_occupancy(index)
+        self._stale = True
+
+    def _get_occupancy(self, index):
+        """Return the occupancy of the given row, or None if missing (PRIVATE)."""
+        occupancy = self.occupancy[index]
+        if occupancy != occupancy:
+            # NaN, meaning missing
+            return None
+        return occupancy
@@ -0,0 +1,308 @@
+# Copyright 2016 by Biopython contributors.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Grid based neighbor search, with optional periodic boundaries.
+
+The space around the atoms is divided into cubic cells with edges at least
+as long as the search radius, so the neighbors of a point can only be in its
+own cell or the 26 cells around it. All the queries are done with NumPy on
+whole arrays of points at once, so unlike Bio.PDB.NeighborSearch (which
+needs the compiled Bio.KDTree module) there is no Python loop over the
+points or the pairs found, and no compiled code is needed.
+
+The CellList works on an N x 3 array of coordinates, for example from the
+get_coord_array method of a Structure:
+
+>>> from Bio.PDB import PDBParser
+>>> from Bio.PDB.CellList import CellList
+>>> structure = PDBParser().get_structure("1A8O", "PDB/1A8O.pdb")
+>>> coord = structure.get_coord_array()
+>>> cells = CellList(coord, 5.0)
+>>> indptr, indices = cells.search(coord[:3])
+>>> print(indptr)
+[ 0 13 30 50]
+>>> pairs = cells.search_all(2.0)
+>>> pairs.shape
+(565, 2)
+
+The search method returns the neighbors of many points in compressed sparse
+row (CSR) form: the neighbors of point i are indices[indptr[i]:indptr[i+1]],
+in ascending order. For a simulation box, give the edge lengths of the
+(rectangular) box and the minimum image convention is used throughout.
+
+The contact_map function uses a CellList to find which residues (or chains
+etc) of a list of atoms are in contact:
+
+>>> from Bio.PDB.CellList import contact_map
+>>> atoms = list(structure.get_atoms())
+>>> residues, contacts = contact_map(atoms, 4.0)
+>>> contacts.shape
+(158, 158)
+"""
+
+import numpy
+
+from Bio.PDB.PDBExceptions import PDBException
+from Bio.PDB.Selection import entity_levels
+
+__docformat__ = "restructuredtext en"
+
+
+def _ranges(starts, counts):
+    """Return the positions in many ranges, concatenated (PRIVATE).
+
+    Equivalent to concatenating numpy.arange(s, s + c) for each start s and
+    count c, but without a Python loop.
+    """
+    total = counts.sum()
+    offsets = numpy.cumsum(counts) - counts
+    return (numpy.arange(total) - numpy.repeat(offsets, counts) +
+            numpy.repeat(starts, counts))
+
+
+class CellList(object):
+    """Find points within a radius of each other using a grid of cells.
+
+    Attributes:
+
+     - coord - N x 3 array of the coordinates (float64), wrapped into the
+       box if periodic
+     - cutoff - the largest radius which can be searched
+     - box - array of the three edge lengths of the periodic box, or None
+    """
+
+    def __init__(self, coord, cutoff, box=None, block_size=4096):
+        """Create the grid of cells.
+
+        Arguments:
+
+         - coord - N x 3 array of coordinates
+         - cutoff - float, the largest radius you will search with (which
+           sets the size of the cells)
+         - box - optional sequence of three edge lengths for a rectangular
+           box with periodic boundary conditions (the cutoff may be no more
+           than half the shortest edge)
+         - block_size - number of query points handled at once, which
+           limits the memory used for large searches
+        """
+        coord = numpy.array(coord, "d")
+        if len(coord.shape) != 2 or coord.shape[1] != 3:
+            raise ValueError("Expected an N x 3 array of coordinates")
+        if cutoff <= 0:
+            raise ValueError("The cutoff should be positive")
+        if block_size < 1:
+            raise ValueError("The block size should be at least one")
+        self.cutoff = float(cutoff)
+        self._block_size = int(block_size)
+        if box is None:
+            self.box = None
+            if len(coord):
+                self._origin = coord.min(axis=0)
+                extent = coord.max(axis=0) - self._origin
+            else:
+                self._origin = numpy.zeros(3)
+                extent = numpy.zeros(3)
+            self._shape = numpy.floor(extent / self.cutoff).astype(int) + 1
+            self._cell_size = numpy.array([self.cutoff] * 3)
+        else:
+            box = numpy.array(box, "d")
+            if box.shape != (3,) or (box <= 0).any():
+                raise ValueError("Expected three positive box edge lengths")
+            if self.cutoff > 0.5 * box.min():
+                raise ValueError("The cutoff should be no more than half the "
+                                 "shortest box edge")
+            self.box = box
+            coord = coord - box * numpy.floor(coord / box)
+            self._origin = numpy.zeros(3)
+            self._shape = numpy.floor(box / self.cutoff).astype(int)
+            self._cell_size = box / self._shape
+        # The offsets of the neighboring cells, without repeats where a
+        # periodic box is only one or two cells across
+        axes = []
+        for size in self._shape:
+            if box is not None and size < 3:
+                axes.append(numpy.arange(size))
+            else:
+                axes.append(numpy.array([-1, 0, 1]))
+        self._offsets = numpy.array(numpy.meshgrid(*axes, indexing="ij"))
+        self._offsets = self._offsets.reshape((3, -1)).T
+        self.coord = coord
+        # Sort the points by cell, so each cell is a slice of the order
+        keys = self._cell_keys(self._cells(coord))
+        self._order = numpy.argsort(keys, kind="mergesort")
+        self._keys = keys[self._order]
+
+    def __len__(self):
+        """Return the number of points."""
+        return len(self.coord)
+
+    def __repr__(self):
+        """Return a short summary of the grid."""
+        return "<CellList of %i points in %i x %i x %i cells>" \
+            % ((len(self.coord),) + tuple(self._shape))
+
+    # Private methods
+
+    def _cells(self, coord):
+        """Return the integer cell position of each point (PRIVATE)."""
+        cells = numpy.floor((coord - self._origin) / self._cell_size)
+        cells = cells.astype(int)
+        if self.box is not None:
+            # Rounding may put points on the upper edge of the box
+            cells %= self._shape
+        return cells
+
+    def _cell_keys(self, cells):
+        """Return a single integer for each cell position (PRIVATE)."""
+        return (cells[:, 0] * self._shape[1] + cells[:, 1]) \
+            * self._shape[2] + cells[:, 2]
+
+    def _delta(self, a, b):
+        """Return the vectors from b to a, using the minimum image (PRIVATE)."""
+        delta = a - b
+        if self.box is not None:
+            delta -= self.box * numpy.round(delta / self.box)
+        return delta
+
+    def _query(self, centers, radius, start, pairs):
+        """Find the points within radius of a block of centers (PRIVATE).
+
+        Returns arrays of the center number (counting from start) and the
+        point index of each hit, sorted by center and then point. If pairs
+        is true, only points with a higher index than the center (where the
+        centers are the points themselves) are returned.
+        """
+        cells = self._cells(centers)
+        query = []
+        candidates = []
+        for offset in self._offsets:
+            neighbors = cells + offset
+            if self.box is None:
+                valid = ((neighbors >= 0) & (neighbors < self._shape)).all(axis=1)
+            else:
+                neighbors %= self._shape
+                valid = numpy.ones(len(neighbors), bool)
+            keys = self._cell_keys(neighbors)
+            lower = numpy.searchsorted(self._keys, keys, "left")
+            upper = numpy.searchsorted(self._keys, keys, "right")
+            counts = numpy.where(valid, upper - lower, 0)
+            query.append(numpy.repeat(numpy.arange(len(centers)), counts))
+            candidates.append(self._order[_ranges(lower, counts)])
+        query = numpy.concatenate(query)
+        candidates = numpy.concatenate(candidates)
+        if pairs:
+            keep = candidates > query + start
+            query = query[keep]
+            candidates = candidates[keep]
+        delta = self._delta(self.coord[candidates], centers[query])
+        keep = (delta * delta).sum(axis=1) <= radius * radius
+        query = query[keep]
+        candidates = candidates[keep]
+        order = numpy.lexsort((candidates, query))
+        return query[order] + start, candidates[order]
+
+    def _check_radius(self, radius):
+        """Return the radius to use, checking it against the cutoff (PRIVATE)."""
+        if radius is None:
+            return self.cutoff
+        if radius > self.cutoff:
+            raise ValueError("The radius %r is larger than the cutoff %r"
+                             % (radius, self.cutoff))
+        return radius
+
+    # Public methods
+
+    def search(self, centers, radius=None):
+        """Find the points within radius of each of many centers.
+
+        Arguments:
+
+         - centers - M x 3 array of query positions (or a single position)
+         - radius - float, no more than the cutoff (DEFAULT)
+
+        Returns the neighbors in compressed sparse row form, as arrays
+        indptr (length M + 1) and indices, so the neighbors of center i are
+        indices[indptr[i]:indptr[i + 1]] (in ascending order).
+        """
+        radius = self._check_radius(radius)
+        centers = numpy.array(centers, "d").reshape((-1, 3))
+        query = []
+        indices = []
+        for start in range(0, len(centers), self._block_size):
+            block = centers[start:start + self._block_size]
+            q, i = self._query(block, radius, start, False)
+            query.append(q)
+            indices.append(i)
+        if indices:
+            query = numpy.concatenate(query)
+            indices = numpy.concatenate(indices)
+        else:
+            query = indices = numpy.zeros(0, int)
+        indptr = numpy.zeros(len(centers) + 1, int)
+        numpy.cumsum(numpy.bincount(query, minlength=len(centers)),
+                     out=indptr[1:])
+        return indptr, indices
+
+    def search_all(self, radius=None):
+        """Find all pairs of points within radius of each other.
+
+        Arguments:
+
+         - radius - float, no more than the cutoff (DEFAULT)
+
+        Returns a P x 2 array of point indices, each pair (i, j) once with
+        i < j, sorted by i and then j.
+        """
+        radius = self._check_radius(radius)
+        pairs = [numpy.zeros((0, 2), int)]
+        for start in range(0, len(self.coord), self._block_size):
+            block = self.coord[start:start + self._block_size]
+            pairs.append(numpy.array(self._query(block, radius, start, True)).T)
+        return numpy.concatenate(pairs)
+
+    def distances(self, pairs):
+        """Return the distances between pairs of points (e.g. from search_all)."""
+        pairs = numpy.asarray(pairs, int).reshape((-1, 2))
+        delta = self._delta(self.coord[pairs[:, 0]], self.coord[pairs[:, 1]])
+        return numpy.sqrt((delta * delta).sum(axis=1))
+
+
+def contact_map(atom_list, radius, level="R", box=None):
+    """Find the entities which have atoms within radius of each other.
+
+    Arguments:
+
+     - atom_list - list of atoms
+     - radius - float
+     - level - char (A, R, C, M, S), which entities to compare, by default
+       residues
+     - box - optional edge lengths of a periodic box (see CellList)
+
+    Returns a list of the entities at the given level (in the order of their
+    first atoms in the list), and a square boolean array where element
+    [i, j] is true if entities i and j are different and have at least one
+    pair of atoms within radius.
+    """
+    if level not in entity_levels:
+        raise PDBException("%s: Unknown level" % level)
+    entities = []
+    groups = numpy.zeros(len(atom_list), int)
+    seen = {}
+    for i, atom in enumerate(atom_list):
+        entity = atom
+        while entity.level != level:
+            entity = entity.get_parent()
+        try:
+            groups[i] = seen[id(entity)]
+        except KeyError:
+            groups[i] = seen[id(entity)] = len(entities)
+            entities.append(entity)
+    coord = numpy.array([atom.get_coord() for atom in atom_list], "d")
+    pairs = CellList(coord.reshape((-1, 3)), radius, box).search_all()
+    contacts = numpy.zeros((len(entities), len(entities)), bool)
+    contacts[groups[pairs[:, 0]], groups[pairs[:, 1]]] = True
+    contacts |= contacts.T
+    contacts[numpy.diag_indices(len(entities))] = False
+    return entities, contacts
@@ -11,6 +11,8 @@ It is a simple container class, with list and dictionary like properties.
 
 from copy import copy
 
+import numpy
+
 from Bio.PDB.PDBExceptions import PDBConstructionException
 
 __docformat__ = "restructuredtext en"
@@ -29,6 +31,8 @@ class Entity(object):
         self.child_dict = {}
         # Dictionary that keeps additional properties
         self.xtra = {}
+        # Optional AtomArray holding the atomic coordinates etc
+        self._atom_array = None
 
     # Special methods
 
@@ -80,6 +84,7 @@ class Entity(object):
         child.detach_parent()
         del self.child_dict[id]
         self.child_list.remove(child)
+        self._atom_array_changed()
 
     def add(self, entity):
         "Add a child to the Entity."
@@ -90,6 +95,7 @@ class Entity(object):
         entity.set_parent(self)
         self.child_list.append(entity)
         self.child_dict[entity_id] = entity
+        self._atom_array_changed()
 
     def insert(self, pos, entity):
         "Add a child to the Entity at a specified position."
@@ -100,6 +106,7 @@ class Entity(object):
         entity.set_parent(self)
         self.child_list[pos:pos] = [entity]
         self.child_dict[entity_id] = entity
+        self._atom_array_changed()
 
     def get_iterator(self):
         "Return iterator over children."
@@ -154,7 +161,7 @@ class Entity(object):
             self.full_id = tuple(l)
         return self.full_id
 
-    def transform(self, rot, tran):
+    def transform(self, rot, tran, mask=None):
         """
         Apply rotation and translation to the atomic coordinates.
 
@@ -163,14 +170,134 @@ class Entity(object):
                 >>> translation=array((0, 0, 1), 'f')
                 >>> entity.transform(rotation, translation)
 
+        This includes all the alternative locations of any disordered atoms
+        and all the residues of disordered residues. For the top level
+        Entity (normally the Structure), or if the structure already has an
+        AtomArray, it is done as a single NumPy operation on the coordinate
+        array of the AtomArray (which is created if needed, changing the
+        coordinates to float64, see get_atom_array). Otherwise just the
+        atoms of this Entity are transformed one by one, as for the
+        transform method of the Atom.
+
         @param rot: A right multiplying rotation matrix
         @type rot: 3x3 Numeric array
 
         @param tran: the translation vector
         @type tran: size 3 Numeric array
+
+        @param mask: optional boolean array selecting the atoms to move,
+        in the same order as get_coord_array
+        @type mask: Numeric array
+        """
+        root = self._get_root()
+        atom_array = root._atom_array
+        if self is root or (atom_array is not None and not atom_array._stale):
+            coord = self.get_coord_array()
+            if mask is None:
+                coord[:] = numpy.dot(coord, rot) + tran
+            else:
+                coord[mask] = numpy.dot(coord[mask], rot) + tran
+            return
+        # Avoid a circular import
+        from Bio.PDB.AtomArray import _collect_atoms
+        # Don't make an AtomArray for the whole structure just for this
+        atoms = []
+        _collect_atoms(self, atoms, {})
+        if mask is not None:
+            atoms = [atom for atom, keep in zip(atoms, mask) if keep]
+        for atom in atoms:
+            atom.transform(rot, tran)
+
+    def _get_root(self):
+        """Return the top level Entity, e.g. the Structure (PRIVATE)."""
+        entity = self
+        while entity.parent is not None:
+            entity = entity.parent
+        return entity
+
+    def _atom_array_changed(self):
+        """Mark any AtomArray including this entity as out of date (PRIVATE).
+
+        Called when the children of the entity have changed.
+        """
+        # The AtomArray belongs to the top level Entity (see get_atom_array)
+        atom_array = self._get_root()._atom_array
+        if atom_array is not None:
+            atom_array._stale = True
+
+    def get_atom_array(self):
+        """Return an AtomArray holding all the atoms in the whole structure.
+
+        The AtomArray belongs to the top level Entity (normally the
+        Structure), and is created the first time this is called. After
+        that the Atom objects share its contiguous coordinate, B factor
+        and occupancy arrays (all float64). It is recreated if atoms have
+        since been added or removed.
+        """
+        # Avoid a circular import
+        from Bio.PDB.AtomArray import AtomArray
+        root = self._get_root()
+        atom_array = root._atom_array
+        if atom_array is None or atom_array._stale:
+            atom_array = root._atom_array = AtomArray(root)
+        return atom_array
+
+    def _get_atom_range(self):
+        """Return the AtomArray, and start and end rows for this entity (PRIVATE)."""
+        atom_array = self.get_atom_array()
+        start, end = atom_array.get_range(self)
+        return atom_array, start, end
+
+    def get_coord_array(self, mask=None):
+        """Return the coordinates of all the atoms as an N x 3 array.
+
+        Without a mask this is a view of the rows for this entity in
+        the AtomArray, so changing its values will move the atoms:
+
+        >>> from Bio.PDB import PDBParser
+        >>> structure = PDBParser().get_structure("1A8O", "PDB/1A8O.pdb")
+        >>> coord = structure[0]["A"].get_coord_array()
+        >>> coord.shape
+        (644, 3)
+        >>> coord += 10.0
+
+        The optional mask is a boolean array selecting some of the atoms,
+        e.g. from get_atom_mask or comparing get_bfactor_array to a cutoff,
+        in which case you get a copy of just those coordinates.
+        """
+        atom_array, start, end = self._get_atom_range()
+        if mask is None:
+            return atom_array.coord[start:end]
+        return atom_array.coord[start:end][mask]
+
+    def get_bfactor_array(self, mask=None):
+        """Return the B factors of all the atoms as an array.
+
+        See get_coord_array for details.
+        """
+        atom_array, start, end = self._get_atom_range()
+        if mask is None:
+            return atom_array.bfactor[start:end]
+        return atom_array.bfactor[start:end][mask]
+
+    def get_occupancy_array(self, mask=None):
+        """Return the occupancies of all the atoms as an array (NaN if missing).
+
+        See get_coord_array for details.
+        """
+        atom_array, start, end = self._get_atom_range()
+        if mask is None:
+            return atom_array.occupancy[start:end]
+        return atom_array.occupancy[start:end][mask]
+
+    def get_atom_mask(self, select):
+        """Return a boolean array selecting atoms, for use with get_coord_array.
+
+        The select argument is a function taking an Atom and returning
+        True or False, or a Bio.PDB.PDBIO.Select style object.
         """
-        for o in self.get_list():
-            o.transform(rot, tran)
+        atom_array, start, end = self._get_atom_range()
+        return atom_array.mask(select, start, end)
 
     def copy(self):
         shallow = copy(self)
@@ -178,6 +305,7 @@ class Entity(object):
         shallow.child_list = []
         shallow.child_dict = {}
         shallow.xtra = copy(self.xtra)
+        shallow._atom_array = None
 
         shallow.detach_parent()
 
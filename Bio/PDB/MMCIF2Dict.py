@@ -11,6 +11,7 @@ from Bio.File import as_handle
 from Bio._py3k import input as _input
 
 import shlex
+from itertools import chain
 
 __docformat__ = "restructuredtext en"
 
@@ -27,40 +28,69 @@ class MMCIF2Dict(dict):
         with as_handle(filename) as handle:
             loop_flag = False
             key = None
-            tokens = self._tokenize(handle)
-            token = next(tokens)
-            self[token[0:5]] = token[5:]
-            i = 0
-            n = 0
-            for token in tokens:
-                if token == "loop_":
-                    loop_flag = True
-                    keys = []
-                    i = 0
-                    n = 0
-                    continue
-                elif loop_flag:
-                    if token.startswith("_"):
-                        if i > 0:
-                            loop_flag = False
-                        else:
-                            self[token] = []
-                            keys.append(token)
-                            n += 1
-                            continue
-                    else:
-                        self[keys[i % n]].append(token)
-                        i += 1
-                        continue
-                if key is None:
-                    key = token
+            keys = []
+            values = []
+            lines = self._split_lines(handle)
+            for tokens, plain in lines:
+                if tokens:
+                    token = tokens.pop(0)
+                    self[token[0:5]] = token[5:]
+                    break
+            else:
+                tokens = []
+                plain = True
+            for tokens, plain in chain([(tokens, plain)], lines):
+                if loop_flag and plain:
+                    # Values only, no keys (or a new loop) on this line
+                    values.extend(tokens)
                 else:
-                    self[key] = token
-                    key = None
+                    for token in tokens:
+                        if token == "loop_":
+                            self._add_loop(keys, values)
+                            loop_flag = True
+                            keys = []
+                            values = []
+                            continue
+                        elif loop_flag:
+                            if token.startswith("_"):
+                                if values:
+                                    loop_flag = False
+                                    self._add_loop(keys, values)
+                                    keys = []
+                                    values = []
+                                else:
+                                    self[token] = []
+                                    keys.append(token)
+                                    continue
+                            else:
+                                values.append(token)
+                                continue
+                        if key is None:
+                            key = token
+                        else:
+                            self[key] = token
+                            key = None
+            self._add_loop(keys, values)
 
     # Private methods
 
-    def _tokenize(self, handle):
+    def _add_loop(self, keys, values):
+        """Store the values of a loop as a list for each key (PRIVATE).
+
+        The values are given in row order, so each column is a slice.
+        """
+        n = len(keys)
+        for i, key in enumerate(keys):
+            self[key] = values[i::n]
+
+    def _split_lines(self, handle):
+        """Yield the tokens from each line as a list, plus a flag (PRIVATE).
+
+        Semicolon delimited multi-line values are returned as a single
+        token. The flag is True if none of the tokens can be a key or the
+        loop_ keyword (i.e. there is no underscore in the line), which lets
+        the loop values be processed a line at a time.
+        """
         for line in handle:
             if line.startswith("#"):
                 continue
@@ -71,11 +101,17 @@ class MMCIF2Dict(dict):
                     if line == ';':
                         break
                     token += line
-                yield token
+                yield [token], False
+            elif "'" in line or '"' in line or "\\" in line:
+                # Only need the slower shlex for quoted values
+                yield shlex.split(line), "_" not in line
             else:
-                tokens = shlex.split(line)
-                for token in tokens:
-                    yield token
+                yield line.split(), "_" not in line
+
+    def _tokenize(self, handle):
+        for tokens, plain in self._split_lines(handle):
+            for token in tokens:
+                yield token
 
 
 if __name__ == "__main__":
@@ -0,0 +1,156 @@
+# Copyright 2016 by Biopython contributors.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Output of mmCIF files.
+
+The MMCIFIO class writes a Structure (or part of one) as an mmCIF file,
+which unlike the PDB format has no limits on the number of atoms or the
+length of the chain identifiers. It is used like PDBIO:
+
+>>> from Bio.PDB import PDBParser
+>>> from Bio.PDB.MMCIFIO import MMCIFIO
+>>> structure = PDBParser().get_structure("1A8O", "PDB/1A8O.pdb")
+>>> io = MMCIFIO()
+>>> io.set_structure(structure)
+>>> io.save("1A8O_out.cif")
+
+Only the atom_site table is written, as a single loop with a row for each
+atom, which MMCIFParser can read back in. Missing occupancies are written
+as "?", and the label_seq_id of HETATM rows (ligands and waters, which are
+not part of a polymer) as ".", with the residue numbers in auth_seq_id.
+The rows are formatted in bulk from the columns of the structure's
+AtomArray (see Bio.PDB.AtomArray) and written a chain at a time.
+
+The label_atom_id is the atom name without the spaces used to align it in
+PDB files. A residue with two atoms differing only in this alignment (e.g.
+" CA " for an alpha carbon and "CA  " for calcium) is written with the same
+name twice, and MMCIFParser then raises a PDBConstructionException saying
+the atom is defined twice.
+
+>>> import os
+>>> os.remove("1A8O_out.cif")
+"""
+
+import numpy
+
+from Bio._py3k import basestring
+
+from Bio.PDB.PDBIO import PDBIO, Select
+from Bio.PDB.PDBIO import _get_atom_mask, _get_atom_table, _get_missing_occupancy
+
+__docformat__ = "restructuredtext en"
+
+# The columns of the atom_site loop, in order
+_ATOM_SITE_KEYS = ["group_PDB", "id", "type_symbol", "label_atom_id",
+                   "label_alt_id", "label_comp_id", "label_asym_id",
+                   "label_seq_id", "pdbx_PDB_ins_code", "Cartn_x", "Cartn_y",
+                   "Cartn_z", "occupancy", "B_iso_or_equiv", "auth_seq_id",
+                   "auth_asym_id", "pdbx_PDB_model_num"]
+
+_ATOM_SITE_FORMAT_STRING = "%s %i %s %s %s %s %s %s %s %.3f %.3f %.3f %s %.2f %i %s %i\n"
+
+
+def _quote(value, missing="?"):
+    """Return a value ready to write as a single mmCIF token (PRIVATE).
+
+    Blank values become the missing value marker, and values which would not
+    be read back as a single token (e.g. containing spaces or quotes, or
+    looking like a key) are quoted.
+    """
+    value = value.strip()
+    if not value:
+        return missing
+    if value[0] in "_#$'\";[]" or value in ("loop_", "stop_", "global_") \
+            or value.startswith("data_") or value.startswith("save_") \
+            or "'" in value or '"' in value or len(value.split()) != 1:
+        if '"' in value:
+            return "'%s'" % value
+        return '"%s"' % value
+    return value
+
+
+class MMCIFIO(PDBIO):
+    """Write a Structure object (or a subset of a Structure object) as an mmCIF file.
+
+    This is used like PDBIO, with the set_structure and save methods.
+    """
+
+    def __init__(self):
+        """Create the MMCIFIO object."""
+        PDBIO.__init__(self, fast=True)
+
+    def save(self, file, select=Select()):
+        """Save the structure (or the selected part of it) to a file.
+
+        @param file: output file
+        @type file: string or filehandle
+
+        @param select: selects which entities will be written, as for
+        PDBIO, or a boolean array with an entry for each row of the
+        structure's AtomArray (e.g. from its get_atom_mask method).
+        @type select: object
+        """
+        if isinstance(file, basestring):
+            with open(file, "w") as handle:
+                self._save_mmcif(handle, select)
+        else:
+            self._save_mmcif(file, select)
+
+    def _save_mmcif(self, fp, select):
+        """Write the data block with the atom_site loop (PRIVATE)."""
+        structure = self.structure
+        atom_array = structure.get_atom_array()
+        mask = _get_atom_mask(atom_array, select)
+        residue_fields, atom_fields = _get_atom_table(structure, atom_array)
+        coord = atom_array.coord.tolist()
+        bfactor = atom_array.bfactor.tolist()
+        occupancy = ["%.2f" % o for o in atom_array.occupancy.tolist()]
+        for row in _get_missing_occupancy(atom_array, mask):
+            occupancy[row] = "?"
+        # Most atoms share a few names, so quote each distinct one once
+        quoted = {}
+        for fields in set(atom_fields):
+            name, altloc, element = fields
+            quoted[fields] = (_quote(name), _quote(altloc, "."),
+                              _quote(element or ""))
+        # The block name is a single token without quotes
+        block = "_".join(str(structure.id).split()) or "unknown"
+        fp.write("data_%s\n#\nloop_\n" % block)
+        fp.write("".join("_atom_site.%s\n" % key for key in _ATOM_SITE_KEYS))
+        atom_number = 1
+        for index, model in enumerate(structure.get_list()):
+            if hasattr(select, "accept_model") and not select.accept_model(model):
+                continue
+            # Model numbers must be positive for MMCIFParser
+            if model.serial_num > 0:
+                model_num = model.serial_num
+            else:
+                model_num = index + 1
+            for chain in model.get_list():
+                start, end = atom_array.get_range(chain)
+                rows = (numpy.flatnonzero(mask[start:end]) + start).tolist()
+                if not rows:
+                    continue
+                chain_id = _quote(str(chain.get_id()))
+                lines = []
+                for row in rows:
+                    hetfield, resseq, icode, resname, segid = residue_fields[row]
+                    name, altloc, element = quoted[atom_fields[row]]
+                    if hetfield != " ":
+                        # Not part of a polymer, so no label_seq_id
+                        group = "HETATM"
+                        label_seq_id = "."
+                    else:
+                        group = "ATOM"
+                        label_seq_id = str(resseq)
+                    x, y, z = coord[row]
+                    lines.append(_ATOM_SITE_FORMAT_STRING %
+                                 (group, atom_number, element, name, altloc,
+                                  _quote(resname), chain_id, label_seq_id,
+                                  _quote(icode), x, y, z, occupancy[row],
+                                  bfactor[row], resseq, chain_id, model_num))
+                    atom_number += 1
+                fp.write("".join(lines))
+        fp.write("#\n")
@@ -18,10 +18,39 @@ from Bio.PDB.MMCIF2Dict import MMCIF2Dict
 from Bio.PDB.StructureBuilder import StructureBuilder
 from Bio.PDB.PDBExceptions import PDBConstructionException
 from Bio.PDB.PDBExceptions import PDBConstructionWarning
+from Bio.PDB.Trajectory import Trajectory, _FrameStore, _atom_rows, _row_order
 
 __docformat__ = "restructuredtext en"
 
 
+def _float_array(columns):
+    """Convert columns of strings into a 2D NumPy array of floats (PRIVATE).
+
+    Each column (list of strings) becomes a column of the array, with the
+    whole conversion done by NumPy. Raises ValueError for any invalid value.
+    """
+    return numpy.array(columns).astype("d").T
+
+
+def _atom_key(chainid, resseq, icode, resname, fieldname, name, altloc):
+    """Return the identity of an atom from its _atom_site values (PRIVATE).
+
+    This is the chain id, residue id, residue name, full atom name and
+    alternative location, as used by Bio.PDB.Trajectory to match atoms in
+    later models to the topology.
+    """
+    if icode == "?":
+        icode = " "
+    if altloc == ".":
+        altloc = " "
+    if fieldname == "HETATM":
+        # As in the StructureBuilder
+        hetatm_flag = "H_" + resname
+    else:
+        hetatm_flag = " "
+    return (chainid, (hetatm_flag, int(resseq), icode), resname, name, altloc)
+
+
 class MMCIFParser(object):
     """Parse a PDB file and return a Structure object."""
 
@@ -65,6 +94,87 @@ class MMCIFParser(object):
         self._build_structure(structure_id)
         return self._structure_builder.get_structure()
 
+    def get_trajectory(self, structure_id, filename, coord_file=None):
+        """Return a Trajectory with the coordinates of all the models.
+
+        Arguments:
+         - structure_id - string, the id that will be used for the structure
+         - filename - name of the mmCIF file OR an open filehandle
+         - coord_file - optional name of a file in which to store the
+           coordinates, which is then memory mapped (otherwise they are
+           held in memory)
+
+        Only the first model is built as Model, Chain, Residue and Atom
+        objects (the topology), while just the coordinates are taken from
+        each model. Atoms are matched to the topology by their chain,
+        residue, name and alternative location, so any atoms not in the
+        first model are ignored, and topology atoms missing from a later
+        model get NaN coordinates in that frame.
+
+        Unlike PDBParser.get_trajectory this does not read the file one
+        model at a time. The whole file is first loaded with MMCIF2Dict,
+        so the text values of every atom in every model are held in memory
+        while the frames are built, and only the coordinates are kept
+        afterwards. For very large trajectories use the PDB format, or a
+        coordinate specific format.
+        """
+        with warnings.catch_warnings():
+            if self.QUIET:
+                warnings.filterwarnings("ignore", category=PDBConstructionWarning)
+            mmcif_dict = MMCIF2Dict(filename)
+            atom_count = len(mmcif_dict["_atom_site.label_atom_id"])
+            try:
+                serial_list = mmcif_dict["_atom_site.pdbx_PDB_model_num"]
+            except KeyError:
+                # No model number column, so a single model
+                serial_list = None
+                bounds = [0, atom_count]
+            else:
+                bounds = [0] + [i for i in range(1, atom_count)
+                                if serial_list[i] != serial_list[i - 1]]
+                bounds.append(atom_count)
+            # Build the topology from the atoms of the first model only
+            first_model = {}
+            for key, value in mmcif_dict.items():
+                if key.startswith("_atom_site.") and isinstance(value, list):
+                    value = value[:bounds[1]]
+                first_model[key] = value
+            self._mmcif_dict = first_model
+            self._build_structure(structure_id)
+            self._mmcif_dict = mmcif_dict
+            structure = self._structure_builder.get_structure()
+        if "_atom_site.auth_seq_id" in mmcif_dict:
+            seq_id_key = "_atom_site.auth_seq_id"
+        else:
+            seq_id_key = "_atom_site.label_seq_id"
+        key_columns = [mmcif_dict[key] for key in
+                       ("_atom_site.label_asym_id", seq_id_key,
+                        "_atom_site.pdbx_PDB_ins_code",
+                        "_atom_site.label_comp_id", "_atom_site.group_PDB",
+                        "_atom_site.label_atom_id", "_atom_site.label_alt_id")]
+        coord_columns = [mmcif_dict["_atom_site.Cartn_x"],
+                         mmcif_dict["_atom_site.Cartn_y"],
+                         mmcif_dict["_atom_site.Cartn_z"]]
+        rows = _atom_rows(structure.get_atom_array())
+        frames = _FrameStore(len(structure.get_atom_array()), coord_file)
+        signature = None
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            new_signature = [column[start:end] for column in key_columns]
+            if new_signature != signature:
+                # Not the same atoms as in the previous model
+                signature = new_signature
+                order = _row_order(dict(rows), [_atom_key(*values) for values
+                                                in zip(*new_signature)])
+            # Convert one model at a time, rather than all the coordinates
+            coord = _float_array([column[start:end] for column
+                                  in coord_columns]).astype("f")
+            frames.append(coord, order)
+        if serial_list is None:
+            serial_nums = None
+        else:
+            serial_nums = [int(serial_list[start]) for start in bounds[:-1]]
+        return Trajectory(structure, frames.close(), serial_nums)
+
     # Private methods
 
     def _build_structure(self, structure_id):
@@ -77,13 +187,33 @@ class MMCIFParser(object):
             element_list = None
         seq_id_list = mmcif_dict["_atom_site.label_seq_id"]
         chain_id_list = mmcif_dict["_atom_site.label_asym_id"]
-        x_list = [float(x) for x in mmcif_dict["_atom_site.Cartn_x"]]
-        y_list = [float(x) for x in mmcif_dict["_atom_site.Cartn_y"]]
-        z_list = [float(x) for x in mmcif_dict["_atom_site.Cartn_z"]]
+        # Convert the numeric columns as whole arrays, with the coordinates
+        # as float32 to match numpy.array((x, y, z), 'f') for each atom
+        coord_array = _float_array([mmcif_dict["_atom_site.Cartn_x"],
+                                    mmcif_dict["_atom_site.Cartn_y"],
+                                    mmcif_dict["_atom_site.Cartn_z"]]).astype("f")
         alt_list = mmcif_dict["_atom_site.label_alt_id"]
         icode_list = mmcif_dict["_atom_site.pdbx_PDB_ins_code"]
-        b_factor_list = mmcif_dict["_atom_site.B_iso_or_equiv"]
+        try:
+            b_factor_list = _float_array(
+                [mmcif_dict["_atom_site.B_iso_or_equiv"]])[:, 0].tolist()
+        except ValueError:
+            raise PDBConstructionException("Invalid or missing B factor")
+        # The mmCIF markers for an unknown or inapplicable value (as written
+        # by MMCIFIO) give a missing occupancy of None, as in the PDBParser
         occupancy_list = mmcif_dict["_atom_site.occupancy"]
+        missing = [i for i, value in enumerate(occupancy_list)
+                   if value in ("?", ".")]
+        if missing:
+            occupancy_list = list(occupancy_list)
+            for i in missing:
+                occupancy_list[i] = "0"
+        try:
+            occupancy_list = _float_array([occupancy_list])[:, 0].tolist()
+        except ValueError:
+            raise PDBConstructionException("Invalid or missing occupancy")
+        for i in missing:
+            occupancy_list[i] = None
         fieldname_list = mmcif_dict["_atom_site.group_PDB"]
         try:
             serial_list = [int(n) for n in mmcif_dict["_atom_site.pdbx_PDB_model_num"]]
@@ -94,12 +224,13 @@ class MMCIFParser(object):
             # Invalid model number (malformed file)
             raise PDBConstructionException("Invalid model number")
         try:
-            aniso_u11 = mmcif_dict["_atom_site.aniso_U[1][1]"]
-            aniso_u12 = mmcif_dict["_atom_site.aniso_U[1][2]"]
-            aniso_u13 = mmcif_dict["_atom_site.aniso_U[1][3]"]
-            aniso_u22 = mmcif_dict["_atom_site.aniso_U[2][2]"]
-            aniso_u23 = mmcif_dict["_atom_site.aniso_U[2][3]"]
-            aniso_u33 = mmcif_dict["_atom_site.aniso_U[3][3]"]
+            anisou_array = _float_array(
+                [mmcif_dict["_atom_site.aniso_U[1][1]"],
+                 mmcif_dict["_atom_site.aniso_U[1][2]"],
+                 mmcif_dict["_atom_site.aniso_U[1][3]"],
+                 mmcif_dict["_atom_site.aniso_U[2][2]"],
+                 mmcif_dict["_atom_site.aniso_U[2][3]"],
+                 mmcif_dict["_atom_site.aniso_U[3][3]"]]).astype("f")
             aniso_flag = 1
         except KeyError:
             # no anisotropic B factors
@@ -127,9 +258,6 @@ class MMCIFParser(object):
             # this number should match the '_atom_site.id' index in the MMCIF
             structure_builder.set_line_counter(i)
 
-            x = x_list[i]
-            y = y_list[i]
-            z = z_list[i]
             resname = residue_id_list[i]
             chainid = chain_id_list[i]
             altloc = alt_list[i]
@@ -141,14 +269,8 @@ class MMCIFParser(object):
                 icode = " "
             name = atom_id_list[i]
             # occupancy & B factor
-            try:
-                tempfactor = float(b_factor_list[i])
-            except ValueError:
-                raise PDBConstructionException("Invalid or missing B factor")
-            try:
-                occupancy = float(occupancy_list[i])
-            except ValueError:
-                raise PDBConstructionException("Invalid or missing occupancy")
+            tempfactor = b_factor_list[i]
+            occupancy = occupancy_list[i]
             fieldname = fieldname_list[i]
             if fieldname == "HETATM":
                 hetatm_flag = "H"
@@ -177,16 +299,12 @@ class MMCIFParser(object):
                 int_resseq = int(resseq)
                 structure_builder.init_residue(resname, hetatm_flag, int_resseq, icode)
 
-            coord = numpy.array((x, y, z), 'f')
+            coord = coord_array[i]
             element = element_list[i] if element_list else None
             structure_builder.init_atom(name, coord, tempfactor, occupancy, altloc,
                 name, element=element)
             if aniso_flag == 1:
-                u = (aniso_u11[i], aniso_u12[i], aniso_u13[i],
-                    aniso_u22[i], aniso_u23[i], aniso_u33[i])
-                mapped_anisou = [float(x) for x in u]
-                anisou_array = numpy.array(mapped_anisou, 'f')
-                structure_builder.set_anisou(anisou_array)
+                structure_builder.set_anisou(anisou_array[i])
         # Now try to set the cell
         try:
             a = float(mmcif_dict["_cell.length_a"])
@@ -5,6 +5,11 @@
 
 """Output of PDB files."""
 
+import warnings
+
+import numpy
+
+from Bio import BiopythonWarning
 from Bio._py3k import basestring
 
 from Bio.PDB.StructureBuilder import StructureBuilder  # To allow saving of chains, residues, etc..
@@ -42,6 +47,56 @@ class Select(object):
         return 1
 
 
+def _get_atom_mask(atom_array, select):
+    """Return a boolean array of the atoms to write (PRIVATE).
+
+    The select argument is a Select object, or already a boolean array with
+    an entry for each row of the AtomArray.
+    """
+    if type(select) is Select:
+        # Everything, no need to ask
+        return numpy.ones(len(atom_array), bool)
+    if hasattr(select, "accept_atom"):
+        return atom_array.mask(select)
+    mask = numpy.asarray(select, bool)
+    if mask.shape != (len(atom_array),):
+        raise ValueError("Expected a mask of %i atoms, not shape %r"
+                         % (len(atom_array), mask.shape))
+    return mask
+
+
+def _get_atom_table(structure, atom_array):
+    """Collect the fields of each row of an AtomArray for writing (PRIVATE).
+
+    Returns two lists with an entry for each row (atom), the residue fields
+    (hetfield, resseq, icode, resname, segid), and the atom fields
+    (fullname, altloc, element). The residue fields are shared by all the
+    atoms of a residue, so the residues are visited rather than the atoms.
+    """
+    residue_fields = [None] * len(atom_array)
+    for model in structure.get_list():
+        for chain in model.get_list():
+            for residue in chain.get_unpacked_list():
+                start, end = atom_array.get_range(residue)
+                hetfield, resseq, icode = residue.get_id()
+                fields = (hetfield, resseq, icode, residue.get_resname(),
+                          residue.get_segid())
+                residue_fields[start:end] = [fields] * (end - start)
+    atom_fields = [(atom.fullname, atom.altloc, atom.element)
+                   for atom in atom_array.atoms]
+    return residue_fields, atom_fields
+
+
+def _get_missing_occupancy(atom_array, mask):
+    """Return the rows to write which have no occupancy, with a warning (PRIVATE)."""
+    missing = numpy.flatnonzero(numpy.isnan(atom_array.occupancy) & mask)
+    for row in missing:
+        warnings.warn("Missing occupancy in atom %s written as blank" %
+                      repr(atom_array.atoms[row].get_full_id()),
+                      BiopythonWarning)
+    return missing
+
+
 class PDBIO(object):
     """Write a Structure object (or a subset of a Structure object) as a PDB file.
 
@@ -53,13 +108,19 @@ class PDBIO(object):
         >>> io.set_structure(s)
         >>> io.save("out.pdb")
     """
-    def __init__(self, use_model_flag=0):
+    def __init__(self, use_model_flag=0, fast=False):
         """Creat the PDBIO object.
 
         @param use_model_flag: if 1, force use of the MODEL record in output.
         @type use_model_flag: int
+
+        @param fast: if true, write the atoms in bulk from the AtomArray of
+        the structure (see Bio.PDB.AtomArray), and allow the selection to be
+        a boolean mask of its rows. The output is the same.
+        @type fast: bool
         """
         self.use_model_flag = use_model_flag
+        self.fast = bool(fast)
 
     # private mathods
 
@@ -87,8 +148,6 @@ class PDBIO(object):
         except TypeError:
             if occupancy is None:
                 occupancy_str = " " * 6
-                import warnings
-                from Bio import BiopythonWarning
                 warnings.warn("Missing occupancy in atom %s written as blank" %
                               repr(atom.get_full_id()), BiopythonWarning)
             else:
@@ -100,6 +159,70 @@ class PDBIO(object):
                 element, charge)
         return _ATOM_FORMAT_STRING % args
 
+    def _get_element(self, element):
+        """Return the element right justified for the PDB file (PRIVATE)."""
+        if not element:
+            return "  "
+        element = element.strip().upper()
+        if element.capitalize() not in atom_weights:
+            raise ValueError("Unrecognised element %r" % element)
+        return element.rjust(2)
+
+    def _save_fast(self, fp, select, model_flag):
+        """Write the selected atoms in bulk from the AtomArray (PRIVATE).
+
+        The atom lines of each chain are formatted from the columns of the
+        AtomArray and written at once, with the atoms chosen by a mask
+        rather than calling the Select methods for every atom.
+        """
+        structure = self.structure
+        atom_array = structure.get_atom_array()
+        mask = _get_atom_mask(atom_array, select)
+        residue_fields, atom_fields = _get_atom_table(structure, atom_array)
+        coord = atom_array.coord.tolist()
+        bfactor = atom_array.bfactor.tolist()
+        occupancy = ["%6.2f" % o for o in atom_array.occupancy.tolist()]
+        for row in _get_missing_occupancy(atom_array, mask):
+            occupancy[row] = " " * 6
+        elements = {}
+        for name, altloc, element in atom_fields:
+            if element not in elements:
+                elements[element] = self._get_element(element)
+        for model in structure.get_list():
+            if hasattr(select, "accept_model") and not select.accept_model(model):
+                # No MODEL record either
+                continue
+            model_residues_written = 0
+            atom_number = 1
+            if model_flag:
+                fp.write("MODEL      %s\n" % model.serial_num)
+            for chain in model.get_list():
+                start, end = atom_array.get_range(chain)
+                rows = (numpy.flatnonzero(mask[start:end]) + start).tolist()
+                if not rows:
+                    continue
+                chain_id = chain.get_id()
+                lines = []
+                for row in rows:
+                    hetfield, resseq, icode, resname, segid = residue_fields[row]
+                    name, altloc, element = atom_fields[row]
+                    if hetfield != " ":
+                        record_type = "HETATM"
+                    else:
+                        record_type = "ATOM  "
+                    x, y, z = coord[row]
+                    lines.append(_ATOM_FORMAT_STRING %
+                                 (record_type, atom_number, name, altloc,
+                                  resname, chain_id, resseq, icode, x, y, z,
+                                  occupancy[row], bfactor[row], segid,
+                                  elements[element], "  "))
+                    atom_number += 1
+                lines.append("TER\n")
+                fp.write("".join(lines))
+                model_residues_written = 1
+            if model_flag and model_residues_written:
+                fp.write("ENDMDL\n")
+
     # Public methods
 
     def set_structure(self, pdb_object):
@@ -160,7 +283,9 @@ class PDBIO(object):
         These methods should return 1 if the entity is to be
         written out, 0 otherwise.
 
-        Typically select is a subclass of L{Select}.
+        Typically select is a subclass of L{Select}. With the fast option,
+        select may instead be a boolean array with an entry for each row of
+        the structure's AtomArray (e.g. from its get_atom_mask method).
         """
         get_atom_line = self._get_atom_line
         if isinstance(file, basestring):
@@ -175,6 +300,13 @@ class PDBIO(object):
             model_flag = 1
         else:
             model_flag = 0
+        if self.fast:
+            self._save_fast(fp, select, model_flag)
+            if write_end:
+                fp.write('END\n')
+            if close_file:
+                fp.close()
+            return
         for model in self.structure.get_list():
             if not select.accept_model(model):
                 continue
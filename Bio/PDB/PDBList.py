@@ -26,14 +26,102 @@ import contextlib
 import gzip
 import os
 import shutil
+import time
+import zlib
 
 # Importing these functions with leading underscore as not intended for reuse
 from Bio._py3k import urlopen as _urlopen
 from Bio._py3k import urlretrieve as _urlretrieve
+from Bio._py3k import Request as _Request
+from Bio._py3k import HTTPError as _HTTPError
+from Bio._py3k import _binary_to_string_handle
 
 __docformat__ = "restructuredtext en"
 
 
+def _makedirs(path):
+    """Create a directory and its parents unless it exists (PRIVATE).
+
+    Several threads may try to create the same directory at once.
+    """
+    try:
+        os.makedirs(path)
+    except OSError:
+        if not os.path.isdir(path):
+            raise
+
+
+def _download(url, filename, block_size=65536):
+    """Download a URL to a file, resuming a partial download (PRIVATE).
+
+    Over HTTP(S) an existing (partial) file is continued from its end with
+    a Range request, while other protocols (e.g. FTP or file://) start again
+    from the beginning. Raises an IOError if the file does not end up with
+    the number of bytes the server announced, keeping the partial file so
+    the next attempt can resume it.
+    """
+    start = 0
+    if os.path.isfile(filename) and \
+            url.split(":", 1)[0].lower() in ("http", "https"):
+        start = os.path.getsize(filename)
+    request = _Request(url)
+    if start:
+        request.add_header("Range", "bytes=%i-" % start)
+    try:
+        handle = _urlopen(request)
+    except _HTTPError as err:
+        if start and err.code == 416:
+            # Nothing left to get, the file was already complete
+            return
+        raise
+    with contextlib.closing(handle):
+        headers = handle.info()
+        length = headers.get("Content-Length")
+        if start and getattr(handle, "code", None) == 206:
+            # Partial content, e.g. "Content-Range: bytes 100-199/200"
+            mode = "ab"
+            total = headers.get("Content-Range", "").rsplit("/", 1)[-1]
+        else:
+            # The server sent the whole file
+            mode = "wb"
+            total = length
+        with open(filename, mode) as out:
+            shutil.copyfileobj(handle, out, block_size)
+    if total and total.strip().isdigit():
+        size = os.path.getsize(filename)
+        if size != int(total):
+            raise IOError("Expected %s bytes from %s but have %i"
+                          % (total.strip(), url, size))
+
+
+def _gunzip(filename, final_file):
+    """Uncompress a gzip file, checking its CRC, then delete it (PRIVATE).
+
+    The output is written to a temporary file which is only renamed to
+    final_file once complete, so a crash never leaves a truncated structure
+    behind. If the archive is corrupt it is deleted and an IOError raised.
+    """
+    temp_file = final_file + ".part"
+    try:
+        # Can't use context manager with gzip.open until Python 2.7
+        gz = gzip.open(filename, 'rb')
+        try:
+            with open(temp_file, 'wb') as out:
+                shutil.copyfileobj(gz, out)
+        finally:
+            gz.close()
+    except (IOError, OSError, EOFError, zlib.error) as err:
+        for name in (filename, temp_file):
+            if os.path.exists(name):
+                os.remove(name)
+        raise IOError("Corrupt download %s: %s" % (filename, err))
+    if os.path.exists(final_file):
+        # Needed on Windows, where rename will not replace a file
+        os.remove(final_file)
+    os.rename(temp_file, final_file)
+    os.remove(filename)
+
+
 class PDBList(object):
     """
     This class provides quick access to the structure lists on the
@@ -50,6 +138,14 @@ class PDBList(object):
     the proxy variable to your environment, e.g. in Unix:
     export HTTP_PROXY='http://realproxy.charite.de:888'
     (This can also be added to ~/.bashrc)
+
+    The server can be any URL (ftp://, http://, https:// or file://) with
+    the same layout as the wwPDB archive under /pub/pdb, such as a mirror
+    or a local copy. Many structures can be downloaded at once with the
+    retrieve_pdb_files method, using several threads. Failed downloads are
+    tried again after a delay which doubles each time, partial HTTP
+    downloads are resumed, and each file is checked against the size the
+    server gives and the CRC of the gzip archive.
     """
 
     PDB_REF = """
@@ -63,10 +159,30 @@ class PDBList(object):
     # just append PDB code to this, and then it works.
 
     def __init__(self, server='ftp://ftp.wwpdb.org', pdb=os.getcwd(),
-                 obsolete_pdb=None):
-        """Initialize the class with the default server or a custom one."""
+                 obsolete_pdb=None, threads=1, retries=3, retry_delay=1.0):
+        """Initialize the class with the default server or a custom one.
+
+        @param server: base URL of the PDB archive (the directory holding
+        pub/pdb), e.g. a mirror or a file:// URL of a local copy
+        @type server: string
+
+        @param threads: number of files to download at once
+        @type threads: int
+
+        @param retries: how many times to try a failed download again
+        @type retries: int
+
+        @param retry_delay: seconds to wait before the first retry, doubled
+        for each further retry
+        @type retry_delay: float
+        """
+        if threads < 1:
+            raise ValueError("Need at least one thread, not %r" % threads)
         self.pdb_server = server  # remote pdb server
         self.local_pdb = pdb  # local pdb file tree
+        self.threads = threads
+        self.retries = retries
+        self.retry_delay = retry_delay
 
         # local file tree for obsolete pdb files
         if obsolete_pdb:
@@ -87,7 +203,7 @@ class PDBList(object):
         Typical contents of the list files parsed by this method is now
         very simply one PDB name per line.
         """
-        with contextlib.closing(_urlopen(url)) as handle:
+        with contextlib.closing(_binary_to_string_handle(_urlopen(url))) as handle:
             answer = []
             for line in handle:
                 pdb = line.strip()
@@ -110,10 +226,9 @@ class PDBList(object):
         -rw-r--r--   1 1002     sysadmin    1327 Mar 12  2001 README
         """
         url = self.pdb_server + '/pub/pdb/data/status/'
-        with contextlib.closing(_urlopen(url)) as handle:
-            recent = filter(str.isdigit,
-                            (x.split()[-1] for x in handle.readlines())
-                            )[-1]
+        with contextlib.closing(_binary_to_string_handle(_urlopen(url))) as handle:
+            recent = [x.split()[-1] for x in handle.readlines()
+                      if x.split() and x.split()[-1].isdigit()][-1]
 
         path = self.pdb_server + '/pub/pdb/data/status/%s/' % (recent)
 
@@ -130,7 +245,7 @@ class PDBList(object):
         """
         print("retrieving index file. Takes about 5 MB.")
         url = self.pdb_server + '/pub/pdb/derived_data/index/entries.idx'
-        with contextlib.closing(_urlopen(url)) as handle:
+        with contextlib.closing(_binary_to_string_handle(_urlopen(url))) as handle:
             all_entries = [line[:4] for line in handle.readlines()[2:]
                            if len(line) > 4]
         return all_entries
@@ -159,7 +274,7 @@ class PDBList(object):
 
         """
         url = self.pdb_server + '/pub/pdb/data/status/obsolete.dat'
-        with contextlib.closing(_urlopen(url)) as handle:
+        with contextlib.closing(_binary_to_string_handle(_urlopen(url))) as handle:
             # Extract pdb codes. Could use a list comprehension, but I want
             # to include an assert to check for mis-reading the data.
             obsolete = []
@@ -199,8 +314,7 @@ class PDBList(object):
                 path = os.path.join(path, code[1:3])
         else:  # Put in specified directory
             path = pdir
-        if not os.access(path, os.F_OK):
-            os.makedirs(path)
+        _makedirs(path)
 
         filename = os.path.join(path, archive_fn)
         final_file = os.path.join(path, "pdb%s.ent" % code)  # (decompressed)
@@ -211,20 +325,64 @@ class PDBList(object):
                 print("Structure exists: '%s' " % final_file)
                 return final_file
 
-        # Retrieve the file
+        # Retrieve the file (resuming any partial download left in the
+        # archive file), then uncompress the archive and delete it
         print("Downloading PDB structure '%s'..." % pdb_code)
-        _urlretrieve(url, filename)
-
-        # Uncompress the archive, delete when done
-        # Can't use context manager with gzip.open until Python 2.7
-        gz = gzip.open(filename, 'rb')
-        with open(final_file, 'wb') as out:
-            out.writelines(gz)
-        gz.close()
-        os.remove(filename)
+        delay = self.retry_delay
+        for attempt in range(self.retries + 1):
+            try:
+                _download(url, filename)
+                _gunzip(filename, final_file)
+                break
+            except (IOError, OSError) as err:
+                # Only worth trying again if the file may be there
+                missing = isinstance(err, _HTTPError) and err.code == 404
+                if missing or attempt == self.retries:
+                    raise
+                print("Retrying PDB structure '%s' after error: %s"
+                      % (pdb_code, err))
+                time.sleep(delay)
+                delay *= 2
 
         return final_file
 
+    def retrieve_pdb_files(self, pdb_codes, obsolete=False, pdir=None):
+        """Retrieve many PDB structure files, several at once.
+
+        Uses self.threads downloads at a time, otherwise like calling
+        retrieve_pdb_file for each code. A structure which cannot be
+        downloaded (after the retries) does not stop the others; an error
+        message is printed and its filename is given as None.
+
+        @param pdb_codes: PDB codes of the structures
+        @type pdb_codes: list of strings
+
+        @param pdir: put the files in this directory (default: create a
+        PDB-style directory tree)
+        @type pdir: string
+
+        @return: filenames, in the same order as the codes
+        @rtype: list
+        """
+        def retrieve(pdb_code):
+            try:
+                return self.retrieve_pdb_file(pdb_code, obsolete, pdir)
+            except Exception as err:
+                print("error %s: %s" % (pdb_code, err))
+                return None
+
+        pdb_codes = list(pdb_codes)
+        if self.threads == 1 or len(pdb_codes) < 2:
+            return [retrieve(pdb_code) for pdb_code in pdb_codes]
+        # The work is waiting on the network, so threads are enough
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(min(self.threads, len(pdb_codes)))
+        try:
+            return pool.map(retrieve, pdb_codes, 1)
+        finally:
+            pool.close()
+            pool.join()
+
     def update_pdb(self):
         """
         I guess this is the 'most wanted' function from this module.
@@ -237,13 +395,8 @@ class PDBList(object):
 
         new, modified, obsolete = self.get_recent_changes()
 
-        for pdb_code in new + modified:
-            try:
-                self.retrieve_pdb_file(pdb_code)
-            except Exception:
-                print('error %s\n' % pdb_code)
-                # you can insert here some more log notes that
-                # something has gone wrong.
+        # Errors are reported as each structure fails
+        self.retrieve_pdb_files(new + modified)
 
         # Move the obsolete files to a special folder
         for pdb_code in obsolete:
@@ -275,8 +428,7 @@ class PDBList(object):
         given).
         """
         entries = self.get_all_entries()
-        for pdb_code in entries:
-            self.retrieve_pdb_file(pdb_code)
+        self.retrieve_pdb_files(entries)
         # Write the list
         if listfile:
             with open(listfile, 'w') as outfile:
@@ -290,8 +442,7 @@ class PDBList(object):
         given).
         """
         entries = self.get_all_obsolete()
-        for pdb_code in entries:
-            self.retrieve_pdb_file(pdb_code, obsolete=1)
+        self.retrieve_pdb_files(entries, obsolete=True)
 
         # Write the list
         if listfile:
@@ -326,6 +477,7 @@ if __name__ == '__main__':
     Options:
        -d   A single directory will be used as <pdb_path>, not a tree.
        -o   Overwrite existing structure files.
+       -tN  Download N structures at once.
     """
     print(doc)
 
@@ -338,6 +490,8 @@ if __name__ == '__main__':
                     pl.flat_tree = 1
                 elif option == '-o':
                     pl.overwrite = 1
+                elif option.startswith('-t'):
+                    pl.threads = max(1, int(option[2:]))
 
     else:
         pdb_path = os.getcwd()
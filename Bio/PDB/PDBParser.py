@@ -8,6 +8,7 @@
 from __future__ import print_function
 
 import warnings
+from itertools import chain
 
 try:
     import numpy
@@ -16,24 +17,112 @@ except ImportError:
     raise MissingPythonDependencyError(
         "Install NumPy if you want to use the PDB parser.")
 
+from Bio._py3k import _as_bytes
+
 from Bio.File import as_handle
 
 from Bio.PDB.PDBExceptions import PDBConstructionException
 from Bio.PDB.PDBExceptions import PDBConstructionWarning
 
 from Bio.PDB.StructureBuilder import StructureBuilder
+from Bio.PDB.Trajectory import Trajectory, _FrameStore, _atom_rows, _row_order
 from Bio.PDB.parse_pdb_header import _parse_pdb_header_list
 
 __docformat__ = "restructuredtext en"
 
 # If PDB spec says "COLUMNS 18-20" this means line[17:20]
 
+# The numeric fields parsed in bulk by the fast parser, matching those
+# used in the line by line parser (including the ANISOU quirk)
+_ATOM_FIELDS = [(30, 38), (38, 46), (46, 54), (54, 60), (60, 66)]
+_ANISOU_FIELDS = [(28, 35), (35, 42), (43, 49), (49, 56), (56, 63), (63, 70)]
+_SIGUIJ_FIELDS = [(28, 35), (35, 42), (42, 49), (49, 56), (56, 63), (63, 70)]
+_SIGATM_FIELDS = [(30, 38), (38, 45), (46, 54), (54, 60), (60, 66)]
+
+
+def _column_to_float(values):
+    """Convert an array of byte strings to floats (PRIVATE).
+
+    Returns the array of floats, and a boolean array marking any invalid
+    values (which are set to zero), or None if all were valid.
+    """
+    try:
+        return values.astype("d"), None
+    except ValueError:
+        pass
+    # Slow path, checking each value to find the invalid ones
+    result = numpy.zeros(values.shape, "d")
+    invalid = numpy.zeros(values.shape, bool)
+    for i, value in enumerate(values):
+        try:
+            result[i] = float(value)
+        except ValueError:
+            invalid[i] = True
+    return result, invalid
+
+
+def _parse_columns(lines, fields):
+    """Parse fixed width numeric fields from many lines at once (PRIVATE).
+
+    Arguments:
+     - lines - list of strings
+     - fields - list of (start, end) column positions
+
+    The lines are padded and joined into a NumPy array of characters, and
+    each field is converted for all the lines in one go. Returns an N by
+    len(fields) array of floats, and a boolean array marking any invalid
+    (or missing) values, or None if all were valid.
+
+    Returns None if the lines cannot be handled this way (i.e. they have
+    non-Latin-1 characters), and they should be parsed one by one instead.
+    """
+    width = max(end for start, end in fields)
+    try:
+        text = _as_bytes("".join([line.rstrip("\n")[:width].ljust(width)
+                                  for line in lines]))
+    except UnicodeError:
+        return None
+    if len(text) != width * len(lines):
+        return None
+    table = numpy.frombuffer(text, "S1").reshape((len(lines), width))
+    values = numpy.zeros((len(lines), len(fields)), "d")
+    invalid = None
+    for i, (start, end) in enumerate(fields):
+        column = numpy.ascontiguousarray(table[:, start:end])
+        column = column.view("S%i" % (end - start))[:, 0]
+        values[:, i], bad = _column_to_float(column)
+        if bad is not None:
+            if invalid is None:
+                invalid = numpy.zeros(values.shape, bool)
+            invalid[:, i] = bad
+    return values, invalid
+
+
+def _atom_key(line):
+    """Return the identity of the atom in an ATOM or HETATM line (PRIVATE).
+
+    This is the chain id, residue id, residue name, full atom name and
+    alternative location, as used by Bio.PDB.Trajectory to match atoms in
+    later models to the topology.
+    """
+    resname = line[17:20]
+    if line[0:6] == "HETATM":
+        if resname == "HOH" or resname == "WAT":
+            hetero_flag = "W"
+        else:
+            # As in the StructureBuilder
+            hetero_flag = "H_" + resname
+    else:
+        hetero_flag = " "
+    residue_id = (hetero_flag, int(line[22:26].split()[0]), line[26])
+    return (line[21], residue_id, resname, line[12:16], line[16])
+
 
 class PDBParser(object):
     """Parse a PDB file and return a Structure object."""
 
     def __init__(self, PERMISSIVE=True, get_header=False,
-                 structure_builder=None, QUIET=False):
+                 structure_builder=None, QUIET=False, fast=False):
         """Create a PDBParser object.
 
         The PDB parser call a number of standard methods in an aggregated
@@ -50,6 +139,10 @@ class PDBParser(object):
          - QUIET - Evaluated as a Boolean. If true, warnings issued in constructing
            the SMCRA data will be suppressed. If false (DEFAULT), they will be shown.
            These warnings might be indicative of problems in the PDB file!
+         - fast - Evaluated as a Boolean. If true, the record types are
+           scanned first and the numeric fields of all the ATOM, HETATM,
+           ANISOU, SIGUIJ and SIGATM records are converted in bulk using
+           NumPy. If false (DEFAULT), the file is parsed line by line.
         """
         if structure_builder is not None:
             self.structure_builder = structure_builder
@@ -60,6 +153,7 @@ class PDBParser(object):
         self.line_counter = 0
         self.PERMISSIVE = bool(PERMISSIVE)
         self.QUIET = bool(QUIET)
+        self.fast = bool(fast)
 
     # Public methods
 
@@ -80,7 +174,11 @@ class PDBParser(object):
             self.structure_builder.init_structure(id)
 
             with as_handle(file, mode='rU') as handle:
-                self._parse(handle.readlines())
+                lines = handle.readlines()
+            if self.fast:
+                self._parse_fast(lines)
+            else:
+                self._parse(lines)
 
             self.structure_builder.set_header(self.header)
             # Return the Structure instance
@@ -88,6 +186,61 @@ class PDBParser(object):
 
         return structure
 
+    def get_trajectory(self, id, file, coord_file=None):
+        """Return a Trajectory with the coordinates of all the models.
+
+        Arguments:
+         - id - string, the id that will be used for the structure
+         - file - name of the PDB file OR an open filehandle
+         - coord_file - optional name of a file in which to store the
+           coordinates, which is then memory mapped (otherwise they are
+           held in memory)
+
+        Only the first model is built as Model, Chain, Residue and Atom
+        objects (the topology). The file is then read one model at a time,
+        keeping just the coordinates. Atoms are matched to the topology by
+        their chain, residue, name and alternative location, so any atoms
+        not in the first model are ignored, and topology atoms missing from
+        a later model get NaN coordinates in that frame.
+        """
+        with warnings.catch_warnings():
+            if self.QUIET:
+                warnings.filterwarnings("ignore", category=PDBConstructionWarning)
+
+            self.header = None
+            self.trailer = None
+            self.structure_builder.init_structure(id)
+
+            with as_handle(file, mode='rU') as handle:
+                # Build the topology from the header and the first model
+                lines = []
+                for line in handle:
+                    lines.append(line)
+                    if line[0:6] == "ENDMDL":
+                        break
+                self._parse(lines)
+                self.structure_builder.set_header(self.header)
+                structure = self.structure_builder.get_structure()
+                rows = _atom_rows(structure.get_atom_array())
+                frames = _FrameStore(len(structure.get_atom_array()),
+                                     coord_file)
+                serial_nums = []
+                signature = None
+                # Then go through the file again, including the first model
+                for serial_num, atom_lines, numbers in \
+                        self._iter_models(chain(lines, handle)):
+                    new_signature = [line[0:6] + line[12:27]
+                                     for line in atom_lines]
+                    if new_signature != signature:
+                        # Not the same atoms as in the previous model
+                        signature = new_signature
+                        order = _row_order(dict(rows),
+                                           [_atom_key(line) for line in atom_lines])
+                    frames.append(self._get_frame_coord(atom_lines, numbers),
+                                  order)
+                    serial_nums.append(serial_num)
+        return Trajectory(structure, frames.close(), serial_nums)
+
     def get_header(self):
         """Return the header."""
         return self.header
@@ -105,6 +258,134 @@ class PDBParser(object):
         # Parse the atomic data; return the PDB file trailer
         self.trailer = self._parse_coordinates(coords_trailer)
 
+    def _parse_fast(self, header_coords_trailer):
+        """Parse the PDB file, converting the numeric fields in bulk (PRIVATE)."""
+        self.header, coords_trailer = self._get_header(header_coords_trailer)
+        # Pre-scan the record types to find the end of the atomic data
+        # (where the line by line parser stops) and the numeric records
+        record_types = [line[0:6] for line in coords_trailer]
+        end = len(record_types)
+        for record_type in ("END   ", "CONECT"):
+            try:
+                end = record_types.index(record_type, 0, end)
+            except ValueError:
+                pass
+        coords = coords_trailer[:end]
+        record_types = record_types[:end]
+        columns = {}
+        for record_type, fields in (("ATOM  ", _ATOM_FIELDS),
+                                    ("ANISOU", _ANISOU_FIELDS),
+                                    ("SIGUIJ", _SIGUIJ_FIELDS),
+                                    ("SIGATM", _SIGATM_FIELDS)):
+            if record_type == "ATOM  ":
+                rows = [i for i, r in enumerate(record_types)
+                        if r == "ATOM  " or r == "HETATM"]
+            else:
+                rows = [i for i, r in enumerate(record_types)
+                        if r == record_type]
+            if rows:
+                parsed = _parse_columns([coords[i] for i in rows], fields)
+                if parsed is not None:
+                    columns[record_type] = (rows,) + parsed
+                # Otherwise these records are parsed line by line
+        columns = self._prepare_columns(columns)
+        self._parse_coordinates(coords, columns)
+        self.trailer = coords_trailer[end:]
+
+    def _prepare_columns(self, columns):
+        """Turn the bulk parsed numeric fields into per record values (PRIVATE).
+
+        Returns a dictionary of lists keyed on record type, as used in the
+        _parse_coordinates method. Record types with invalid values are
+        omitted, so that they are parsed line by line with the usual errors,
+        except for invalid atomic coordinates which are always an error.
+        """
+        prepared = {}
+        for record_type, (rows, values, invalid) in columns.items():
+            if record_type == "ATOM  ":
+                if invalid is not None and invalid[:, :3].any():
+                    row = rows[numpy.flatnonzero(invalid[:, :3].any(axis=1))[0]]
+                    # Same error as in the line by line parser
+                    raise PDBConstructionException(
+                        "Invalid or missing coordinate(s) at line %i."
+                        % (self.line_counter + row + 1))
+                # Match the precision of numpy.array((x, y, z), "f")
+                coord = values[:, :3].astype("f")
+                occupancy = values[:, 3].tolist()
+                bfactor = values[:, 4].tolist()
+                if invalid is not None:
+                    # Missing values are dealt with in _parse_coordinates
+                    for i in numpy.flatnonzero(invalid[:, 3]):
+                        occupancy[i] = None
+                    for i in numpy.flatnonzero(invalid[:, 4]):
+                        bfactor[i] = None
+                prepared["ATOM  "] = list(zip(coord, occupancy, bfactor))
+            elif invalid is not None:
+                # Parse line by line, giving the usual exception
+                continue
+            elif record_type == "SIGATM":
+                prepared[record_type] = list(values.astype("f"))
+            else:
+                # U's and their sigmas are scaled by 10^4
+                prepared[record_type] = list(
+                    (values.astype("f") / 10000.0).astype("f"))
+        return prepared
+
+    def _iter_models(self, lines):
+        """Iterate over the atoms of each model in the file (PRIVATE).
+
+        Yields the model serial number, the ATOM and HETATM lines, and their
+        line numbers. Stops at the end of the atomic data, setting the
+        trailer to the remaining lines.
+        """
+        serial_num = 0
+        atom_lines = []
+        numbers = []
+        for number, line in enumerate(lines, 1):
+            record_type = line[0:6]
+            if record_type == "ATOM  " or record_type == "HETATM":
+                atom_lines.append(line)
+                numbers.append(number)
+            elif record_type == "MODEL " or record_type == "ENDMDL":
+                if atom_lines:
+                    yield serial_num, atom_lines, numbers
+                    atom_lines = []
+                    numbers = []
+                if record_type == "MODEL ":
+                    try:
+                        serial_num = int(line[10:14])
+                    except Exception:
+                        # Already reported when parsing the first model
+                        serial_num = 0
+            elif record_type == "END   " or record_type == "CONECT":
+                # End of atomic data, the rest is the trailer
+                self.trailer = [line] + list(lines)
+                break
+        if atom_lines:
+            yield serial_num, atom_lines, numbers
+
+    def _get_frame_coord(self, atom_lines, numbers):
+        """Return the N x 3 coordinates from ATOM and HETATM lines (PRIVATE)."""
+        parsed = _parse_columns(atom_lines, _ATOM_FIELDS[:3])
+        if parsed is not None:
+            values, invalid = parsed
+            if invalid is None:
+                # Match the precision of numpy.array((x, y, z), "f")
+                return values.astype("f")
+            # Same error as in the line by line parser
+            raise PDBConstructionException(
+                "Invalid or missing coordinate(s) at line %i."
+                % numbers[numpy.flatnonzero(invalid.any(axis=1))[0]])
+        coord = numpy.zeros((len(atom_lines), 3), "f")
+        for i, line in enumerate(atom_lines):
+            try:
+                coord[i] = (float(line[30:38]), float(line[38:46]),
+                            float(line[46:54]))
+            except Exception:
+                raise PDBConstructionException(
+                    "Invalid or missing coordinate(s) at line %i." % numbers[i])
+        return coord
+
     def _get_header(self, header_coords_trailer):
         """Get the header of the PDB file, return the rest (PRIVATE)."""
         structure_builder = self.structure_builder
@@ -122,8 +403,27 @@ class PDBParser(object):
         header_dict = _parse_pdb_header_list(header)
         return header_dict, coords_trailer
 
-    def _parse_coordinates(self, coords_trailer):
-        """Parse the atomic data in the PDB file (PRIVATE)."""
+    def _parse_coordinates(self, coords_trailer, columns=None):
+        """Parse the atomic data in the PDB file (PRIVATE).
+
+        The optional columns dictionary holds the values of the numeric
+        fields already parsed in bulk for some record types (as returned
+        by the _prepare_columns method), which are then used in order.
+        """
+        if columns is None:
+            columns = {}
+        atom_values = columns.get("ATOM  ")
+        if atom_values is not None:
+            atom_values = iter(atom_values)
+        anisou_values = columns.get("ANISOU")
+        if anisou_values is not None:
+            anisou_values = iter(anisou_values)
+        siguij_values = columns.get("SIGUIJ")
+        if siguij_values is not None:
+            siguij_values = iter(siguij_values)
+        sigatm_values = columns.get("SIGATM")
+        if sigatm_values is not None:
+            sigatm_values = iter(sigatm_values)
         local_line_counter = 0
         structure_builder = self.structure_builder
         current_model_id = 0
@@ -171,36 +471,50 @@ class PDBParser(object):
                 else:
                     hetero_flag = " "
                 residue_id = (hetero_flag, resseq, icode)
-                # atomic coordinates
-                try:
-                    x = float(line[30:38])
-                    y = float(line[38:46])
-                    z = float(line[46:54])
-                except Exception:
-                    # Should we allow parsing to continue in permissive mode?
-                    # If so, what coordinates should we default to?  Easier to abort!
-                    raise PDBConstructionException("Invalid or missing coordinate(s) at line %i."
-                                                   % global_line_counter)
-                coord = numpy.array((x, y, z), "f")
-                # occupancy & B factor
-                try:
-                    occupancy = float(line[54:60])
-                except Exception:
-                    self._handle_PDB_exception("Invalid or missing occupancy",
-                                               global_line_counter)
-                    occupancy = None  # Rather than arbitrary zero or one
-                if occupancy is not None and occupancy < 0:
-                    # TODO - Should this be an error in strict mode?
-                    # self._handle_PDB_exception("Negative occupancy",
-                    #                            global_line_counter)
-                    # This uses fixed text so the warning occurs once only:
-                    warnings.warn("Negative occupancy in one or more atoms", PDBConstructionWarning)
-                try:
-                    bfactor = float(line[60:66])
-                except Exception:
-                    self._handle_PDB_exception("Invalid or missing B factor",
-                                               global_line_counter)
-                    bfactor = 0.0  # The PDB use a default of zero if the data is missing
+                if atom_values is not None:
+                    # Already parsed in bulk
+                    coord, occupancy, bfactor = next(atom_values)
+                    if occupancy is None:
+                        self._handle_PDB_exception("Invalid or missing occupancy",
+                                                   global_line_counter)
+                    elif occupancy < 0:
+                        warnings.warn("Negative occupancy in one or more atoms",
+                                      PDBConstructionWarning)
+                    if bfactor is None:
+                        self._handle_PDB_exception("Invalid or missing B factor",
+                                                   global_line_counter)
+                        bfactor = 0.0
+                else:
+                    # atomic coordinates
+                    try:
+                        x = float(line[30:38])
+                        y = float(line[38:46])
+                        z = float(line[46:54])
+                    except Exception:
+                        # Should we allow parsing to continue in permissive mode?
+                        # If so, what coordinates should we default to?  Easier to abort!
+                        raise PDBConstructionException("Invalid or missing coordinate(s) at line %i."
+                                                       % global_line_counter)
+                    coord = numpy.array((x, y, z), "f")
+                    # occupancy & B factor
+                    try:
+                        occupancy = float(line[54:60])
+                    except Exception:
+                        self._handle_PDB_exception("Invalid or missing occupancy",
+                                                   global_line_counter)
+                        occupancy = None  # Rather than arbitrary zero or one
+                    if occupancy is not None and occupancy < 0:
+                        # TODO - Should this be an error in strict mode?
+                        # self._handle_PDB_exception("Negative occupancy",
+                        #                            global_line_counter)
+                        # This uses fixed text so the warning occurs once only:
+                        warnings.warn("Negative occupancy in one or more atoms", PDBConstructionWarning)
+                    try:
+                        bfactor = float(line[60:66])
+                    except Exception:
+                        self._handle_PDB_exception("Invalid or missing B factor",
+                                                   global_line_counter)
+                        bfactor = 0.0  # The PDB use a default of zero if the data is missing
                 segid = line[72:76]
                 element = line[76:78].strip().upper()
                 if current_segid != segid:
@@ -229,10 +543,13 @@ class PDBParser(object):
                 except PDBConstructionException as message:
                     self._handle_PDB_exception(message, global_line_counter)
             elif record_type == "ANISOU":
-                anisou = [float(x) for x in (line[28:35], line[35:42], line[43:49],
-                                             line[49:56], line[56:63], line[63:70])]
-                # U's are scaled by 10^4
-                anisou_array = (numpy.array(anisou, "f") / 10000.0).astype("f")
+                if anisou_values is not None:
+                    anisou_array = next(anisou_values)
+                else:
+                    anisou = [float(x) for x in (line[28:35], line[35:42], line[43:49],
+                                                 line[49:56], line[56:63], line[63:70])]
+                    # U's are scaled by 10^4
+                    anisou_array = (numpy.array(anisou, "f") / 10000.0).astype("f")
                 structure_builder.set_anisou(anisou_array)
             elif record_type == "MODEL ":
                 try:
@@ -256,16 +573,22 @@ class PDBParser(object):
                 current_residue_id = None
             elif record_type == "SIGUIJ":
                 # standard deviation of anisotropic B factor
-                siguij = [float(x) for x in (line[28:35], line[35:42], line[42:49],
-                                             line[49:56], line[56:63], line[63:70])]
-                # U sigma's are scaled by 10^4
-                siguij_array = (numpy.array(siguij, "f") / 10000.0).astype("f")
+                if siguij_values is not None:
+                    siguij_array = next(siguij_values)
+                else:
+                    siguij = [float(x) for x in (line[28:35], line[35:42], line[42:49],
+                                                 line[49:56], line[56:63], line[63:70])]
+                    # U sigma's are scaled by 10^4
+                    siguij_array = (numpy.array(siguij, "f") / 10000.0).astype("f")
                 structure_builder.set_siguij(siguij_array)
             elif record_type == "SIGATM":
                 # standard deviation of atomic positions
-                sigatm = [float(x) for x in (line[30:38], line[38:45], line[46:54],
-                                             line[54:60], line[60:66])]
-                sigatm_array = numpy.array(sigatm, "f")
+                if sigatm_values is not None:
+                    sigatm_array = next(sigatm_values)
+                else:
+                    sigatm = [float(x) for x in (line[30:38], line[38:45], line[46:54],
+                                                 line[54:60], line[60:66])]
+                    sigatm_array = numpy.array(sigatm, "f")
                 structure_builder.set_sigatm(sigatm_array)
             local_line_counter += 1
         # EOF (does not end in END or CONECT)
@@ -53,11 +53,13 @@ from Bio._py3k import basestring
 
 import warnings
 
+import numpy
+
 from Bio.Alphabet import generic_protein
 from Bio.Data import SCOPData
 from Bio.Seq import Seq
 from Bio.PDB.PDBExceptions import PDBException
-from Bio.PDB.Vector import calc_dihedral, calc_angle
+from Bio.PDB.Vector import calc_dihedrals, calc_angles
 
 __docformat__ = "restructuredtext en"
 
@@ -202,60 +204,74 @@ class Polypeptide(list):
             ca_list.append(ca)
         return ca_list
 
+    def _get_atom_coord(self, names):
+        """Return an array of the coordinates of the named atoms (PRIVATE).
+
+        The array has a row for each residue and a column for each name,
+        with NaN for any missing atoms.
+        """
+        coord = numpy.empty((len(self), len(names), 3))
+        coord.fill(numpy.nan)
+        for i, res in enumerate(self):
+            for j, name in enumerate(names):
+                if res.has_id(name):
+                    coord[i, j] = res[name].get_coord()
+        return coord
+
+    def get_phi_psi_omega(self):
+        """Return arrays of the phi, psi and omega dihedral angles.
+
+        All the angles are calculated at once from arrays of the backbone
+        coordinates (using calc_dihedrals), so this is much faster than
+        get_phi_psi_list for large numbers of residues.
+
+        @return: arrays phi, psi and omega (in radians) with one value per
+        residue, or NaN where the angle is undefined (i.e. phi of the first
+        residue, psi and omega of the last residue, or where atoms are
+        missing). The omega angle of a residue is that of the peptide bond
+        to the next residue, CA-C-N-CA.
+        @rtype: (Numeric array, Numeric array, Numeric array)
+        """
+        backbone = self._get_atom_coord(("N", "CA", "C"))
+        n = backbone[:, 0]
+        ca = backbone[:, 1]
+        c = backbone[:, 2]
+        phi = numpy.empty(len(self))
+        phi.fill(numpy.nan)
+        psi = phi.copy()
+        omega = phi.copy()
+        if len(self) > 1:
+            phi[1:] = calc_dihedrals(numpy.array(
+                [c[:-1], n[1:], ca[1:], c[1:]]).transpose(1, 0, 2))
+            psi[:-1] = calc_dihedrals(numpy.array(
+                [n[:-1], ca[:-1], c[:-1], n[1:]]).transpose(1, 0, 2))
+            omega[:-1] = calc_dihedrals(numpy.array(
+                [ca[:-1], c[:-1], n[1:], ca[1:]]).transpose(1, 0, 2))
+        return phi, psi, omega
+
     def get_phi_psi_list(self):
         """Return the list of phi/psi dihedral angles."""
+        phi, psi, omega = self.get_phi_psi_omega()
         ppl = []
-        lng = len(self)
-        for i in range(0, lng):
-            res = self[i]
-            try:
-                n = res['N'].get_vector()
-                ca = res['CA'].get_vector()
-                c = res['C'].get_vector()
-            except Exception:
-                # Some atoms are missing
-                # Phi/Psi cannot be calculated for this residue
-                ppl.append((None, None))
-                res.xtra["PHI"] = None
-                res.xtra["PSI"] = None
-                continue
-            # Phi
-            if i > 0:
-                rp = self[i - 1]
-                try:
-                    cp = rp['C'].get_vector()
-                    phi = calc_dihedral(cp, n, ca, c)
-                except Exception:
-                    phi = None
-            else:
-                # No phi for residue 0!
-                phi = None
-            # Psi
-            if i < (lng - 1):
-                rn = self[i + 1]
-                try:
-                    nn = rn['N'].get_vector()
-                    psi = calc_dihedral(n, ca, c, nn)
-                except Exception:
-                    psi = None
-            else:
-                # No psi for last residue!
-                psi = None
-            ppl.append((phi, psi))
+        for res, angles in zip(self, zip(phi, psi)):
+            # Phi/Psi cannot be calculated where atoms are missing
+            angles = tuple(None if numpy.isnan(a) else float(a)
+                           for a in angles)
+            ppl.append(angles)
             # Add Phi/Psi to xtra dict of residue
-            res.xtra["PHI"] = phi
-            res.xtra["PSI"] = psi
+            res.xtra["PHI"], res.xtra["PSI"] = angles
         return ppl
 
     def get_tau_list(self):
         """List of tau torsions angles for all 4 consecutive Calpha atoms."""
         ca_list = self.get_ca_list()
-        tau_list = []
-        for i in range(0, len(ca_list) - 3):
-            atom_list = (ca_list[i], ca_list[i + 1], ca_list[i + 2], ca_list[i + 3])
-            v1, v2, v3, v4 = [a.get_vector() for a in atom_list]
-            tau = calc_dihedral(v1, v2, v3, v4)
-            tau_list.append(tau)
+        ca = numpy.array([a.get_coord() for a in ca_list], "d")
+        if len(ca_list) < 4:
+            return []
+        windows = numpy.array([ca[i:len(ca) - 3 + i] for i in range(4)])
+        tau_list = [float(tau) for tau in
+                    calc_dihedrals(windows.transpose(1, 0, 2))]
+        for i, tau in enumerate(tau_list):
             # Put tau in xtra dict of residue
             res = ca_list[i + 2].get_parent()
             res.xtra["TAU"] = tau
@@ -263,14 +279,15 @@ class Polypeptide(list):
 
     def get_theta_list(self):
         """List of theta angles for all 3 consecutive Calpha atoms."""
-        theta_list = []
         ca_list = self.get_ca_list()
-        for i in range(0, len(ca_list) - 2):
-            atom_list = (ca_list[i], ca_list[i + 1], ca_list[i + 2])
-            v1, v2, v3 = [a.get_vector() for a in atom_list]
-            theta = calc_angle(v1, v2, v3)
-            theta_list.append(theta)
-            # Put tau in xtra dict of residue
+        ca = numpy.array([a.get_coord() for a in ca_list], "d")
+        if len(ca_list) < 3:
+            return []
+        windows = numpy.array([ca[i:len(ca) - 2 + i] for i in range(3)])
+        theta_list = [float(theta) for theta in
+                      calc_angles(windows.transpose(1, 0, 2))]
+        for i, theta in enumerate(theta_list):
+            # Put theta in xtra dict of residue
             res = ca_list[i + 1].get_parent()
             res.xtra["THETA"] = theta
         return theta_list
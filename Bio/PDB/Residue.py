@@ -85,6 +85,7 @@ class Residue(Entity):
 
     def sort(self):
         self.child_list.sort(self._sort)
+        self._atom_array_changed()
 
     def flag_disordered(self):
         "Set the disordered flag."
@@ -165,3 +166,5 @@ class DisorderedResidue(DisorderedEntityWrapper):
         assert(not self.disordered_has_id(resname))
         self[resname] = residue
         self.disordered_select(resname)
+        if chain is not None:
+            chain._atom_array_changed()
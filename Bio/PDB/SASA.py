@@ -0,0 +1,263 @@
+# Copyright 2016 by Biopython contributors.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Solvent accessible surface area using the Shrake-Rupley algorithm.
+
+Unlike the DSSP, NACCESS and ResidueDepth modules, which run external
+programs, this calculates the solvent accessible surface area (SASA) itself.
+Each atom is given a sphere of its van der Waals radius plus the radius of
+the solvent probe, and a set of evenly spread points on the sphere is tested
+against the spheres of the neighboring atoms. The accessible area of an atom
+is then its sphere's area times the fraction of points not buried.
+
+The points of many atoms are tested at once with NumPy, with the neighbors
+found using a Bio.PDB.CellList grid. The ShrakeRupley class works like the
+other property maps in Bio.PDB, recording the areas in the xtra dictionary
+of each Atom, Residue, Chain or Model under the key "EXP_SASA":
+
+>>> from Bio.PDB import PDBParser
+>>> from Bio.PDB.SASA import ShrakeRupley
+>>> structure = PDBParser().get_structure("1A8O", "PDB/1A8O.pdb")
+>>> model = structure[0]
+>>> sasa = ShrakeRupley(model)
+>>> residue = model["A"][152]
+>>> print("%0.1f" % residue.xtra["EXP_SASA"])
+85.8
+>>> print("%0.1f" % sasa[("A", 152)])
+85.8
+
+Reference:
+
+Shrake, A; Rupley, JA. (1973). Environment and exposure to solvent of
+protein atoms. Lysozyme and insulin. J Mol Biol 79(2):351-71.
+"""
+
+import numpy
+
+from Bio.PDB.AbstractPropertyMap import AbstractPropertyMap
+from Bio.PDB.CellList import CellList
+from Bio.PDB.PDBExceptions import PDBException
+from Bio.PDB.Selection import unfold_entities
+
+__docformat__ = "restructuredtext en"
+
+# Van der Waals radii (in Angstroms) keyed on element, from Bondi (1964)
+# J Phys Chem 68:441-451, and Rowland and Taylor (1996) J Phys Chem
+# 100:7384-7391 for hydrogen
+ATOMIC_RADII = {"H": 1.10, "C": 1.70, "N": 1.55, "O": 1.52, "F": 1.47,
+                "P": 1.80, "S": 1.80, "CL": 1.75, "SE": 1.90, "BR": 1.85,
+                "I": 1.98, "NA": 2.27, "MG": 1.73, "K": 2.75, "ZN": 1.39,
+                "CU": 1.40, "FE": 1.94, "CA": 2.31, "MN": 1.97, "NI": 1.63,
+                "CD": 1.58, "HG": 1.55}
+
+
+def _sphere_points(n_points):
+    """Return n_points spread evenly over the unit sphere (PRIVATE).
+
+    Uses the golden section spiral, giving an n_points x 3 array.
+    """
+    k = numpy.arange(n_points) + 0.5
+    z = 1.0 - 2.0 * k / n_points
+    r = numpy.sqrt(1.0 - z * z)
+    phi = numpy.pi * (1.0 + numpy.sqrt(5.0)) * k
+    return numpy.array([r * numpy.cos(phi), r * numpy.sin(phi), z]).T
+
+
+def shrake_rupley(coord, radii, probe_radius=1.40, n_points=100,
+                  block_size=128):
+    """Return the solvent accessible surface area of each atom.
+
+    Arguments:
+
+     - coord - N x 3 array of atomic coordinates
+     - radii - array of the N atomic radii
+     - probe_radius - float, radius of the solvent probe (DEFAULT 1.40)
+     - n_points - number of points on the sphere of each atom (more points
+       are more accurate, but slower)
+     - block_size - number of atoms whose points are tested at once
+
+    Returns an array of the N areas, in square Angstroms if the coordinates
+    are in Angstroms.
+    """
+    coord = numpy.array(coord, "d").reshape((-1, 3))
+    radii = numpy.array(radii, "d").reshape(-1) + probe_radius
+    if len(radii) != len(coord):
+        raise ValueError("Expected %i radii, not %i"
+                         % (len(coord), len(radii)))
+    if n_points < 1:
+        raise ValueError("Need at least one point per atom, not %r" % n_points)
+    area = numpy.zeros(len(coord))
+    if not len(coord):
+        return area
+    points = _sphere_points(n_points)
+    # Spheres of two atoms can only touch within twice the largest radius
+    cells = CellList(coord, 2.0 * radii.max())
+    for start in range(0, len(coord), block_size):
+        end = min(start + block_size, len(coord))
+        indptr, indices = cells.search(coord[start:end])
+        owner = numpy.repeat(numpy.arange(start, end), numpy.diff(indptr))
+        # Keep the other atoms whose spheres overlap this one
+        delta = coord[indices] - coord[owner]
+        keep = (indices != owner) & ((delta * delta).sum(axis=1) <
+                                     (radii[indices] + radii[owner]) ** 2)
+        owner = owner[keep]
+        other = indices[keep]
+        spheres = coord[start:end, numpy.newaxis, :] + \
+            radii[start:end, numpy.newaxis, numpy.newaxis] * points
+        buried = numpy.zeros((end - start, n_points), bool)
+        if len(owner):
+            delta = spheres[owner - start] - coord[other, numpy.newaxis, :]
+            hits = (delta * delta).sum(axis=2) < \
+                (radii[other] ** 2)[:, numpy.newaxis]
+            # The pairs are sorted by owner, so combine each owner's rows
+            firsts = numpy.flatnonzero(numpy.concatenate(
+                [[True], owner[1:] != owner[:-1]]))
+            buried[owner[firsts] - start] = \
+                numpy.logical_or.reduceat(hits, firsts, axis=0)
+        exposed = (n_points - buried.sum(axis=1)) / float(n_points)
+        area[start:end] = 4.0 * numpy.pi * radii[start:end] ** 2 * exposed
+    return area
+
+
+def _get_radii(atoms, radii):
+    """Return an array of the radius of each atom, by element (PRIVATE)."""
+    if radii is None:
+        radii = ATOMIC_RADII
+    values = numpy.zeros(len(atoms))
+    for i, atom in enumerate(atoms):
+        try:
+            values[i] = radii[atom.element]
+        except KeyError:
+            raise PDBException("No radius for element %r of atom %s"
+                               % (atom.element, atom.get_full_id()))
+    return values
+
+
+def _shrake_rupley_worker(args):
+    """Calculate the atomic areas in a worker process (PRIVATE)."""
+    return shrake_rupley(*args)
+
+
+class ShrakeRupley(AbstractPropertyMap):
+    """Solvent accessible surface area of the atoms in a Model, Chain or Residue.
+
+    Maps the entities at the chosen level to their accessible surface area
+    (the sum of the areas of their atoms), which is also stored in their
+    xtra dictionary under the key "EXP_SASA". The keys are like those of
+    the NACCESS classes, i.e. (chain id, residue id) for residues and
+    (chain id, residue id, atom id) for atoms, or the chain id or model id.
+    """
+
+    def __init__(self, entity, level="R", probe_radius=1.40, n_points=100,
+                 radii=None, atom_sasa=None):
+        """Calculate the accessible surface area.
+
+        Arguments:
+
+         - entity - Model, Chain or Residue, all of whose atoms are used
+         - level - char (A, R, C, M), the level of the entities to report
+         - probe_radius - float, radius of the solvent probe
+         - n_points - number of points on the sphere of each atom
+         - radii - optional dictionary of atomic radii keyed on element,
+           by default ATOMIC_RADII
+         - atom_sasa - optional array of already calculated areas of the
+           atoms, in the order of Selection.unfold_entities([entity], "A")
+           (as from the shrake_rupley_models function)
+        """
+        levels = "ARCM"
+        if entity.level not in levels:
+            raise PDBException("Expected a Model, Chain or Residue, not %s"
+                               % entity.level)
+        if level not in levels:
+            raise PDBException("%s: Unknown level" % level)
+        if levels.index(level) > levels.index(entity.level):
+            raise PDBException("Level %s is above the %s level of the entity"
+                               % (level, entity.level))
+        self.level = level
+        atoms = unfold_entities([entity], "A")
+        if atom_sasa is None:
+            atom_sasa = shrake_rupley([atom.coord for atom in atoms],
+                                      _get_radii(atoms, radii),
+                                      probe_radius, n_points)
+        # Add up the areas of the atoms of each entity at the level
+        entities = []
+        totals = []
+        seen = {}
+        for atom, area in zip(atoms, atom_sasa):
+            parent = atom
+            while parent.level != level:
+                parent = parent.get_parent()
+            try:
+                totals[seen[id(parent)]] += area
+            except KeyError:
+                seen[id(parent)] = len(entities)
+                entities.append(parent)
+                totals.append(area)
+        property_dict = {}
+        property_keys = []
+        property_list = []
+        for parent, area in zip(entities, totals):
+            area = float(area)
+            full_id = parent.get_full_id()
+            if level == "A":
+                key = (full_id[2], full_id[3], parent.get_id())
+            elif level == "R":
+                key = (full_id[2], full_id[3])
+            else:
+                key = parent.get_id()
+            property_dict[key] = area
+            property_keys.append(key)
+            property_list.append((parent, area))
+            parent.xtra["EXP_SASA"] = area
+        AbstractPropertyMap.__init__(self, property_dict, property_keys,
+                                     property_list)
+
+    def _translate_id(self, entity_id):
+        if self.level == "R":
+            chain_id, res_id = entity_id
+            if isinstance(res_id, int):
+                entity_id = (chain_id, (" ", res_id, " "))
+        elif self.level == "A":
+            chain_id, res_id, atom_id = entity_id
+            if isinstance(res_id, int):
+                entity_id = (chain_id, (" ", res_id, " "), atom_id)
+        return entity_id
+
+
+def shrake_rupley_models(entities, level="R", probe_radius=1.40,
+                         n_points=100, radii=None, processes=1):
+    """Calculate the accessible surface area of many entities.
+
+    Arguments:
+
+     - entities - list of Model, Chain or Residue objects (e.g. the models
+       of several structures)
+     - level, probe_radius, n_points, radii - as for ShrakeRupley
+     - processes - number of worker processes to use (default 1, meaning
+       do all the work in this process)
+
+    Returns a list of ShrakeRupley objects, one for each entity. With more
+    than one process, each entity's atomic areas are calculated in a
+    worker process.
+    """
+    if processes < 1:
+        raise ValueError("Need at least one process, not %r" % processes)
+    jobs = []
+    for entity in entities:
+        atoms = unfold_entities([entity], "A")
+        jobs.append((numpy.array([atom.coord for atom in atoms], "d"),
+                     _get_radii(atoms, radii), probe_radius, n_points))
+    if processes == 1 or len(jobs) < 2:
+        areas = [_shrake_rupley_worker(job) for job in jobs]
+    else:
+        import multiprocessing
+        pool = multiprocessing.Pool(processes)
+        try:
+            areas = pool.map(_shrake_rupley_worker, jobs)
+        finally:
+            pool.close()
+            pool.join()
+    return [ShrakeRupley(entity, level, probe_radius, n_points, radii, area)
+            for entity, area in zip(entities, areas)]
@@ -3,7 +3,39 @@
 # license.  Please see the LICENSE file that should have been included
 # as part of this package.
 
-"""Superimpose two structures."""
+"""Superimpose two structures.
+
+As well as the Superimposer class for a single pair of atom lists, this
+module has functions working on many sets of coordinates at once, given as
+an F x N x 3 array (F frames, e.g. models from an NMR ensemble or an MD
+trajectory, each with the same N atoms):
+
+ - superimpose_frames - superimpose every frame onto a reference
+ - rmsd_matrix - the F x F matrix of the RMSD after superimposing each
+   pair of frames, as used for clustering
+
+For example, using the C-alpha atoms of the 20 models in an NMR ensemble:
+
+>>> import numpy
+>>> from Bio.PDB import PDBParser
+>>> from Bio.PDB.Superimposer import rmsd_matrix
+>>> structure = PDBParser().get_structure("1MOT", "PDB/1MOT.pdb")
+>>> frames = numpy.array([[residue["CA"].get_coord() for residue in model.get_residues()]
+...                       for model in structure])
+>>> frames.shape
+(20, 28, 3)
+>>> rmsd = rmsd_matrix(frames)
+>>> rmsd.shape
+(20, 20)
+>>> print("%0.2f" % rmsd[0, 1])
+6.10
+
+Rather than looping over the frames (or pairs of frames) in Python, these
+work on whole stacks of 3 x 3 correlation matrices at once using NumPy:
+superimpose_frames uses the Kabsch algorithm (like SVDSuperimposer), while
+rmsd_matrix uses the QCP method (like QCPSuperimposer), which gives the
+RMSD without calculating the rotation.
+"""
 
 from __future__ import print_function
 
@@ -15,6 +47,203 @@ from Bio.PDB.PDBExceptions import PDBException
 __docformat__ = "restructuredtext en"
 
 
+def _center_frames(frames):
+    """Return the frames (as float64) moved to their centroids, and the centroids (PRIVATE)."""
+    frames = numpy.asarray(frames, "d")
+    if frames.ndim != 3 or frames.shape[2] != 3:
+        raise ValueError("Expected an F x N x 3 array of coordinates, not shape %r"
+                         % (frames.shape,))
+    if not frames.shape[1]:
+        raise ValueError("Need at least one atom per frame")
+    centroids = frames.mean(axis=1)
+    return frames - centroids[:, numpy.newaxis, :], centroids
+
+
+def superimpose_frames(reference, frames):
+    """Superimpose each of the frames onto the reference coordinates.
+
+    Arguments:
+     - reference - an N x 3 array of coordinates
+     - frames - an F x N x 3 array of coordinates
+
+    Returns a tuple of three arrays: the F right multiplying rotation
+    matrices (F x 3 x 3), the F translation vectors (F x 3), and the F
+    RMSD values after superposition. So for frame i, the equivalent of
+    SVDSuperimposer.get_transformed() is numpy.dot(frames[i], rot[i]) +
+    tran[i].
+    """
+    reference = numpy.asarray(reference, "d")
+    coords, av1 = _center_frames(frames)
+    if reference.shape != coords.shape[1:]:
+        raise ValueError("Reference shape %r does not match frames shape %r"
+                         % (reference.shape, coords.shape))
+    av2 = reference.mean(axis=0)
+    reference = reference - av2
+    # Correlation matrices, one per frame
+    a = numpy.einsum("fni,nj->fij", coords, reference)
+    u, d, vt = numpy.linalg.svd(a)
+    rot = numpy.einsum("fij,fjk->fik", u, vt)
+    # Fix any reflections
+    reflected = numpy.linalg.det(rot) < 0
+    if reflected.any():
+        vt[reflected, 2] = -vt[reflected, 2]
+        rot[reflected] = numpy.einsum("fij,fjk->fik", u[reflected], vt[reflected])
+    tran = av2 - numpy.einsum("fi,fij->fj", av1, rot)
+    diff = numpy.einsum("fni,fij->fnj", coords, rot) - reference
+    rms = numpy.sqrt((diff * diff).sum(axis=2).sum(axis=1) / coords.shape[1])
+    return rot, tran, rms
+
+
+def _qcp_max_eigenvalue(a, e0, precision=1e-11, max_iterations=50):
+    """Return the largest eigenvalues of the QCP key matrices (PRIVATE).
+
+    Arguments:
+     - a - array of 3 x 3 correlation matrices (any leading shape)
+     - e0 - matching array of (G1 + G2) / 2, the starting value
+
+    This is the quaternion characteristic polynomial (QCP) method of
+    Theobald (2005), as used in Bio.PDB.QCPSuperimposer, but applying the
+    Newton-Raphson iterations to all the matrices at once.
+    """
+    sxx, sxy, sxz = a[..., 0, 0], a[..., 0, 1], a[..., 0, 2]
+    syx, syy, syz = a[..., 1, 0], a[..., 1, 1], a[..., 1, 2]
+    szx, szy, szz = a[..., 2, 0], a[..., 2, 1], a[..., 2, 2]
+    sxx2 = sxx * sxx
+    syy2 = syy * syy
+    szz2 = szz * szz
+    sxy2 = sxy * sxy
+    syz2 = syz * syz
+    sxz2 = sxz * sxz
+    syx2 = syx * syx
+    szy2 = szy * szy
+    szx2 = szx * szx
+    syzszymsyyszz2 = 2.0 * (syz * szy - syy * szz)
+    sxx2syy2szz2syz2szy2 = syy2 + szz2 - sxx2 + syz2 + szy2
+    c2 = -2.0 * (sxx2 + syy2 + szz2 + sxy2 + syx2 + sxz2 + szx2 + syz2 + szy2)
+    c1 = 8.0 * (sxx * syz * szy + syy * szx * sxz + szz * sxy * syx -
+                sxx * syy * szz - syz * szx * sxy - szy * syx * sxz)
+    sxzpszx = sxz + szx
+    syzpszy = syz + szy
+    sxypsyx = sxy + syx
+    syzmszy = syz - szy
+    sxzmszx = sxz - szx
+    sxymsyx = sxy - syx
+    sxxpsyy = sxx + syy
+    sxxmsyy = sxx - syy
+    sxy2sxz2syx2szx2 = sxy2 + sxz2 - syx2 - szx2
+    c0 = (sxy2sxz2syx2szx2 * sxy2sxz2syx2szx2 +
+          (sxx2syy2szz2syz2szy2 + syzszymsyyszz2) *
+          (sxx2syy2szz2syz2szy2 - syzszymsyyszz2) +
+          (-sxzpszx * syzmszy + sxymsyx * (sxxmsyy - szz)) *
+          (-sxzmszx * syzpszy + sxymsyx * (sxxmsyy + szz)) +
+          (-sxzpszx * syzpszy - sxypsyx * (sxxpsyy - szz)) *
+          (-sxzmszx * syzmszy - sxypsyx * (sxxpsyy + szz)) +
+          (sxypsyx * syzpszy + sxzpszx * (sxxmsyy + szz)) *
+          (-sxymsyx * syzmszy + sxzpszx * (sxxpsyy + szz)) +
+          (sxypsyx * syzmszy + sxzmszx * (sxxmsyy - szz)) *
+          (-sxymsyx * syzpszy + sxzmszx * (sxxpsyy - szz)))
+    eigenvalue = numpy.array(e0, "d")
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        for i in range(max_iterations):
+            x2 = eigenvalue * eigenvalue
+            b = (x2 + c2) * eigenvalue
+            a = b + c1
+            delta = (a * eigenvalue + c0) / (2.0 * x2 * eigenvalue + b + a)
+            # Where the derivative is zero (e.g. all atoms at the origin),
+            # the starting value is already the answer
+            delta[~numpy.isfinite(delta)] = 0.0
+            eigenvalue -= delta
+            if (numpy.abs(delta) <= numpy.abs(precision * eigenvalue)).all():
+                break
+    return eigenvalue
+
+
+def _rmsd_rows(columns, sizes, n, start, end):
+    """Calculate rows start to end of the RMSD matrix (PRIVATE).
+
+    Arguments:
+     - columns - list of the x, y and z coordinates of the centered frames,
+       each as an F x N array
+     - sizes - array of the sum of squared coordinates of each frame
+     - n - number of atoms
+
+    The 3 x 3 correlation matrices between each pair of frames come from
+    nine matrix products, and the minimal RMSD from the QCP method, which
+    does not need the rotation matrices.
+    """
+    f = len(sizes)
+    a = numpy.empty((end - start, f, 3, 3))
+    for i in range(3):
+        for j in range(3):
+            a[:, :, i, j] = numpy.dot(columns[i][start:end], columns[j].T)
+    e0 = (sizes[start:end, numpy.newaxis] + sizes) / 2.0
+    msd = 2.0 * (e0 - _qcp_max_eigenvalue(a, e0)) / n
+    return numpy.sqrt(numpy.abs(msd))
+
+
+# Set in each worker process by _init_rmsd_worker
+_worker_args = None
+
+
+def _init_rmsd_worker(columns, sizes, n):
+    """Store the centered frames in a worker process (PRIVATE)."""
+    global _worker_args
+    _worker_args = (columns, sizes, n)
+
+
+def _rmsd_rows_worker(bounds):
+    """Calculate some rows of the RMSD matrix in a worker process (PRIVATE)."""
+    columns, sizes, n = _worker_args
+    return _rmsd_rows(columns, sizes, n, bounds[0], bounds[1])
+
+
+def rmsd_matrix(frames, processes=1, block_size=None):
+    """Return the F x F matrix of RMSD values between each pair of frames.
+
+    Arguments:
+     - frames - an F x N x 3 array of coordinates
+     - processes - number of worker processes to use (default 1, meaning
+       do all the work in this process)
+     - block_size - optional number of rows of the matrix to calculate at
+       once (by default, enough for about a million pairs)
+
+    Entry [i, j] is the RMSD between frames i and j after optimal
+    superposition, as calculated by SVDSuperimposer. The correlation
+    matrices for each block of pairs are calculated with matrix products
+    rather than pair by pair, and the RMSD values using the QCP method (as
+    in QCPSuperimposer) applied to the whole block at once. The blocks are
+    shared out between the processes if more than one is requested.
+    """
+    coords, av = _center_frames(frames)
+    f, n = coords.shape[:2]
+    columns = [numpy.ascontiguousarray(coords[:, :, i]) for i in range(3)]
+    sizes = (coords * coords).sum(axis=2).sum(axis=1)
+    if block_size is None:
+        block_size = max(1, 1000000 // max(f, 1))
+    if processes < 1:
+        raise ValueError("Need at least one process, not %r" % processes)
+    bounds = [(start, min(start + block_size, f))
+              for start in range(0, f, block_size)]
+    if processes == 1 or len(bounds) < 2:
+        blocks = [_rmsd_rows(columns, sizes, n, start, end)
+                  for start, end in bounds]
+    else:
+        import multiprocessing
+        pool = multiprocessing.Pool(processes, _init_rmsd_worker,
+                                    (columns, sizes, n))
+        try:
+            blocks = pool.map(_rmsd_rows_worker, bounds)
+        finally:
+            pool.close()
+            pool.join()
+    if not blocks:
+        return numpy.zeros((0, 0))
+    matrix = numpy.concatenate(blocks)
+    # Remove any rounding error on the diagonal
+    matrix[numpy.arange(f), numpy.arange(f)] = 0.0
+    return matrix
+
+
 class Superimposer(object):
     """
     Rotate/translate one set of atoms on top of another,
@@ -0,0 +1,192 @@
+# Copyright 2016 by Biopython contributors.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Coordinates of many models (frames) sharing a single topology.
+
+Files with many models of the same molecule, such as NMR ensembles or
+snapshots from a molecular dynamics simulation saved as PDB or mmCIF, would
+normally be parsed into a complete Model, Chain, Residue and Atom tree for
+every model. A Trajectory instead holds a Structure with just the first
+model (the topology), and the coordinates of all the models as a single
+F x N x 3 array (F frames of N atoms) which can optionally be stored in
+a file on disk and memory mapped.
+
+Use the get_trajectory method of the PDBParser or MMCIFParser:
+
+>>> from Bio.PDB import PDBParser
+>>> parser = PDBParser(QUIET=True)
+>>> trajectory = parser.get_trajectory("1MOT", "PDB/1MOT.pdb")
+>>> trajectory
+<Trajectory with 20 frames of 408 atoms>
+>>> trajectory.coord.shape
+(20, 408, 3)
+>>> len(trajectory.structure)
+1
+
+Row i of each frame corresponds to row i of the AtomArray of the topology
+(see Bio.PDB.AtomArray). For per-frame analyses which need the Atom
+objects, the iter_models method updates the topology's coordinates to each
+frame in turn:
+
+>>> for index, model in enumerate(trajectory.iter_models()):
+...     ca = model["A"][250]["CA"]
+...     print("%0.3f %0.3f %0.3f" % tuple(ca.get_coord()))
+...     if index == 2:
+...         break
+2.181 -8.373 -7.892
+0.870 -8.765 0.292
+2.379 -8.214 -8.064
+"""
+
+import numpy
+
+__docformat__ = "restructuredtext en"
+
+
+def _atom_rows(atom_array):
+    """Map the identity of each atom to its row in an AtomArray (PRIVATE).
+
+    The keys are tuples of the chain id, residue id, residue name, full
+    atom name and alternative location, which the parsers can also
+    construct from the records in the file.
+    """
+    rows = {}
+    for row, atom in enumerate(atom_array.atoms):
+        residue = atom.get_parent()
+        key = (residue.get_parent().id, residue.id, residue.resname,
+               atom.fullname, atom.altloc)
+        rows.setdefault(key, row)
+    return rows
+
+
+def _row_order(rows, keys):
+    """Return an array of the row for each atom key, or -1 if none (PRIVATE).
+
+    Each row is only used once, so for example an atom dropped by the
+    StructureBuilder as a duplicate of an earlier one gets -1.
+    """
+    return numpy.array([rows.pop(key, -1) for key in keys], int)
+
+
+class _FrameStore(object):
+    """Collect frames of coordinates, in memory or in a file (PRIVATE)."""
+
+    def __init__(self, n_atoms, filename=None):
+        """Prepare to store frames of n_atoms.
+
+        Arguments:
+         - n_atoms - number of rows in each frame
+         - filename - optional file to write the frames to, which is then
+           memory mapped
+        """
+        self.n_atoms = n_atoms
+        self._filename = filename
+        self._frames = []
+        self._count = 0
+        if filename is None:
+            self._handle = None
+        else:
+            self._handle = open(filename, "wb")
+
+    def append(self, coord, order):
+        """Add a frame, given the coordinates in file order.
+
+        The order array gives the row for each atom as read from the file
+        (-1 to ignore the atom). Rows without an atom are set to NaN.
+        """
+        valid = order >= 0
+        frame = numpy.empty((self.n_atoms, 3), "f")
+        frame.fill(numpy.nan)
+        frame[order[valid]] = coord[valid]
+        if self._handle is None:
+            self._frames.append(frame)
+        else:
+            frame.tofile(self._handle)
+        self._count += 1
+
+    def close(self):
+        """Return the F x N x 3 array of all the frames."""
+        shape = (self._count, self.n_atoms, 3)
+        if self._handle is None:
+            if not self._frames:
+                return numpy.zeros(shape, "f")
+            return numpy.array(self._frames, "f")
+        self._handle.close()
+        self._handle = None
+        if not self._count or not self.n_atoms:
+            # Can't memory map an empty file
+            return numpy.zeros(shape, "f")
+        return numpy.memmap(self._filename, dtype="f", mode="r+",
+                            shape=shape)
+
+
+class Trajectory(object):
+    """A series of frames of coordinates for one topology.
+
+    Attributes:
+
+     - structure - Structure holding a single Model (the topology, built
+       from the first model in the file)
+     - coord - F x N x 3 array of the coordinates (float32) of all the
+       frames, a numpy.memmap if stored on disk
+     - serial_nums - list of the model serial numbers from the file
+
+    The atoms in each frame are in the same order as the AtomArray of the
+    structure, with NaN for any atom missing from a frame, so masks from
+    its get_atom_mask method can be used to pick out atoms from every
+    frame at once, e.g. trajectory.coord[:, mask].
+    """
+
+    def __init__(self, structure, coord, serial_nums=None):
+        """Create a Trajectory object.
+
+        Arguments:
+
+         - structure - Structure with a single Model
+         - coord - F x N x 3 array of coordinates, with rows in the
+           order of the structure's AtomArray
+         - serial_nums - optional list of F model serial numbers
+        """
+        if len(coord.shape) != 3 or coord.shape[2] != 3:
+            raise ValueError("Expected an F x N x 3 array of coordinates")
+        if coord.shape[1] != len(structure.get_atom_array()):
+            raise ValueError("Expected %i atoms per frame, not %i"
+                             % (len(structure.get_atom_array()),
+                                coord.shape[1]))
+        if serial_nums is None:
+            serial_nums = list(range(len(coord)))
+        self.structure = structure
+        self.coord = coord
+        self.serial_nums = serial_nums
+
+    def __len__(self):
+        """Return the number of frames."""
+        return len(self.coord)
+
+    def __repr__(self):
+        """Return a short summary of the trajectory."""
+        return "<Trajectory with %i frames of %i atoms>" % self.coord.shape[:2]
+
+    def __getitem__(self, index):
+        """Return the N x 3 coordinates of the given frame."""
+        return self.coord[index]
+
+    def __iter__(self):
+        """Iterate over the N x 3 coordinates of each frame."""
+        for index in range(len(self.coord)):
+            yield self.coord[index]
+
+    def iter_models(self):
+        """Iterate over the frames, updating the topology's coordinates.
+
+        Yields the single Model of the structure once per frame, after
+        copying the frame's coordinates into its atoms. After (or while)
+        iterating, the atoms have the coordinates of the latest frame.
+        """
+        model = self.structure.get_list()[0]
+        atom_array = self.structure.get_atom_array()
+        for frame in self:
+            atom_array.coord[:] = frame
+            yield model
@@ -206,6 +206,61 @@ def calc_dihedral(v1, v2, v3, v4):
     return angle
 
 
+def calc_angles(coord):
+    """
+    Calculate many angles at once, each between 3 connected points.
+
+    This is the array version of calc_angle, avoiding the creation of
+    Vector objects for each angle.
+
+    @param coord: the points defining the angles, e.g. an N x 3 x 3 array
+    for N angles (any leading dimensions are allowed)
+    @type coord: Numeric array
+
+    @return: array of the angles, in radians
+    @rtype: Numeric array
+    """
+    coord = numpy.asarray(coord, 'd')
+    if coord.shape[-2:] != (3, 3):
+        raise ValueError("Expected an N x 3 x 3 array of points, not %r"
+                         % (coord.shape,))
+    v1 = coord[..., 0, :] - coord[..., 1, :]
+    v3 = coord[..., 2, :] - coord[..., 1, :]
+    cos = (v1 * v3).sum(axis=-1) / numpy.sqrt((v1 * v1).sum(axis=-1) *
+                                              (v3 * v3).sum(axis=-1))
+    return numpy.arccos(numpy.clip(cos, -1, 1))
+
+
+def calc_dihedrals(coord):
+    """
+    Calculate many dihedral angles at once, each between 4 connected points.
+
+    This is the array version of calc_dihedral, with the angles in the same
+    range ]-pi, pi] and the same sign convention.
+
+    @param coord: the points defining the dihedral angles, e.g. an
+    N x 4 x 3 array for N angles (any leading dimensions are allowed)
+    @type coord: Numeric array
+
+    @return: array of the dihedral angles, in radians
+    @rtype: Numeric array
+    """
+    coord = numpy.asarray(coord, 'd')
+    if coord.shape[-2:] != (4, 3):
+        raise ValueError("Expected an N x 4 x 3 array of points, not %r"
+                         % (coord.shape,))
+    ab = coord[..., 0, :] - coord[..., 1, :]
+    cb = coord[..., 2, :] - coord[..., 1, :]
+    db = coord[..., 3, :] - coord[..., 2, :]
+    u = numpy.cross(ab, cb)
+    v = numpy.cross(db, cb)
+    w = numpy.cross(u, v)
+    # The angle between u and v, negative if w points away from cb
+    y = (w * cb).sum(axis=-1) / numpy.sqrt((cb * cb).sum(axis=-1))
+    x = (u * v).sum(axis=-1)
+    return numpy.arctan2(y, x)
+
+
 class Vector(object):
     "3D vector"
 
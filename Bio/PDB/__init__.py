@@ -38,6 +38,9 @@ from Bio.Data.SCOPData import protein_letters_3to1
 # IO of PDB files (including flexible selective output)
 from .PDBIO import PDBIO, Select
 
+# IO of mmCIF files
+from .MMCIFIO import MMCIFIO
+
 # Some methods to eg. get a list of Residues
 # from a list of Atoms.
 from . import Selection
@@ -47,6 +50,7 @@ from .Superimposer import Superimposer
 
 # 3D vector class
 from .Vector import Vector, calc_angle, calc_dihedral, refmat, rotmat, rotaxis
+from .Vector import calc_angles, calc_dihedrals
 from .Vector import vector_to_axis, m2rotaxis, rotaxis2m
 
 # Alignment module
@@ -216,6 +216,17 @@ file, so there is no need to specify it again in SearchIO.
 'comments' and 'fields' keyword arguments are both applicable for parsing,
 indexing, and writing.
 
+For large files where the full SearchIO objects are not needed, the parser's
+parse_rows method is much faster. It gives the ID and rows of each query, with
+each row as a namedtuple of the column values (converted to numbers where
+needed, but with the coordinates as in the file):
+
+    >>> from Bio.SearchIO.BlastIO import BlastTabParser
+    >>> with open(uncommented) as handle:
+    ...     for qid, rows in BlastTabParser(handle).parse_rows():
+    ...         print("%s %i %s %s" % (qid, len(rows), rows[0].sseqid, rows[0].evalue))
+    gi|11464971:4-101 9 gi|350596019|ref|XM_003360601.2| 2e-67
+
 blast-tab provides the following attributes for each SearchIO objects:
 
 +-------------+-------------------+--------------+
@@ -6,12 +6,14 @@
 """Bio.SearchIO parser for BLAST+ tab output format, with or without comments."""
 
 import re
+from collections import namedtuple
 
 from Bio._py3k import _as_bytes, _bytes_to_string
 from Bio._py3k import basestring
 
 from Bio.SearchIO._index import SearchIndexer
 from Bio.SearchIO._model import QueryResult, Hit, HSP, HSPFragment
+from Bio.SearchIO._utils import ResultFilter
 
 
 __all__ = ['BlastTabIndexer', 'BlastTabParser', 'BlastTabWriter']
@@ -138,6 +140,50 @@ _DEFAULT_FIELDS = ['qseqid', 'sseqid', 'pident', 'length', 'mismatch',
 # parser to work
 _MIN_QUERY_FIELDS = set(['qseqid', 'qacc', 'qaccver'])
 _MIN_HIT_FIELDS = set(['sseqid', 'sacc', 'saccver', 'sallseqid'])
+# fields giving the query ID, in order of preference
+_QUERY_ID_FIELDS = ['qseqid', 'qacc', 'qaccver']
+# hit ID columns, in the order of preference of _get_id
+_HIT_ID_FIELDS = ['sseqid', 'sallseqid', 'sacc', 'saccver']
+
+# the object each column mapping above is for, in the order of the parsed
+# values returned by BlastTabParser._parse_result_row
+_COLUMN_MAPS = (_COLUMN_QRESULT, _COLUMN_HIT, _COLUMN_HSP, _COLUMN_FRAG)
+
+
+def _compile_fields(fields):
+    """Returns the plan for parsing rows with the given columns.
+
+    The plan is a list of (column index, object index, attribute name,
+    caster) tuples, one for each supported column, where the object index
+    is the position of the column's mapping in _COLUMN_MAPS and the caster
+    is None for string values. Working this out once for the fields means
+    the parser does not need to look up each column of each row.
+    """
+    plan = []
+    for idx, sname in enumerate(fields):
+        for obj_idx, mapping in enumerate(_COLUMN_MAPS):
+            if sname in mapping:
+                attr_name, caster = mapping[sname]
+                if caster is str:
+                    caster = None
+                plan.append((idx, obj_idx, attr_name, caster))
+    return plan
+
+
+# namedtuple classes for the rows returned by BlastTabParser.parse_rows,
+# keyed by the tuple of fields
+_ROW_CLASSES = {}
+
+
+def _get_row_class(fields):
+    """Returns a namedtuple class with the given fields as attributes."""
+    fields = tuple(fields)
+    try:
+        return _ROW_CLASSES[fields]
+    except KeyError:
+        row_class = namedtuple('BlastTabRow', fields, rename=True)
+        _ROW_CLASSES[fields] = row_class
+        return row_class
 
 # simple function to create BLAST HSP attributes that may be computed if
 # other certain attributes are present
@@ -204,10 +250,13 @@ class BlastTabParser(object):
 
     """Parser for the BLAST tabular format."""
 
-    def __init__(self, handle, comments=False, fields=_DEFAULT_FIELDS):
+    def __init__(self, handle, comments=False, fields=_DEFAULT_FIELDS,
+            max_hits=None, max_hsps_per_hit=None, evalue=None, bitscore=None):
         self.handle = handle
         self.has_comments = comments
         self.fields = self._prep_fields(fields)
+        self._filter = ResultFilter(max_hits, max_hsps_per_hit, evalue,
+                bitscore)
         self.line = self.handle.readline().strip()
 
     def __iter__(self):
@@ -246,6 +295,7 @@ class BlastTabParser(object):
         while True:
             comments = self._parse_comments()
             if comments:
+                self._filter.reset()
                 try:
                     self.fields = comments['fields']
                     # iterator for the query results
@@ -257,7 +307,15 @@ class BlastTabParser(object):
                     # if the query has no results
                     qres_iter = iter([QueryResult()])
 
+                has_qresult = False
                 for qresult in qres_iter:
+                    for key, value in comments.items():
+                        setattr(qresult, key, value)
+                    has_qresult = True
+                    yield qresult
+                # all the hits may have been dropped by the filters
+                if not has_qresult:
+                    qresult = QueryResult()
                     for key, value in comments.items():
                         setattr(qresult, key, value)
                     yield qresult
@@ -316,36 +374,114 @@ class BlastTabParser(object):
 
     def _parse_result_row(self):
         """Returns a dictionary of parsed row values."""
-        fields = self.fields
         columns = self.line.strip().split('\t')
-        assert len(fields) == len(columns), "Expected %i columns, found: " \
-            "%i" % (len(fields), len(columns))
-
-        qresult, hit, hsp, frag = {}, {}, {}, {}
-        for idx, value in enumerate(columns):
-            sname = fields[idx]
-            # flag to check if any of the _COLUMNs contain sname
-            in_mapping = False
-            # iterate over each dict, mapping pair to determine
-            # attribute name and value of each column
-            for parsed_dict, mapping in (
-                    (qresult, _COLUMN_QRESULT),
-                    (hit, _COLUMN_HIT),
-                    (hsp, _COLUMN_HSP),
-                    (frag, _COLUMN_FRAG)):
-                # process parsed value according to mapping
-                if sname in mapping:
-                    attr_name, caster = mapping[sname]
-                    if caster is not str:
-                        value = caster(value)
-                    parsed_dict[attr_name] = value
-                    in_mapping = True
-            # make sure that any unhandled field is not supported
-            if not in_mapping:
-                assert sname not in _SUPPORTED_FIELDS
-
+        assert len(self.fields) == len(columns), "Expected %i columns, " \
+            "found: %i" % (len(self.fields), len(columns))
+
+        # follow the plan compiled from the fields in _parse_qresult, so
+        # only the supported columns are visited, each once
+        parsed = ({}, {}, {}, {})
+        for idx, obj_idx, attr_name, caster in self._row_plan:
+            value = columns[idx]
+            if caster is not None:
+                value = caster(value)
+            parsed[obj_idx][attr_name] = value
+
+        qresult, hit, hsp, frag = parsed
         return {'qresult': qresult, 'hit': hit, 'hsp': hsp, 'frag': frag}
 
+    def parse_rows(self):
+        """Iterator returning the rows of each query as simple tuples.
+
+        This is a faster alternative to iterating over the parser, for when
+        the full QueryResult, Hit, HSP and HSPFragment objects are not
+        needed. It yields a (query ID, rows) tuple for each query, where
+        rows is a list of namedtuples with an attribute for each column
+        (named as in the fields, e.g. 'qseqid' or 'evalue'). The supported
+        columns are converted to numbers or lists as in the object model,
+        while the coordinates are left as they are in the file (one-based,
+        with the start after the end on the minus strand). Queries without
+        any hits in commented files are given an empty list of rows.
+
+        Any filters given to the parser (e.g. ``max_hits`` or ``evalue``)
+        are applied to the rows as well.
+        """
+        # stop iteration if file has no lines
+        if not self.line:
+            return
+        if not self.has_comments:
+            for query_rows in self._parse_rows():
+                yield query_rows
+            return
+
+        while True:
+            comments = self._parse_comments()
+            if not comments:
+                break
+            self._filter.reset()
+            has_rows = False
+            if 'fields' in comments:
+                self.fields = comments['fields']
+                for query_rows in self._parse_rows():
+                    has_rows = True
+                    yield query_rows
+            # the query has no results, or they were all dropped by the
+            # filters
+            if not has_rows:
+                yield comments.get('id'), []
+
+    def _parse_rows(self):
+        """Iterator returning the (query ID, rows) of a block of result lines."""
+        fields = self.fields
+        row_class = _get_row_class(fields)
+        casters = [None] * len(fields)
+        for idx, obj_idx, attr_name, caster in _compile_fields(fields):
+            casters[idx] = caster
+        # only the columns which need converting are visited for each row
+        converted = [(idx, caster) for idx, caster in enumerate(casters)
+                     if caster is not None]
+        qid_idx = [fields.index(sname) for sname in _QUERY_ID_FIELDS
+                   if sname in fields][0]
+        filt = self._filter
+        if filt.is_active:
+            hid_idx = [fields.index(sname) for sname in _HIT_ID_FIELDS
+                       if sname in fields][0]
+            evalue_idx = bitscore_idx = None
+            if 'evalue' in fields:
+                evalue_idx = fields.index('evalue')
+            if 'bitscore' in fields:
+                bitscore_idx = fields.index('bitscore')
+
+        handle = self.handle
+        line = self.line
+        cur_qid, rows = None, []
+        while line and not line.startswith('#'):
+            columns = line.split('\t')
+            assert len(fields) == len(columns), "Expected %i columns, " \
+                "found: %i" % (len(fields), len(columns))
+            for idx, caster in converted:
+                columns[idx] = caster(columns[idx])
+            qid = columns[qid_idx]
+            if filt.is_active:
+                evalue = bitscore = None
+                if evalue_idx is not None:
+                    evalue = columns[evalue_idx]
+                if bitscore_idx is not None:
+                    bitscore = columns[bitscore_idx]
+                # skip rows dropped by the filters
+                if not filt.check_row(qid, columns[hid_idx], evalue, bitscore):
+                    line = handle.readline().strip()
+                    continue
+            if qid != cur_qid and rows:
+                yield cur_qid, rows
+                rows = []
+            cur_qid = qid
+            rows.append(row_class._make(columns))
+            line = handle.readline().strip()
+        self.line = line
+        if rows:
+            yield cur_qid, rows
+
     def _get_id(self, parsed):
         """Returns the value used for a QueryResult or Hit ID from a parsed row."""
         # use 'id', with 'id_all', 'accession' and 'accession_version'
@@ -381,6 +517,9 @@ class BlastTabParser(object):
         # dummies for initial parsed value containers
         cur, prev = None, None
         hit_list, hsp_list = [], []
+        # work out how to parse the rows once for all of them
+        self._row_plan = _compile_fields(self.fields)
+        filt = self._filter
 
         while True:
             # store previous line's parsed values if we've past the first line
@@ -393,6 +532,16 @@ class BlastTabParser(object):
                 cur = self._parse_result_row()
                 cur_qid = self._get_id(cur['qresult'])
                 cur_hid = self._get_id(cur['hit'])
+                # skip rows dropped by the filters before creating any
+                # objects, going back to the previous row's values
+                if filt.is_active and not filt.check_row(cur_qid, cur_hid,
+                        cur['hsp'].get('evalue'), cur['hsp'].get('bitscore')):
+                    cur, cur_qid, cur_hid = prev, prev_qid, prev_hid
+                    self.line = self.handle.readline().strip()
+                    continue
+            elif prev is None and cur is None:
+                # every row was dropped by the filters
+                break
             else:
                 file_state = state_EOF
                 # mock values for cur_qid and cur_hid since the line is empty
@@ -512,8 +661,10 @@ class BlastTabIndexer(SearchIndexer):
 
     _parser = BlastTabParser
 
-    def __init__(self, filename, comments=False, fields=_DEFAULT_FIELDS):
-        SearchIndexer.__init__(self, filename, comments=comments, fields=fields)
+    def __init__(self, filename, comments=False, fields=_DEFAULT_FIELDS,
+            **kwargs):
+        SearchIndexer.__init__(self, filename, comments=comments,
+                fields=fields, **kwargs)
 
         # if the file doesn't have comments,
         # get index of column used as the key (qseqid / qacc / qaccver)
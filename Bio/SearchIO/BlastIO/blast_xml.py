@@ -30,9 +30,10 @@ except ImportError:
 from Bio._py3k import _as_bytes, _bytes_to_string, unicode
 _empty_bytes_string = _as_bytes("")
 
-from Bio.Alphabet import generic_dna, generic_protein
+from Bio.Alphabet import generic_dna, generic_protein, single_letter_alphabet
 from Bio.SearchIO._index import SearchIndexer
 from Bio.SearchIO._model import QueryResult, Hit, HSP, HSPFragment
+from Bio.SearchIO._utils import ResultFilter
 
 
 __all__ = ['BlastXmlParser', 'BlastXmlIndexer', 'BlastXmlWriter']
@@ -80,6 +81,20 @@ _ELEM_FRAG = {
     'Hsp_hseq': ('hit', str),
     'Hsp_qseq': ('query', str),
 }
+# Hsp element - (object, attribute name, caster) table used when parsing,
+# where the object is one of the following, and the caster is None for
+# strings
+_HSP_OBJ, _FRAG_OBJ, _COORD_OBJ = 0, 1, 2
+_HSP_TABLE = {}
+for _elem_map, _obj in ((_ELEM_HSP, _HSP_OBJ), (_ELEM_FRAG, _FRAG_OBJ)):
+    for _key, (_attr_name, _caster) in _elem_map.items():
+        if _key.endswith('-from') or _key.endswith('-to'):
+            # coordinates are adjusted once both ends are known
+            _HSP_TABLE[_key] = (_COORD_OBJ, _attr_name, _caster)
+        else:
+            _HSP_TABLE[_key] = (_obj, _attr_name,
+                                None if _caster is str else _caster)
+del _elem_map, _obj, _key, _attr_name, _caster
 # dictionary for mapping tag name and meta key name
 _ELEM_META = {
     'BlastOutput_db': ('target', str),
@@ -208,11 +223,29 @@ def _extract_ids_and_descs(concat_str):
 
 
 class BlastXmlParser(object):
-    """Parser for the BLAST XML format"""
+    """Parser for the BLAST XML format.
 
-    def __init__(self, handle):
+    The file is read incrementally with ElementTree's iterparse, building
+    the elements of one query (``<Iteration>``) at a time, which are then
+    discarded, so the memory used does not grow with the number of queries.
+    """
+
+    def __init__(self, handle, max_hits=None, max_hsps_per_hit=None,
+            evalue=None, bitscore=None):
         self.xml_iter = iter(ElementTree.iterparse(handle, events=('start', 'end')))
+        self._filter = ResultFilter(max_hits, max_hsps_per_hit, evalue,
+                bitscore)
+        # parent of the <Iteration> elements, emptied after each query
+        self._iterations_elem = None
         self._meta, self._fallback = self._parse_preamble()
+        # set alphabet, based on program
+        prog = self._meta.get('program')
+        if prog == 'blastn':
+            self._alphabet = generic_dna
+        elif prog in ['blastp', 'blastx', 'tblastn', 'tblastx']:
+            self._alphabet = generic_protein
+        else:
+            self._alphabet = single_letter_alphabet
 
     def __iter__(self):
         for qresult in self._parse_qresult():
@@ -253,7 +286,9 @@ class BlastXmlParser(object):
                 elem.clear()
                 continue
 
-            if event == 'start' and elem.tag == 'Iteration':
+            if event == 'start' and elem.tag == 'BlastOutput_iterations':
+                self._iterations_elem = elem
+            elif event == 'start' and elem.tag == 'Iteration':
                 break
 
         # we only want the version number, sans the program name or date
@@ -364,8 +399,11 @@ class BlastXmlParser(object):
                                 value = caster(value)
                             setattr(qresult, val_info[0], value)
 
-                # delete element after we finish parsing it
+                # delete element after we finish parsing it, and remove it
+                # from its parent so finished queries take up no memory
                 qresult_elem.clear()
+                if self._iterations_elem is not None:
+                    self._iterations_elem.clear()
                 yield qresult
 
     def _parse_hit(self, root_hit_elem, query_id):
@@ -392,7 +430,12 @@ class BlastXmlParser(object):
         if root_hit_elem is None:
             root_hit_elem = []
 
+        filt = self._filter
+        hit_count = 0
         for hit_elem in root_hit_elem:
+            # the remaining hits are dropped with the query's element
+            if filt.max_hits is not None and hit_count >= filt.max_hits:
+                break
 
             # create empty hit object
             hit_id = hit_elem.findtext('Hit_id')
@@ -414,9 +457,15 @@ class BlastXmlParser(object):
             id_descs = _extract_ids_and_descs(full_id_desc)
             hit_id, hit_desc = id_descs[0]
 
+            hsps_elem = hit_elem.find('Hit_hsps')
             hsps = [hsp for hsp in
-                    self._parse_hsp(hit_elem.find('Hit_hsps'),
-                        query_id, hit_id)]
+                    self._parse_hsp(hsps_elem, query_id, hit_id)]
+            # drop hits with all their HSPs rejected by the filters, but
+            # not hits without any HSPs in the file
+            if not hsps and hsps_elem is not None and len(hsps_elem):
+                hit_elem.clear()
+                continue
+            hit_count += 1
 
             hit = Hit(hsps)
             hit.description = hit_desc
@@ -476,27 +525,43 @@ class BlastXmlParser(object):
         if root_hsp_frag_elem is None:
             root_hsp_frag_elem = []
 
+        hsp_table = _HSP_TABLE
+        alphabet = self._alphabet
+        filt = self._filter
+        hsp_count = 0
         for hsp_frag_elem in root_hsp_frag_elem:
-            coords = {}  # temporary container for coordinates
-            frag = HSPFragment(hit_id, query_id)
-            for key, val_info in _ELEM_FRAG.items():
-                value = hsp_frag_elem.findtext(key)
-                caster = val_info[1]
+            if filt.max_hsps_per_hit is not None and \
+                    hsp_count >= filt.max_hsps_per_hit:
+                break
+            # sort the values of the child elements in a single pass,
+            # looking up what to do with each in the precompiled table
+            values = ({}, {}, {})
+            similarity = None
+            for elem in hsp_frag_elem:
+                try:
+                    obj, attr_name, caster = hsp_table[elem.tag]
+                except KeyError:
+                    if elem.tag == 'Hsp_midline':
+                        similarity = elem.text or ''
+                    continue
+                value = elem.text or ''
+                if caster is not None:
+                    value = caster(value)
+                values[obj][attr_name] = value
+            hsp_values, frag_values, coords = values
+            # skip HSPs dropped by the filters before creating any objects
+            if filt.has_thresholds and not filt.check_hsp(
+                    hsp_values.get('evalue'), hsp_values.get('bitscore')):
+                hsp_frag_elem.clear()
+                continue
+            hsp_count += 1
 
-                # adjust 'from' and 'to' coordinates to 0-based ones
-                if value is not None:
-                    if key.endswith('-from') or key.endswith('-to'):
-                        # store coordinates for further processing
-                        coords[val_info[0]] = caster(value)
-                        continue
-                    # recast only if value is not intended to be str
-                    elif caster is not str:
-                        value = caster(value)
-                    setattr(frag, val_info[0], value)
+            frag = HSPFragment(hit_id, query_id, alphabet=alphabet)
+            for attr_name, value in frag_values.items():
+                setattr(frag, attr_name, value)
 
             # set the similarity characters into aln_annotation dict
-            frag.aln_annotation['similarity'] = \
-                    hsp_frag_elem.findtext('Hsp_midline')
+            frag.aln_annotation['similarity'] = similarity
 
             # process coordinates
             # since 'x-from' could be bigger than 'x-to', we need to figure
@@ -515,21 +580,9 @@ class BlastXmlParser(object):
                     setattr(frag, start_type, min(start, end) - 1)
                     setattr(frag, end_type, max(start, end))
 
-            # set alphabet, based on program
-            prog = self._meta.get('program')
-            if prog == 'blastn':
-                frag.alphabet = generic_dna
-            elif prog in ['blastp', 'blastx', 'tblastn', 'tblastx']:
-                frag.alphabet = generic_protein
-
             hsp = HSP([frag])
-            for key, val_info in _ELEM_HSP.items():
-                value = hsp_frag_elem.findtext(key)
-                caster = val_info[1]
-                if value is not None:
-                    if caster is not str:
-                        value = caster(value)
-                    setattr(hsp, val_info[0], value)
+            for attr_name, value in hsp_values.items():
+                setattr(hsp, attr_name, value)
             # delete element after we finish parsing it
             hsp_frag_elem.clear()
             yield hsp
@@ -543,8 +596,8 @@ class BlastXmlIndexer(SearchIndexer):
     qend_mark = _as_bytes('</Iteration>')
     block_size = 16384
 
-    def __init__(self, filename):
-        SearchIndexer.__init__(self, filename)
+    def __init__(self, filename, **kwargs):
+        SearchIndexer.__init__(self, filename, **kwargs)
         # TODO: better way to do this?
         iter_obj = self._parser(self._handle)
         self._meta, self._fallback = iter_obj._meta, iter_obj._fallback
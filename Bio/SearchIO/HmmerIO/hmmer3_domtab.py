@@ -92,6 +92,7 @@ class Hmmer3DomtabParser(Hmmer3TabParser):
         # dummies for initial parsed value containers
         cur, prev = None, None
         hit_list, hsp_list = [], []
+        filt = self._filter
 
         while True:
             # store previous line's parsed values, for every line after the 1st
@@ -104,6 +105,16 @@ class Hmmer3DomtabParser(Hmmer3TabParser):
                 cur = self._parse_row()
                 cur_qid = cur['qresult']['id']
                 cur_hid = cur['hit']['id']
+                # skip rows dropped by the filters before creating any
+                # objects, going back to the previous row's values
+                if filt.is_active and not filt.check_row(cur_qid, cur_hid,
+                        cur['hsp']['evalue'], cur['hsp']['bitscore']):
+                    cur, cur_qid, cur_hid = prev, prev_qid, prev_hid
+                    self.line = self.handle.readline()
+                    continue
+            elif prev is None and cur is None:
+                # every row was dropped by the filters
+                break
             else:
                 file_state = state_EOF
                 # mock ID values since the line is empty
@@ -11,6 +11,7 @@ from Bio._py3k import _as_bytes, _bytes_to_string
 from Bio.Alphabet import generic_protein
 from Bio.SearchIO._index import SearchIndexer
 from Bio.SearchIO._model import QueryResult, Hit, HSP, HSPFragment
+from Bio.SearchIO._utils import ResultFilter
 
 
 __all__ = ['Hmmer3TabParser', 'Hmmer3TabIndexer', 'Hmmer3TabWriter']
@@ -22,9 +23,12 @@ class Hmmer3TabParser(object):
 
     """Parser for the HMMER table format."""
 
-    def __init__(self, handle):
+    def __init__(self, handle, max_hits=None, max_hsps_per_hit=None,
+            evalue=None, bitscore=None):
         self.handle = handle
         self.line = self.handle.readline()
+        self._filter = ResultFilter(max_hits, max_hsps_per_hit, evalue,
+                bitscore)
 
     def __iter__(self):
         header_mark = '#'
@@ -92,6 +96,7 @@ class Hmmer3TabParser(object):
         cur, prev = None, None
         # container for Hit objects, used to create QueryResult
         hit_list = []
+        filt = self._filter
 
         while True:
             # store previous line's parsed values for all lines after the first
@@ -105,6 +110,17 @@ class Hmmer3TabParser(object):
             if self.line and not self.line.startswith('#'):
                 cur = self._parse_row()
                 cur_qid = cur['qresult']['id']
+                # skip rows dropped by the filters before creating any
+                # objects, going back to the previous row's values
+                if filt.is_active and not filt.check_row(cur_qid,
+                        cur['hit']['id'], cur['hsp']['evalue'],
+                        cur['hsp']['bitscore']):
+                    cur, cur_qid = prev, prev_qid
+                    self.line = self.handle.readline()
+                    continue
+            elif prev is None and cur is None:
+                # every row was dropped by the filters
+                break
             else:
                 file_state = state_EOF
                 # mock value for cur_qid, since we have nothing to parse
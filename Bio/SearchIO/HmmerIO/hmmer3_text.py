@@ -11,6 +11,7 @@ from Bio._py3k import _as_bytes, _bytes_to_string
 from Bio._utils import read_forward
 from Bio.Alphabet import generic_protein
 from Bio.SearchIO._model import QueryResult, Hit, HSP, HSPFragment
+from Bio.SearchIO._utils import ResultFilter
 
 from ._base import _BaseHmmerTextIndexer
 
@@ -40,10 +41,13 @@ class Hmmer3TextParser(object):
 
     """Parser for the HMMER 3.0 text output."""
 
-    def __init__(self, handle):
+    def __init__(self, handle, max_hits=None, max_hsps_per_hit=None,
+            evalue=None, bitscore=None):
         self.handle = handle
         self.line = read_forward(self.handle)
         self._meta = self._parse_preamble()
+        self._filter = ResultFilter(max_hits, max_hsps_per_hit, evalue,
+                bitscore)
 
     def __iter__(self):
         for qresult in self._parse_qresult():
@@ -224,12 +228,20 @@ class Hmmer3TextParser(object):
 
         # start parsing the hsp block
         hit_list = []
+        filt = self._filter
         while True:
             if self.line.startswith('Internal pipeline'):
                 # by this time we should've emptied the hit attr list
                 assert len(hit_attrs) == 0
                 return hit_list
             assert self.line.startswith('>>')
+            # skip the blocks of the hits after the first max_hits
+            if filt.max_hits is not None and len(hit_list) >= filt.max_hits:
+                self.line = read_forward(self.handle)
+                self._read_until(lambda line:
+                        line.startswith('Internal pipeline'))
+                del hit_attrs[:]
+                continue
             hid, hdesc = self.line[len('>> '):].split('  ', 1)
             hdesc = hdesc.strip()
 
@@ -239,8 +251,10 @@ class Hmmer3TextParser(object):
                     line.startswith('   [No individual domains'))
             self.line = read_forward(self.handle)
 
-            # parse the hsp table for the current hit
+            # parse the hsp table for the current hit, keeping the HSPs of all
+            # the domains (or None if dropped by the filters) in domains
             hsp_list = []
+            domains = []
             while True:
                 # break out of hsp parsing if there are no hits, it's the last hsp
                 # or it's the start of a new hit
@@ -251,6 +265,10 @@ class Hmmer3TextParser(object):
                    self.line.startswith('>>'):
 
                     hit_attr = hit_attrs.pop(0)
+                    # drop hits with all their HSPs rejected by the filters,
+                    # but not hits without any domains in the file
+                    if not hsp_list and None in domains:
+                        break
                     hit = Hit(hsp_list)
                     for attr, value in hit_attr.items():
                         if attr == "description":
@@ -265,6 +283,14 @@ class Hmmer3TextParser(object):
 
                 parsed = [x for x in self.line.strip().split(' ') if x]
                 assert len(parsed) == 16
+                # skip HSPs dropped by the filters before creating any objects
+                if filt.is_active and ((filt.max_hsps_per_hit is not None and
+                        len(hsp_list) >= filt.max_hsps_per_hit) or
+                        not filt.check_hsp(float(parsed[5]),
+                                           float(parsed[2]))):
+                    domains.append(None)
+                    self.line = read_forward(self.handle)
+                    continue
                 # parsed column order:
                 # index, is_included, bitscore, bias, evalue_cond, evalue
                 # hmmfrom, hmmto, query_ends, hit_ends, alifrom, alito,
@@ -317,14 +343,19 @@ class Hmmer3TextParser(object):
                 hsp.acc_avg = float(parsed[15])
 
                 hsp_list.append(hsp)
+                domains.append(hsp)
                 self.line = read_forward(self.handle)
 
             # parse the hsp alignments
             if self.line.startswith('  Alignments for each domain:'):
-                self._parse_aln_block(hid, hit.hsps)
+                self._parse_aln_block(hid, domains)
 
     def _parse_aln_block(self, hid, hsp_list):
-        """Parses a HMMER3 HSP alignment block."""
+        """Parses a HMMER3 HSP alignment block.
+
+        The HSPs are given in the order of the domains, with None for those
+        dropped by the filters, whose alignments are skipped.
+        """
         self.line = read_forward(self.handle)
         dom_counter = 0
         while True:
@@ -332,6 +363,14 @@ class Hmmer3TextParser(object):
                     self.line.startswith('Internal pipeline'):
                 return hsp_list
             assert self.line.startswith('  == domain %i' % (dom_counter + 1))
+            if hsp_list[dom_counter] is None:
+                self.line = self.handle.readline()
+                while not (self.line.startswith('  == domain') or
+                        self.line.startswith('>>') or
+                        self.line.startswith('Internal pipeline')):
+                    self.line = self.handle.readline()
+                dom_counter += 1
+                continue
             # alias hsp to local var
             # but note that we're still changing the attrs of the actual
             # hsp inside the qresult as we're not creating a copy
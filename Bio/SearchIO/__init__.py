@@ -265,12 +265,17 @@ _WRITER_MAP = {
 }
 
 
-def parse(handle, format=None, **kwargs):
+def parse(handle, format=None, workers=1, ordered=True, **kwargs):
     """Turns a search output file into a generator that yields QueryResult
     objects.
 
      - handle - Handle to the file, or the filename as a string.
      - format - Lower case string denoting one of the supported formats.
+     - workers - Optional number of processes used to parse the file
+                 (default one, see below).
+     - ordered - When using several workers, whether the QueryResult objects
+                 should be returned in the order of the file (default), or
+                 as soon as they are parsed.
      - kwargs - Format-specific keyword arguments.
 
     This function is used to iterate over each query in a given search output
@@ -300,7 +305,51 @@ def parse(handle, format=None, **kwargs):
     Search 33212 has 44 hits
     Search 33213 has 95 hits
 
+    The BLAST tabular and XML parsers, and the HMMER 3 text, table and domain
+    table parsers, also accept filters which are applied as the file is
+    read, so the hits and HSPs which are dropped are never created. These
+    are `evalue` and `bitscore` thresholds for the HSPs (hits with all their
+    HSPs rejected are dropped), and `max_hits` and `max_hsps_per_hit` limits on
+    the number of hits of each query and HSPs of each hit kept, in the order
+    of the file. For example, the best five hits of each query under an
+    e-value of 1e-10:
+
+    >>> for qresult in SearchIO.parse('Blast/mirna.xml', 'blast-xml',
+    ...                               max_hits=5, evalue=1e-10):
+    ...     print("Search %s has %i hits" % (qresult.id, len(qresult)))
+    ...
+    Search 33211 has 5 hits
+    Search 33212 has 5 hits
+    Search 33213 has 5 hits
+
+    Large files of a format which can be indexed (see `index`) can be parsed
+    with several processes, given the filename. The file is first split into
+    the blocks of each query, as for indexing, and then groups of queries are
+    parsed by each worker:
+
+    >>> for qresult in SearchIO.parse('Blast/mirna.tab', 'blast-tab',
+    ...                               workers=2, comments=True):
+    ...     print("Search %s has %i hits" % (qresult.id, len(qresult)))
+    ...
+    Search 33211 has 100 hits
+    Search 33212 has 44 hits
+    Search 33213 has 95 hits
+
     """
+    if workers < 1:
+        raise ValueError("Use workers with a minimum of 1")
+    if workers > 1:
+        if not isinstance(handle, basestring):
+            raise TypeError("Parsing with several workers needs a filename, "
+                            "not a handle")
+        if format in _ITERATOR_MAP and format not in _INDEXER_MAP:
+            raise ValueError("Parsing with several workers is not supported "
+                             "for format %r" % format)
+        for qresult in _parse_parallel(handle, format, workers, ordered,
+                                       kwargs):
+            yield qresult
+        return
+
     # get the iterator object and do error checking
     iterator = get_processor(format, _ITERATOR_MAP)
 
@@ -317,6 +366,54 @@ def parse(handle, format=None, **kwargs):
             yield qresult
 
 
+def _parse_blocks(args):
+    """Parses the query blocks of a file at the given offsets (PRIVATE).
+
+    Used via a multiprocessing pool in _parse_parallel, defined at module
+    level so that it can be pickled for the worker processes.
+    """
+    filename, format, kwargs, offsets = args
+    proxy = get_processor(format, _INDEXER_MAP)(filename, **kwargs)
+    try:
+        return [proxy.get(offset) for offset in offsets]
+    finally:
+        proxy._handle.close()
+
+
+def _parse_parallel(filename, format, workers, ordered, kwargs):
+    """Generator returning QueryResult objects parsed by worker processes (PRIVATE).
+
+    The offsets of the queries are found with the format's indexer, and the
+    queries are then parsed in groups by a pool of worker processes.
+    """
+    proxy = get_processor(format, _INDEXER_MAP)(filename, **kwargs)
+    try:
+        offsets = [offset for key, offset, length in proxy]
+    finally:
+        proxy._handle.close()
+    if not offsets:
+        return
+    # several queries per job to spread the cost of sending the results
+    # back, but enough jobs to keep all the workers busy
+    block_size = max(1, min(100, len(offsets) // (4 * workers)))
+    jobs = [(filename, format, kwargs, offsets[i:i + block_size])
+            for i in range(0, len(offsets), block_size)]
+
+    import multiprocessing
+    pool = multiprocessing.Pool(min(workers, len(jobs)))
+    try:
+        if ordered:
+            results = pool.imap(_parse_blocks, jobs)
+        else:
+            results = pool.imap_unordered(_parse_blocks, jobs)
+        for qresults in results:
+            for qresult in qresults:
+                yield qresult
+    finally:
+        pool.terminate()
+        pool.join()
+
+
 def read(handle, format=None, **kwargs):
     """Turns a search output file containing one query into a single QueryResult.
 
@@ -421,13 +518,16 @@ def to_dict(qresults, key_function=lambda rec: rec.id):
     return qdict
 
 
-def index(filename, format=None, key_function=None, **kwargs):
+def index(filename, format=None, key_function=None, backend="dict", **kwargs):
     """Indexes a search output file and returns a dictionary-like object.
 
      - filename     - string giving name of file to be indexed
      - format       - Lower case string denoting one of the supported formats.
      - key_function - Optional callback function which when given a
                       QueryResult should return a unique key for the dictionary.
+     - backend      - How to hold the keys and offsets in memory, either
+                      "dict" (default) or "compact" which packs them into
+                      arrays to save memory (requires string keys).
      - kwargs       - Format-specific keyword arguments.
 
     Index returns a pseudo-dictionary object with QueryResult objects as its
@@ -483,16 +583,35 @@ def index(filename, format=None, key_function=None, **kwargs):
     if not isinstance(filename, basestring):
         raise TypeError("Need a filename (not a handle)")
 
-    from Bio.File import _IndexedSeqFileDict
+    from Bio.File import _IndexedSeqFileDict, _CompactIndexedSeqFileDict
+    if backend == "dict":
+        dict_class = _IndexedSeqFileDict
+    elif backend == "compact":
+        dict_class = _CompactIndexedSeqFileDict
+    else:
+        raise ValueError("Unknown backend %r, use 'dict' or 'compact'"
+                         % backend)
     proxy_class = get_processor(format, _INDEXER_MAP)
     repr = "SearchIO.index(%r, %r, key_function=%r)" \
         % (filename, format, key_function)
-    return _IndexedSeqFileDict(proxy_class(filename, **kwargs),
-                               key_function, repr, "QueryResult")
+    return dict_class(proxy_class(filename, **kwargs),
+                      key_function, repr, "QueryResult")
+
+
+def _index_db_proxy_factory(kwargs, format, filename=None):
+    """Given a filename returns proxy object, else boolean if format OK (PRIVATE).
+
+    Used via functools.partial in index_db, defined at module level so that
+    it can be pickled for the worker processes.
+    """
+    if filename:
+        return get_processor(format, _INDEXER_MAP)(filename, **kwargs)
+    else:
+        return format in _INDEXER_MAP
 
 
 def index_db(index_filename, filenames=None, format=None,
-        key_function=None, **kwargs):
+        key_function=None, workers=1, **kwargs):
     """Indexes several search output files into an SQLite database.
 
      - index_filename - The SQLite filename.
@@ -504,6 +623,8 @@ def index_db(index_filename, filenames=None, format=None,
      - key_function - Optional callback function which when given a
                       QueryResult identifier string should return a unique
                       key for the dictionary.
+     - workers      - Optional number of processes used to scan the files
+                      when building a new index (default one).
      - kwargs       - Format-specific keyword arguments.
 
     The `index_db` function is similar to `index` in that it indexes the start
@@ -557,20 +678,14 @@ def index_db(index_filename, filenames=None, format=None,
     if isinstance(filenames, basestring):
         filenames = [filenames]
 
+    from functools import partial
     from Bio.File import _SQLiteManySeqFilesDict
     repr = "SearchIO.index_db(%r, filenames=%r, format=%r, key_function=%r, ...)" \
                % (index_filename, filenames, format, key_function)
-
-    def proxy_factory(format, filename=None):
-        """Given a filename returns proxy object, else boolean if format OK."""
-        if filename:
-            return get_processor(format, _INDEXER_MAP)(filename, **kwargs)
-        else:
-            return format in _INDEXER_MAP
-
+    proxy_factory = partial(_index_db_proxy_factory, kwargs)
     return _SQLiteManySeqFilesDict(index_filename, filenames,
                                    proxy_factory, format,
-                                   key_function, repr)
+                                   key_function, repr, workers=workers)
 
 
 def write(qresults, handle, format=None, **kwargs):
@@ -12,12 +12,62 @@ from Bio._utils import getattr_str, trim_str
 __docformat__ = "restructuredtext en"
 
 
+# names of the slot attributes of each class, see _get_slots
+_SLOTS = {}
+
+
+def _get_slots(cls):
+    """Returns the names of the slot attributes of the class and its bases."""
+    try:
+        return _SLOTS[cls]
+    except KeyError:
+        pass
+    names = []
+    for klass in cls.__mro__:
+        for name in klass.__dict__.get('__slots__', ()):
+            if name in ('__dict__', '__weakref__'):
+                continue
+            # private names are mangled, as for attributes set in methods
+            if name.startswith('__') and not name.endswith('__'):
+                name = '_%s%s' % (klass.__name__.lstrip('_'), name)
+            names.append(name)
+    _SLOTS[cls] = names
+    return names
+
+
 class _BaseSearchObject(object):
 
-    """Abstract class for SearchIO objects."""
+    """Abstract class for SearchIO objects.
+
+    The attributes every object of a class has are kept in slots (see the
+    ``__slots__`` of each class) to save memory, as a search may give many
+    thousands of HSPs. There is still a ``__dict__`` for the attributes that
+    the parsers set depending on the output format (e.g. ``evalue``), and
+    the objects can be weakly referenced as before.
+    """
+
+    __slots__ = ('__dict__', '__weakref__')
 
     _NON_STICKY_ATTRS = ()
 
+    def __getstate__(self):
+        """Returns the slot and ``__dict__`` attributes, for pickling.
+
+        This is needed for the pickle protocols 0 and 1 (the default of
+        Python 2), which do not handle slots by themselves.
+        """
+        slots = dict((attr, getattr(self, attr))
+                     for attr in _get_slots(self.__class__)
+                     if hasattr(self, attr))
+        return self.__dict__, slots
+
+    def __setstate__(self, state):
+        """Restores the attributes returned by ``__getstate__``."""
+        attrs, slots = state
+        for attr, value in slots.items():
+            setattr(self, attr, value)
+        self.__dict__.update(attrs)
+
     def _transfer_attrs(self, obj):
         """Transfer instance attributes to the given object.
 
@@ -33,6 +83,9 @@ class _BaseSearchObject(object):
 
         """
         # list of attribute names we don't want to transfer
+        for attr in _get_slots(self.__class__):
+            if attr not in self._NON_STICKY_ATTRS and hasattr(self, attr):
+                setattr(obj, attr, getattr(self, attr))
         for attr in self.__dict__:
             if attr not in self._NON_STICKY_ATTRS:
                 setattr(obj, attr, self.__dict__[attr])
@@ -42,6 +95,8 @@ class _BaseHSP(_BaseSearchObject):
 
     """Abstract base class for HSP objects."""
 
+    __slots__ = ()
+
     def _str_hsp_header(self):
         """Prints the alignment header info."""
         lines = []
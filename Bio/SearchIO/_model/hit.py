@@ -103,6 +103,9 @@ class Hit(_BaseSearchObject):
 
     """
 
+    __slots__ = ('_id', '_id_alt', '_query_id', '_description',
+                 '_description_alt', '_query_description', '_items')
+
     # attributes we don't want to transfer when creating a new Hit class
     # from this one
     _NON_STICKY_ATTRS = ('_items', )
@@ -249,6 +249,8 @@ class HSP(_BaseHSP):
     .. [1] may be used in HSPs with multiple fragments
 
     """
+    __slots__ = ('_items', )
+
     # attributes we don't want to transfer when creating a new Hit class
     # from this one
     _NON_STICKY_ATTRS = ('_items', )
@@ -679,8 +681,19 @@ class HSPFragment(_BaseHSP):
     CCCTCTACAGGGAAGCGCTTTCTGTTGTCTGAAAGAAAAGAAAG...GGG 33211
     CCCTCTACAGGGAAGCGCTTTCTGTTGTCTGAAAGAAAAGAAAG...GGG gi|262205317|ref|NR_030195.1|
 
+    Sequences given as strings are kept as they are until the ``query``,
+    ``hit`` or ``aln`` properties are first used, so that fragments which are
+    only filtered on their statistics or coordinates never need their
+    SeqRecord objects.
+
     """
 
+    __slots__ = ('_alphabet', 'aln_annotation', '_hit_id', '_query_id',
+                 '_hit_description', '_query_description', '_hit_features',
+                 '_query_features', '_hit_strand', '_query_strand',
+                 '_hit_frame', '_query_frame', '_hit_start', '_query_start',
+                 '_hit_end', '_query_end', '_hit', '_query', '_aln_span')
+
     def __init__(self, hit_id='<unknown id>', query_id='<unknown id>',
             hit=None, query=None, alphabet=single_letter_alphabet):
 
@@ -696,12 +709,10 @@ class HSPFragment(_BaseHSP):
             setattr(self, '_%s_features' % seq_type, [])
             # query or hit attributes whose default attribute is None
             for attr in ('strand', 'frame', 'start', 'end'):
-                setattr(self, '%s_%s' % (seq_type, attr), None)
-            # self.query or self.hit
-            if eval(seq_type):
-                setattr(self, seq_type, eval(seq_type))
-            else:
-                setattr(self, seq_type, None)
+                setattr(self, '_%s_%s' % (seq_type, attr), None)
+        # self.query and self.hit
+        self.query = query or None
+        self.hit = hit or None
 
     def __repr__(self):
         info = "hit_id=%r, query_id=%r" % (self.hit_id, self.query_id)
@@ -718,7 +729,7 @@ class HSPFragment(_BaseHSP):
         return self._str_hsp_header() + '\n' + self._str_aln()
 
     def __getitem__(self, idx):
-        if self.aln is not None:
+        if self._query is not None or self._hit is not None:
             obj = self.__class__(
                     hit_id=self.hit_id, query_id=self.query_id,
                     alphabet=self.alphabet)
@@ -754,15 +765,9 @@ class HSPFragment(_BaseHSP):
         aln_span = getattr_str(self, 'aln_span')
         lines.append('  Fragments: 1 (%s columns)' % aln_span)
         # sequences
-        if self.query is not None and self.hit is not None:
-            try:
-                qseq = str(self.query.seq)
-            except AttributeError:  # query is None
-                qseq = '?'
-            try:
-                hseq = str(self.hit.seq)
-            except AttributeError:  # hit is None
-                hseq = '?'
+        if self._query is not None and self._hit is not None:
+            qseq = self._get_seq_str('query')
+            hseq = self._get_seq_str('hit')
 
             # similarity line
             simil = ''
@@ -801,6 +806,9 @@ class HSPFragment(_BaseHSP):
         :param seq_type: sequence type
         :type seq_type: string, choice of 'hit' or 'query'
 
+        Strings are returned unchanged, to be turned into SeqRecord objects
+        by ``_get_seq`` when first needed.
+
         """
         assert seq_type in ('hit', 'query')
         if seq is None:
@@ -818,25 +826,36 @@ class HSPFragment(_BaseHSP):
                         "%r (%s); found: %r (%s)." % (len(opp_seq), opp_type,
                         len(seq), seq_type))
 
-        seq_id = getattr(self, '%s_id' % seq_type)
-        seq_desc = getattr(self, '%s_description' % seq_type)
-        seq_feats = getattr(self, '%s_features' % seq_type)
-        seq_name = 'aligned %s sequence' % seq_type
-
         if isinstance(seq, SeqRecord):
-            seq.id = seq_id
-            seq.description = seq_desc
-            seq.name = seq_name
-            seq.features = seq_feats
+            seq.id = getattr(self, '%s_id' % seq_type)
+            seq.description = getattr(self, '%s_description' % seq_type)
+            seq.name = 'aligned %s sequence' % seq_type
+            seq.features = getattr(self, '%s_features' % seq_type)
             seq.seq.alphabet = self.alphabet
-        elif isinstance(seq, basestring):
-            seq = SeqRecord(Seq(seq, self.alphabet), id=seq_id, name=seq_name,
-                    description=seq_desc, features=seq_feats)
 
         return seq
 
+    def _get_seq(self, seq_type):
+        """Returns the sequence as a SeqRecord object, creating it if needed."""
+        seq = getattr(self, '_%s' % seq_type)
+        if isinstance(seq, basestring):
+            seq = SeqRecord(Seq(seq, self.alphabet),
+                    id=getattr(self, '%s_id' % seq_type),
+                    name='aligned %s sequence' % seq_type,
+                    description=getattr(self, '%s_description' % seq_type),
+                    features=getattr(self, '%s_features' % seq_type))
+            setattr(self, '_%s' % seq_type, seq)
+        return seq
+
+    def _get_seq_str(self, seq_type):
+        """Returns the sequence as a string, without creating a SeqRecord."""
+        seq = getattr(self, '_%s' % seq_type)
+        if isinstance(seq, basestring):
+            return seq
+        return str(seq.seq)
+
     def _hit_get(self):
-        return self._hit
+        return self._get_seq('hit')
 
     def _hit_set(self, value):
         self._hit = self._set_seq(value, 'hit')
@@ -845,7 +864,7 @@ class HSPFragment(_BaseHSP):
             doc="""Hit sequence as a SeqRecord object, defaults to None""")
 
     def _query_get(self):
-        return self._query
+        return self._get_seq('query')
 
     def _query_set(self, value):
         self._query = self._set_seq(value, 'query')
@@ -872,14 +891,10 @@ class HSPFragment(_BaseHSP):
 
     def _alphabet_set(self, value):
         self._alphabet = value
-        try:
-            self.query.seq.alphabet = value
-        except AttributeError:
-            pass
-        try:
-            self.hit.seq.alphabet = value
-        except AttributeError:
-            pass
+        # sequences still kept as strings get the alphabet when needed
+        for seq in (self._query, self._hit):
+            if isinstance(seq, SeqRecord):
+                seq.seq.alphabet = value
 
     alphabet = property(fget=_alphabet_get, fset=_alphabet_set,
             doc="""Alphabet object used in the fragment's sequences and alignment,
@@ -890,10 +905,10 @@ class HSPFragment(_BaseHSP):
         # alignment span can be its own attribute, or computed from
         # query / hit length
         if not hasattr(self, '_aln_span'):
-            if self.query is not None:
-                self._aln_span = len(self.query)
-            elif self.hit is not None:
-                self._aln_span = len(self.hit)
+            if self._query is not None:
+                self._aln_span = len(self._query)
+            elif self._hit is not None:
+                self._aln_span = len(self._hit)
 
         return self._aln_span
 
@@ -24,6 +24,15 @@ from .hit import Hit
 __docformat__ = "restructuredtext en"
 
 
+def _get_hit_id(hit):
+    """Returns the ID of the given Hit, the default key in QueryResult objects.
+
+    This is a function rather than a lambda so QueryResult objects can be
+    pickled (e.g. when parsing in several processes).
+    """
+    return hit.id
+
+
 class QueryResult(_BaseSearchObject):
 
     """Class representing search results from a single query.
@@ -184,12 +193,15 @@ class QueryResult(_BaseSearchObject):
 
     """
 
+    __slots__ = ('_id', '_hit_key_function', '_items', '_description',
+                 '__alt_hit_ids', 'program', 'target', 'version')
+
     # attributes we don't want to transfer when creating a new QueryResult class
     # from this one
     _NON_STICKY_ATTRS = ('_items', '__alt_hit_ids', )
 
     def __init__(self, hits=[], id=None,
-            hit_key_function=lambda hit: hit.id):
+            hit_key_function=_get_hit_id):
         """Initializes a QueryResult object.
 
         :param id: query sequence ID
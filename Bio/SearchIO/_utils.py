@@ -127,8 +127,81 @@ def fragcascade(attr, seq_type, doc=''):
 
     def setter(self, value):
         setattr(self, attr_name, value)
-        seq = getattr(self, seq_type)
-        if seq is not None:
+        # sequences still kept as strings pick up the value when they are
+        # turned into SeqRecord objects
+        seq = getattr(self, '_%s' % seq_type, None)
+        if seq is not None and not isinstance(seq, basestring):
             setattr(seq, attr, value)
 
     return property(fget=getter, fset=setter, doc=doc)
+
+
+class ResultFilter(object):
+    """Decides which hits and HSPs a parser keeps, before creating them.
+
+    This holds the ``max_hits``, ``max_hsps_per_hit``, ``evalue`` and
+    ``bitscore`` arguments accepted by some parsers. HSPs with an e-value
+    above the ``evalue`` threshold or a bitscore below the ``bitscore``
+    threshold are dropped (HSPs without the value are kept), as are hits
+    with all their HSPs dropped by these thresholds (hits without any HSPs
+    in the file are kept). Of the remaining hits and HSPs, only the first
+    ``max_hits`` hits of each query and the first ``max_hsps_per_hit`` HSPs
+    of each hit are kept, in the order of the file.
+
+    """
+
+    def __init__(self, max_hits=None, max_hsps_per_hit=None, evalue=None,
+            bitscore=None):
+        for name, value in (('max_hits', max_hits),
+                ('max_hsps_per_hit', max_hsps_per_hit)):
+            if value is not None and value < 1:
+                raise ValueError("%s should be at least 1, not %r" %
+                        (name, value))
+        self.max_hits = max_hits
+        self.max_hsps_per_hit = max_hsps_per_hit
+        self.evalue = evalue
+        self.bitscore = bitscore
+        self.has_thresholds = evalue is not None or bitscore is not None
+        self.is_active = self.has_thresholds or max_hits is not None or \
+                max_hsps_per_hit is not None
+        self.reset()
+
+    def reset(self):
+        """Starts counting the hits and HSPs of a new query."""
+        self._qid = self._hid = None
+        self._hit_count = self._hsp_count = 0
+
+    def check_hsp(self, evalue, bitscore):
+        """Returns whether an HSP with the given values passes the thresholds."""
+        if self.evalue is not None and evalue is not None and \
+                evalue > self.evalue:
+            return False
+        if self.bitscore is not None and bitscore is not None and \
+                bitscore < self.bitscore:
+            return False
+        return True
+
+    def check_row(self, qid, hid, evalue, bitscore):
+        """Returns whether an HSP given as a row of a table is kept.
+
+        This is for formats with a row for each HSP, where the rows of each
+        hit follow each other. The hits and HSPs are counted across calls,
+        starting again with each new query ID (or call to ``reset``).
+
+        """
+        if not self.check_hsp(evalue, bitscore):
+            return False
+        if qid != self._qid:
+            self.reset()
+            self._qid = qid
+        if hid != self._hid:
+            if self.max_hits is not None and self._hit_count >= self.max_hits:
+                return False
+            self._hid = hid
+            self._hit_count += 1
+            self._hsp_count = 0
+        if self.max_hsps_per_hit is not None and \
+                self._hsp_count >= self.max_hsps_per_hit:
+            return False
+        self._hsp_count += 1
+        return True
@@ -13,6 +13,8 @@ You are expected to use this module via the Bio.SeqIO functions."""
 
 from __future__ import print_function
 
+import re
+
 from Bio.Alphabet import single_letter_alphabet
 from Bio.Seq import Seq
 from Bio.SeqRecord import SeqRecord
@@ -21,7 +23,15 @@ from Bio.SeqIO.Interfaces import SequentialSequenceWriter
 __docformat__ = "restructuredtext en"
 
 
-def SimpleFastaParser(handle):
+# Default number of characters read at a time by SimpleFastaParser
+FASTA_BLOCK_SIZE = 65536
+
+# Any white space which str.rstrip() would remove, other than the spaces,
+# new lines and carriage returns the block parser handles itself
+_AWKWARD_WHITESPACE = re.compile(r"[^\S \n\r]", re.UNICODE)
+
+
+def SimpleFastaParser(handle, block_size=FASTA_BLOCK_SIZE):
     """Generator function to iterate over Fasta records (as string tuples).
 
     For each record a tuple of two strings is returned, the FASTA title
@@ -39,7 +49,28 @@ def SimpleFastaParser(handle):
     ('alpha (again - this is a duplicate entry to test the indexing code)', 'ACGTA')
     ('delta', 'CGCGC')
 
+    By default the handle is read in large blocks of block_size characters,
+    and the record boundaries are located within each block. This is
+    faster than reading the file line by line, but means the handle is
+    read ahead of the records returned so far. For interactive use (e.g.
+    reading from a pipe where you want each record as soon as its lines
+    arrive) you can use block_size=None to read the handle line by line:
+
+    >>> with open("Fasta/dups.fasta") as handle:
+    ...     print(next(SimpleFastaParser(handle, block_size=None)))
+    ('alpha', 'ACGTA')
+
+    Both modes return the same values. Trailing white space is removed from
+    every line, as well as any spaces or carriage returns within the
+    sequence.
     """
+    if block_size:
+        return _fasta_block_parser(handle, block_size)
+    return _fasta_line_parser(handle)
+
+
+def _fasta_line_parser(handle):
+    """Iterate over Fasta records as string tuples, reading line by line (PRIVATE)."""
     # Skip any text before the first record (e.g. blank lines, comments)
     while True:
         line = handle.readline()
@@ -74,7 +105,80 @@ def SimpleFastaParser(handle):
     assert False, "Should not reach this line"
 
 
-def FastaIterator(handle, alphabet=single_letter_alphabet, title2ids=None):
+def _fasta_block_parser(handle, block_size):
+    """Iterate over Fasta records as string tuples, reading in blocks (PRIVATE).
+
+    Records start with a '>' at the start of the file or following a new
+    line, so the complete records in each block can be found by splitting
+    on "\\n>" rather than by looking at every line in turn. To match the
+    line based parser, trailing white space is removed from each line and
+    any spaces or carriage returns within the sequence. Only the rare
+    blocks with other white space (e.g. tabs, or in unicode text characters
+    like non-breaking spaces) need to be split into lines to get this
+    exactly right.
+    """
+    read = handle.read
+    data = read(block_size)
+    if not data:
+        return
+
+    # Skip any text before the first record (e.g. blank lines, comments)
+    if data[0] != ">":
+        while True:
+            start = data.find("\n>")
+            if start != -1:
+                data = data[start + 1:]
+                break
+            more = read(block_size)
+            if not more:
+                return  # Premature end of file, or just empty?
+            # Keep the last character in case it is a new line
+            data = data[-1:] + more
+
+    # Invariant: data starts with the '>' of the next record
+    while True:
+        awkward = _AWKWARD_WHITESPACE.search(data) is not None
+        end = data.rfind("\n>")
+        if end != -1:
+            # Return all the complete records in this block
+            for record in data[1:end].split("\n>"):
+                title, _, seq = record.partition("\n")
+                if awkward:
+                    seq = "".join(line.rstrip() for line in seq.split("\n"))
+                    yield title.rstrip(), seq.replace(" ", "").replace("\r", "")
+                else:
+                    yield title.rstrip(), seq.replace("\n", "").replace(
+                        "\r", "").replace(" ", "")
+            data = data[end + 1:]
+        # Now data holds one record, which may continue in the next block.
+        # Collect the pieces in a list (rather than growing a string) until
+        # we find the start of another record or the end of the file.
+        pieces = [data]
+        while True:
+            more = read(block_size)
+            if not more:
+                break
+            pieces.append(more)
+            if (more[0] == ">" and pieces[-2][-1] == "\n") or \
+                    more.find("\n>") != -1:
+                break
+        if len(pieces) > 1:
+            data = "".join(pieces)
+            if more:
+                continue
+        # End of file, just this last record to return
+        title, _, seq = data[1:].partition("\n")
+        if _AWKWARD_WHITESPACE.search(seq) is not None:
+            seq = "".join(line.rstrip() for line in seq.split("\n"))
+            yield title.rstrip(), seq.replace(" ", "").replace("\r", "")
+        else:
+            yield title.rstrip(), seq.replace("\n", "").replace(
+                "\r", "").replace(" ", "")
+        return
+
+
+def FastaIterator(handle, alphabet=single_letter_alphabet, title2ids=None,
+                  block_size=FASTA_BLOCK_SIZE):
     """Generator function to iterate over Fasta records (as SeqRecord objects).
 
     Arguments:
@@ -86,6 +190,8 @@ def FastaIterator(handle, alphabet=single_letter_alphabet, title2ids=None):
        description (in that order) for the record as a tuple of strings.
        If this is not given, then the entire title line will be used
        as the description, and the first word as the id and name.
+     - block_size - Number of characters to read from the handle at a
+       time, or None to read it line by line (see SimpleFastaParser).
 
     By default this will act like calling Bio.SeqIO.parse(handle, "fasta")
     with no custom handling of the title lines:
@@ -116,12 +222,12 @@ def FastaIterator(handle, alphabet=single_letter_alphabet, title2ids=None):
 
     """
     if title2ids:
-        for title, sequence in SimpleFastaParser(handle):
+        for title, sequence in SimpleFastaParser(handle, block_size):
             id, name, descr = title2ids(title)
             yield SeqRecord(Seq(sequence, alphabet),
                             id=id, name=name, description=descr)
     else:
-        for title, sequence in SimpleFastaParser(handle):
+        for title, sequence in SimpleFastaParser(handle, block_size):
             try:
                 first_word = title.split(None, 1)[0]
             except IndexError:
@@ -370,8 +370,10 @@ from Bio.Seq import Seq, UnknownSeq
 from Bio.SeqRecord import SeqRecord
 from Bio.SeqIO.Interfaces import SequentialSequenceWriter
 from math import log
+from array import array
 import warnings
 from Bio import BiopythonWarning, BiopythonParserWarning
+from Bio._py3k import _as_bytes
 
 
 # define score offsets. See discussion for differences between Sanger and
@@ -379,6 +381,9 @@ from Bio import BiopythonWarning, BiopythonParserWarning
 SANGER_SCORE_OFFSET = 33
 SOLEXA_SCORE_OFFSET = 64
 
+# Default number of characters read at a time by FastqGeneralIterator
+FASTQ_BLOCK_SIZE = 65536
+
 
 def solexa_quality_from_phred(phred_quality):
     """Covert a PHRED quality (range 0 to about 90) to a Solexa quality.
@@ -548,6 +553,40 @@ _solexa_to_sanger_quality_str = dict(
     for qs in range(-5, 93 + 1))
 
 
+def _fastq_quality_decoder(offset, min_score, max_score, quality_array=False):
+    """Return a function to turn FASTQ quality strings into scores (PRIVATE).
+
+    Rather than mapping one letter at a time, the whole quality string is
+    checked and decoded in one go using bytes.translate, giving a signed
+    array of scores. By default this is turned into a list of integers,
+    but with quality_array=True the compact array.array("b") is returned
+    as is.
+
+    >>> decode = _fastq_quality_decoder(SANGER_SCORE_OFFSET, 0, 93)
+    >>> decode("!+5?I")
+    [0, 10, 20, 30, 40]
+    >>> decode = _fastq_quality_decoder(SOLEXA_SCORE_OFFSET, -5, 62, True)
+    >>> decode(";@J")
+    array('b', [-5, 0, 10])
+    """
+    valid = bytes(bytearray(range(offset + min_score, offset + max_score + 1)))
+    table = bytes(bytearray((letter - offset) & 0xFF for letter in range(256)))
+
+    def decode(quality_string):
+        try:
+            raw = _as_bytes(quality_string)
+        except UnicodeEncodeError:
+            raise ValueError("Invalid character in quality string")
+        if raw.translate(None, valid):
+            # There were some letters left over, i.e. not valid
+            raise ValueError("Invalid character in quality string")
+        qualities = array("b", raw.translate(table))
+        if quality_array:
+            return qualities
+        return qualities.tolist()
+    return decode
+
+
 def _get_sanger_quality_str(record):
     """Returns a Sanger FASTQ encoded quality string (PRIVATE).
 
@@ -796,7 +835,7 @@ def _get_solexa_quality_str(record):
 
 
 # TODO - Default to nucleotide or even DNA?
-def FastqGeneralIterator(handle):
+def FastqGeneralIterator(handle, block_size=FASTQ_BLOCK_SIZE):
     """Iterate over Fastq records as string tuples (not as SeqRecord objects).
 
     This code does not try to interpret the quality string numerically.  It
@@ -886,7 +925,25 @@ def FastqGeneralIterator(handle):
     observed, so is therefore ignored here.  One plus point about this "!" rule
     is that (provided there are no line breaks in the quality sequence) it
     would prevent the above problem with the "@" character.
+
+    By default the handle is read in large blocks of block_size characters
+    which are split into lines in one go, which is faster than calling the
+    handle's readline method four or more times per record. The handle is
+    therefore read ahead of the records returned so far. Use block_size=None
+    to read the handle line by line instead (e.g. for interactive pipes).
+    Both modes return exactly the same values, and raise the same errors:
+
+    >>> with open("Quality/tricky.fastq", "rU") as handle:
+    ...     print(next(FastqGeneralIterator(handle, block_size=None))[0])
+    071113_EAS56_0053:1:1:998:236
     """
+    if block_size:
+        return _fastq_block_parser(handle, block_size)
+    return _fastq_line_parser(handle)
+
+
+def _fastq_line_parser(handle):
+    """Iterate over Fastq records as string tuples, reading line by line (PRIVATE)."""
     # We need to call handle.readline() at least four times per record,
     # so we'll save a property look up each time:
     handle_readline = handle.readline
@@ -954,10 +1011,149 @@ def FastqGeneralIterator(handle):
 
         # Return the record and then continue...
         yield (title_line, seq_string, quality_string)
-    raise StopIteration
 
 
-def FastqPhredIterator(handle, alphabet=single_letter_alphabet, title2ids=None):
+def _fastq_record_from_lines(lines, i, n, eof):
+    """Parse the Fastq record starting at lines[i] (PRIVATE).
+
+    Only lines[i:n] are available; if eof is false there may be more lines
+    to come. Returns the record as a (title, sequence, quality) tuple along
+    with the index of the following line, or None if more lines are needed.
+    The logic (and any errors raised) follow _fastq_line_parser exactly.
+    """
+    line = lines[i]
+    if line[:1] != "@":
+        raise ValueError(
+            "Records in Fastq files should start with '@' character")
+    title_line = line[1:].rstrip()
+    if i + 1 >= n:
+        if eof:
+            raise ValueError("End of file without quality information.")
+        return None
+    seq_string = lines[i + 1].rstrip()
+    i += 2
+    # There may now be more sequence lines, or the "+" quality marker line:
+    while True:
+        if i >= n:
+            if eof:
+                raise ValueError("End of file without quality information.")
+            return None
+        line = lines[i]
+        i += 1
+        if line[:1] == "+":
+            # The title here is optional, but if present must match!
+            second_title = line[1:].rstrip()
+            if second_title and second_title != title_line:
+                raise ValueError("Sequence and quality captions differ.")
+            break
+        seq_string += line.rstrip()
+    if " " in seq_string or "\t" in seq_string:
+        raise ValueError("Whitespace is not allowed in the sequence.")
+    seq_len = len(seq_string)
+
+    # Will now be at least one line of quality data...
+    if i < n:
+        quality_string = lines[i].rstrip()
+        i += 1
+    elif eof:
+        quality_string = ""
+    else:
+        return None
+    # There may now be more quality data, or another sequence, or EOF
+    while True:
+        if i >= n:
+            if eof:
+                break
+            return None
+        line = lines[i]
+        if line[:1] == "@" and len(quality_string) >= seq_len:
+            # Start of the next record (see _fastq_line_parser)
+            break
+        quality_string += line.rstrip()
+        i += 1
+
+    if seq_len != len(quality_string):
+        raise ValueError("Lengths of sequence and quality values differs "
+                         " for %s (%i and %i)."
+                         % (title_line, seq_len, len(quality_string)))
+    return (title_line, seq_string, quality_string), i
+
+
+def _fastq_block_parser(handle, block_size):
+    """Iterate over Fastq records as string tuples, reading in blocks (PRIVATE).
+
+    Each block is split into lines in one go, and the records parsed from
+    this list of lines. A record which runs past the end of a block is
+    parsed again once the next block has been read (doubling the amount
+    read each time this fails, to cope with very long multi-line reads).
+    """
+    read = handle.read
+    lines = []
+    partial = ""
+    i = 0
+    eof = False
+    started = False
+    size = block_size
+    while not eof:
+        data = read(size)
+        if data:
+            if isinstance(data[0], int):
+                raise ValueError("Is this handle in binary mode not text mode?")
+            new_lines = (partial + data).split("\n")
+            partial = new_lines.pop()
+            if i:
+                # Keep the unfinished record (if any) from the last block
+                lines = lines[i:] + new_lines
+            else:
+                lines.extend(new_lines)
+        else:
+            eof = True
+            del lines[:i]
+            if partial:
+                lines.append(partial)
+        i = 0
+        n = len(lines)
+
+        if not started:
+            # Skip any text before the first record (e.g. blank lines, comments?)
+            while i < n and lines[i][:1] != "@":
+                i += 1
+            if i == n:
+                continue
+            started = True
+
+        start = i
+        while i < n:
+            if i + 4 < n:
+                # Fast path for the usual four line records, falling back
+                # on the general code for anything unusual (or invalid).
+                title_line = lines[i][1:].rstrip()
+                plus_line = lines[i + 2]
+                seq_string = lines[i + 1].rstrip()
+                quality_string = lines[i + 3].rstrip()
+                if lines[i][:1] == "@" and plus_line[:1] == "+" and \
+                        lines[i + 4][:1] == "@" and \
+                        len(seq_string) == len(quality_string) and \
+                        (len(plus_line) == 1 or
+                         plus_line[1:].rstrip() in ("", title_line)) and \
+                        " " not in seq_string and "\t" not in seq_string:
+                    yield (title_line, seq_string, quality_string)
+                    i += 4
+                    continue
+            result = _fastq_record_from_lines(lines, i, n, eof)
+            if result is None:
+                break
+            record, i = result
+            yield record
+        if i == start and not eof:
+            # Not even one complete record, read more next time
+            size *= 2
+        else:
+            size = block_size
+
+
+def FastqPhredIterator(handle, alphabet=single_letter_alphabet, title2ids=None,
+                       quality_array=False):
     """Generator function to iterate over FASTQ records (as SeqRecord objects).
 
         - handle - input file
@@ -968,6 +1164,9 @@ def FastqPhredIterator(handle, alphabet=single_letter_alphabet, title2ids=None):
           strings.  If this is not given, then the entire title line
           will be used as the description, and the first word as the
           id and name.
+        - quality_array - If True, the qualities are stored as a compact
+          signed byte array, array.array("b"), rather than as a list of
+          integers.
 
     Note that use of title2ids matches that of Bio.SeqIO.FastaIO.
 
@@ -1020,16 +1219,24 @@ def FastqPhredIterator(handle, alphabet=single_letter_alphabet, title2ids=None):
     >>> print(record.letter_annotations["phred_quality"])
     [26, 26, 26, 26, 26, 26, 26, 26, 26, 26, 26, 24, 26, 22, 26, 26, 13, 22, 26, 18, 24, 18, 18, 18, 18]
 
+    For large files the list of integers for each record adds up. You can
+    instead ask for the qualities as a compact array of signed bytes, which
+    is also a little faster to create:
+
+    >>> with open("Quality/example.fastq", "rU") as handle:
+    ...     for record in FastqPhredIterator(handle, quality_array=True):
+    ...         pass
+    >>> print(record.letter_annotations["phred_quality"][:5])
+    array('b', [26, 26, 26, 26, 26])
+
     """
     assert SANGER_SCORE_OFFSET == ord("!")
     # Originally, I used a list expression for each record:
     #
     # qualities = [ord(letter)-SANGER_SCORE_OFFSET for letter in quality_string]
     #
-    # Precomputing is faster, perhaps partly by avoiding the subtractions.
-    q_mapping = dict()
-    for letter in range(0, 255):
-        q_mapping[chr(letter)] = letter - SANGER_SCORE_OFFSET
+    # Decoding the whole string at once with bytes.translate is faster.
+    decode = _fastq_quality_decoder(SANGER_SCORE_OFFSET, 0, 93, quality_array)
     for title_line, seq_string, quality_string in FastqGeneralIterator(handle):
         if title2ids:
             id, name, descr = title2ids(title_line)
@@ -1039,9 +1246,7 @@ def FastqPhredIterator(handle, alphabet=single_letter_alphabet, title2ids=None):
             name = id
         record = SeqRecord(Seq(seq_string, alphabet),
                            id=id, name=name, description=descr)
-        qualities = [q_mapping[letter] for letter in quality_string]
-        if qualities and (min(qualities) < 0 or max(qualities) > 93):
-            raise ValueError("Invalid character in quality string")
+        qualities = decode(quality_string)
         # For speed, will now use a dirty trick to speed up assigning the
         # qualities. We do this to bypass the length check imposed by the
         # per-letter-annotations restricted dict (as this has already been
@@ -1052,7 +1257,8 @@ def FastqPhredIterator(handle, alphabet=single_letter_alphabet, title2ids=None):
         yield record
 
 
-def FastqSolexaIterator(handle, alphabet=single_letter_alphabet, title2ids=None):
+def FastqSolexaIterator(handle, alphabet=single_letter_alphabet, title2ids=None,
+                        quality_array=False):
     r"""Parsing old Solexa/Illumina FASTQ like files (which differ in the quality mapping).
 
     The optional arguments are the same as those for the FastqPhredIterator.
@@ -1186,9 +1392,7 @@ def FastqSolexaIterator(handle, alphabet=single_letter_alphabet, title2ids=None)
     As shown above, the poor quality Solexa reads have been mapped to the
     equivalent PHRED score (e.g. -5 to 1 as shown earlier).
     """
-    q_mapping = dict()
-    for letter in range(0, 255):
-        q_mapping[chr(letter)] = letter - SOLEXA_SCORE_OFFSET
+    decode = _fastq_quality_decoder(SOLEXA_SCORE_OFFSET, -5, 62, quality_array)
     for title_line, seq_string, quality_string in FastqGeneralIterator(handle):
         if title2ids:
             id, name, descr = title_line
@@ -1198,10 +1402,8 @@ def FastqSolexaIterator(handle, alphabet=single_letter_alphabet, title2ids=None)
             name = id
         record = SeqRecord(Seq(seq_string, alphabet),
                            id=id, name=name, description=descr)
-        qualities = [q_mapping[letter] for letter in quality_string]
         # DO NOT convert these into PHRED qualities automatically!
-        if qualities and (min(qualities) < -5 or max(qualities) > 62):
-            raise ValueError("Invalid character in quality string")
+        qualities = decode(quality_string)
         # Dirty trick to speed up this line:
         # record.letter_annotations["solexa_quality"] = qualities
         dict.__setitem__(record._per_letter_annotations,
@@ -1209,7 +1411,8 @@ def FastqSolexaIterator(handle, alphabet=single_letter_alphabet, title2ids=None)
         yield record
 
 
-def FastqIlluminaIterator(handle, alphabet=single_letter_alphabet, title2ids=None):
+def FastqIlluminaIterator(handle, alphabet=single_letter_alphabet, title2ids=None,
+                          quality_array=False):
     """Parse Illumina 1.3 to 1.7 FASTQ like files (which differ in the quality mapping).
 
     The optional arguments are the same as those for the FastqPhredIterator.
@@ -1238,9 +1441,7 @@ def FastqIlluminaIterator(handle, alphabet=single_letter_alphabet, title2ids=Non
 
     NOTE - True Sanger style FASTQ files use PHRED scores with an offset of 33.
     """
-    q_mapping = dict()
-    for letter in range(0, 255):
-        q_mapping[chr(letter)] = letter - SOLEXA_SCORE_OFFSET
+    decode = _fastq_quality_decoder(SOLEXA_SCORE_OFFSET, 0, 62, quality_array)
     for title_line, seq_string, quality_string in FastqGeneralIterator(handle):
         if title2ids:
             id, name, descr = title2ids(title_line)
@@ -1250,9 +1451,7 @@ def FastqIlluminaIterator(handle, alphabet=single_letter_alphabet, title2ids=Non
             name = id
         record = SeqRecord(Seq(seq_string, alphabet),
                            id=id, name=name, description=descr)
-        qualities = [q_mapping[letter] for letter in quality_string]
-        if qualities and (min(qualities) < 0 or max(qualities) > 62):
-            raise ValueError("Invalid character in quality string")
+        qualities = decode(quality_string)
         # Dirty trick to speed up this line:
         # record.letter_annotations["phred_quality"] = qualities
         dict.__setitem__(record._per_letter_annotations,
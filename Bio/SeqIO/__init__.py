@@ -183,6 +183,15 @@ True
 Because this uses two bytes for each new line, the file is longer than
 the Unix equivalent with only one byte.
 
+For bulk processing of very large FASTA, FASTQ or tab files where you don't
+need full SeqRecord objects, the Bio.SeqIO.parse_batches(...) function returns
+batches of records as parallel lists of identifiers, sequences and (packed)
+quality scores. See its docstring for details.
+
+To fetch just a region of a long sequence (e.g. a few hundred bases from a
+chromosome) from a FASTA file, use the Bio.SeqIO.index_faidx(...) function.
+This uses a samtools faidx compatible index to read only the bytes needed.
+
 
 Input - Alignments
 ------------------
@@ -603,6 +612,61 @@ def parse(handle, format, alphabet=None):
             yield r
 
 
+def parse_batches(handle, format, batch_size=1000):
+    """Turns a sequence file into an iterator returning batches of records.
+
+        - handle     - handle to the file, or the filename as a string
+        - format     - lower case string describing the file format, one
+          of "fasta", "fastq" (or "fastq-sanger"), "fastq-solexa",
+          "fastq-illumina" or "tab".
+        - batch_size - maximum number of records in each batch.
+
+    For bulk processing of millions of short reads, creating a SeqRecord
+    object for each read is a significant overhead. This function instead
+    returns SeqBatch objects holding the records as columns, i.e. parallel
+    lists of the identifiers (ids), full title lines (descriptions) and
+    sequences (seqs) as plain strings. For FASTQ files the quality scores
+    of the whole batch are held as a single packed array.array("b") in the
+    qualities attribute, with a quality(index) method to get the scores of
+    an individual record.
+
+    >>> from Bio import SeqIO
+    >>> for batch in SeqIO.parse_batches("Quality/example.fastq", "fastq", 2):
+    ...     print("%i records, %i scores" % (len(batch), len(batch.qualities)))
+    ...     print(batch.ids)
+    2 records, 50 scores
+    ['EAS54_6_R1_2_1_413_324', 'EAS54_6_R1_2_1_540_792']
+    1 records, 25 scores
+    ['EAS54_6_R1_2_1_443_348']
+    >>> print(batch.seqs[0])
+    GTTGCTTCTGGCGTGGGTGGGGGGG
+    >>> print(list(batch.quality(0)[:5]))
+    [26, 26, 26, 26, 26]
+
+    If you need a SeqRecord for a particular entry, use the batch's record
+    method, or iterate over the batch.
+    """
+    from ._batch import _FormatToBatchIterator
+
+    # Try and give helpful error messages:
+    if not isinstance(format, basestring):
+        raise TypeError("Need a string for the file format (lower case)")
+    if not format:
+        raise ValueError("Format required (lower case string)")
+    if format != format.lower():
+        raise ValueError("Format string '%s' should be lower case" % format)
+    if format not in _FormatToBatchIterator:
+        raise ValueError("Batch parsing of format '%s' is not supported"
+                         % format)
+    if batch_size < 1:
+        raise ValueError("Batch size should be at least one, not %r"
+                         % batch_size)
+
+    with as_handle(handle, 'rU') as fp:
+        for batch in _FormatToBatchIterator[format](fp, batch_size):
+            yield batch
+
+
 def _force_alphabet(record_iterator, alphabet):
     """Iterate over records, over-riding the alphabet (PRIVATE)."""
     # Assume the alphabet argument has been pre-validated
@@ -738,7 +802,8 @@ def to_dict(sequences, key_function=None):
     return d
 
 
-def index(filename, format, alphabet=None, key_function=None):
+def index(filename, format, alphabet=None, key_function=None, backend="dict",
+          use_mmap=False):
     """Indexes a sequence file and returns a dictionary like object.
 
         - filename - string giving name of file to be indexed
@@ -749,6 +814,13 @@ def index(filename, format, alphabet=None, key_function=None):
         - key_function - Optional callback function which when given a
           SeqRecord identifier string should return a unique
           key for the dictionary.
+        - backend - Optional string, how to hold the keys and offsets in
+          memory. The default "dict" uses a Python dictionary, while
+          "compact" packs them into arrays, taking several times less
+          memory for files with millions of records (string keys only).
+        - use_mmap - Optional boolean, memory map the file (unless it is BGZF
+          compressed) to speed up accessing the records, useful for many
+          random lookups in a large file.
 
     This indexing function will return a dictionary like object, giving the
     SeqRecord objects as values:
@@ -834,6 +906,18 @@ def index(filename, format, alphabet=None, key_function=None):
     None
     >>> records.close()
 
+    For very large files, such as millions of short reads, the compact
+    backend keeps memory usage down:
+
+    >>> from Bio import SeqIO
+    >>> records = SeqIO.index("Quality/example.fastq", "fastq",
+    ...                       backend="compact")
+    >>> list(records)
+    ['EAS54_6_R1_2_1_413_324', 'EAS54_6_R1_2_1_540_792', 'EAS54_6_R1_2_1_443_348']
+    >>> print(records["EAS54_6_R1_2_1_540_792"].seq)
+    TTGGCAGGCCAAGGCCGATGGATCA
+    >>> records.close()
+
     Another common use case would be indexing an NCBI style FASTA file,
     where you might want to extract the GI number from the FASTA identifier
     to use as the dictionary key.
@@ -861,19 +945,85 @@ def index(filename, format, alphabet=None, key_function=None):
 
     # Map the file format to a sequence iterator:
     from ._index import _FormatToRandomAccess  # Lazy import
-    from Bio.File import _IndexedSeqFileDict
+    from Bio.File import _IndexedSeqFileDict, _CompactIndexedSeqFileDict
     try:
         proxy_class = _FormatToRandomAccess[format]
     except KeyError:
         raise ValueError("Unsupported format %r" % format)
+    if backend == "dict":
+        dict_class = _IndexedSeqFileDict
+    elif backend == "compact":
+        dict_class = _CompactIndexedSeqFileDict
+    else:
+        raise ValueError("Unknown backend %r, use 'dict' or 'compact'"
+                         % backend)
     repr = "SeqIO.index(%r, %r, alphabet=%r, key_function=%r)" \
         % (filename, format, alphabet, key_function)
-    return _IndexedSeqFileDict(proxy_class(filename, format, alphabet),
-                               key_function, repr, "SeqRecord")
+    return dict_class(proxy_class(filename, format, alphabet, use_mmap),
+                      key_function, repr, "SeqRecord")
+
+
+def index_faidx(filename, alphabet=None, fai_filename=None, use_mmap=False):
+    """Index a FASTA file for access to regions of its sequences.
+
+        - filename - string giving name of the FASTA file to be indexed,
+          which may be BGZF compressed
+        - alphabet - optional Alphabet object for the sequences
+        - fai_filename - optional name of the samtools style index file,
+          by default the FASTA filename plus ".fai"
+        - use_mmap - Optional boolean, memory map the file (unless it is BGZF
+          compressed).
+
+    If the index file exists it is used, otherwise the FASTA file is scanned
+    to build the index (in memory, use the write_fai method to save it). This
+    requires all the lines of each sequence to be the same length, except the
+    last. The returned object's fetch method gives a region of a sequence as
+    a Seq object, reading only the bytes for that region:
+
+    >>> from Bio import SeqIO
+    >>> faidx = SeqIO.index_faidx("GenBank/NC_005816.ffn")
+    >>> len(faidx)
+    10
+    >>> name = faidx.keys()[0]
+    >>> print(name)
+    ref|NC_005816.1|:87-1109
+    >>> faidx.length(name)
+    1023
+    >>> print(faidx.fetch(name, 65, 75))
+    GATTGCCAGA
+    >>> print(faidx.fetch(name, -10))
+    AGTGGCGTGA
+    >>> faidx.close()
+
+    As with samtools, for BGZF compressed files the offsets in the index
+    refer to the uncompressed data. These are mapped to BGZF virtual offsets
+    using a samtools ".gzi" file (the FASTA filename plus ".gzi") if present,
+    or by scanning the BGZF block headers.
+
+    See also: Bio.SeqIO.index() for access to whole records.
+    """
+    if not isinstance(filename, basestring):
+        raise TypeError("Need a filename (not a handle)")
+    from ._index import FastaFaidxRandomAccess  # Lazy import
+    return FastaFaidxRandomAccess(filename, "fasta", alphabet, use_mmap,
+                                  fai_filename)
+
+
+def _index_db_proxy_factory(alphabet, format, filename=None):
+    """Given a filename returns proxy object, else boolean if format OK (PRIVATE).
+
+    Used via functools.partial in index_db, defined at module level so that
+    it can be pickled for the worker processes.
+    """
+    from ._index import _FormatToRandomAccess  # Lazy import
+    if filename:
+        return _FormatToRandomAccess[format](filename, format, alphabet)
+    else:
+        return format in _FormatToRandomAccess
 
 
 def index_db(index_filename, filenames=None, format=None, alphabet=None,
-             key_function=None):
+             key_function=None, workers=1):
     """Index several sequence files and return a dictionary like object.
 
     The index is stored in an SQLite database rather than in memory (as in the
@@ -891,6 +1041,10 @@ def index_db(index_filename, filenames=None, format=None, alphabet=None,
         - key_function - Optional callback function which when given a
           SeqRecord identifier string should return a unique
           key for the dictionary.
+        - workers - Optional number of processes to use when building a new
+          index, each scanning a different file (default one). Only this
+          process writes to the SQLite database, and the key_function is
+          also only called here.
 
     This indexing function will return a dictionary like object, giving the
     SeqRecord objects as values:
@@ -940,21 +1094,14 @@ def index_db(index_filename, filenames=None, format=None, alphabet=None,
         raise ValueError("Invalid alphabet, %r" % alphabet)
 
     # Map the file format to a sequence iterator:
-    from ._index import _FormatToRandomAccess  # Lazy import
+    from functools import partial
     from Bio.File import _SQLiteManySeqFilesDict
     repr = "SeqIO.index_db(%r, filenames=%r, format=%r, alphabet=%r, key_function=%r)" \
                % (index_filename, filenames, format, alphabet, key_function)
-
-    def proxy_factory(format, filename=None):
-        """Given a filename returns proxy object, else boolean if format OK."""
-        if filename:
-            return _FormatToRandomAccess[format](filename, format, alphabet)
-        else:
-            return format in _FormatToRandomAccess
-
+    proxy_factory = partial(_index_db_proxy_factory, alphabet)
     return _SQLiteManySeqFilesDict(index_filename, filenames,
                                    proxy_factory, format,
-                                   key_function, repr)
+                                   key_function, repr, workers=workers)
 
 
 def convert(in_file, in_format, out_file, out_format, alphabet=None):
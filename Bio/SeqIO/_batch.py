@@ -0,0 +1,204 @@
+# Copyright 2016 by Biopython contributors.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+"""Column based batch parsing of sequence files (PRIVATE).
+
+You are not expected to access this module, or any of its code, directly. This
+is all handled internally by the Bio.SeqIO.parse_batches(...) function which is
+the public interface for this.
+
+Rather than creating a SeqRecord (and Seq, and restricted per-letter-annotation
+dictionary) for every record, these parsers collect the values from thousands
+of records into parallel lists, held in a SeqBatch object. For FASTQ files the
+quality strings for the whole batch are decoded in one go into a single packed
+array.array("b") of scores.
+"""
+
+from array import array
+
+from Bio.Alphabet import single_letter_alphabet
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+from Bio.SeqIO.FastaIO import SimpleFastaParser
+from Bio.SeqIO.QualityIO import FastqGeneralIterator, _fastq_quality_decoder
+from Bio.SeqIO.QualityIO import SANGER_SCORE_OFFSET, SOLEXA_SCORE_OFFSET
+
+__docformat__ = "restructuredtext en"
+
+
+class SeqBatch(object):
+    """A batch of sequence records held as parallel lists (columns).
+
+    Attributes:
+
+     - ids - list of record identifiers (the first word of the title)
+     - descriptions - list of the full title lines (empty for "tab")
+     - seqs - list of the sequences as strings
+     - qualities - for FASTQ, an array.array("b") holding the quality
+       scores of all the records concatenated, otherwise None
+     - quality_key - for FASTQ, the letter annotation name for the scores,
+       either "phred_quality" or "solexa_quality", otherwise None
+
+    The scores for an individual record are available via the quality
+    method, which slices the packed array using the sequence lengths.
+    If you do need SeqRecord objects, use the record method (or iterate
+    over the batch), although this defeats the purpose of batching.
+    """
+
+    __slots__ = ("ids", "descriptions", "seqs", "qualities", "quality_key",
+                 "_starts")
+
+    def __init__(self, ids, descriptions, seqs, qualities=None,
+                 quality_key=None):
+        """Create a SeqBatch object from the column values."""
+        self.ids = ids
+        self.descriptions = descriptions
+        self.seqs = seqs
+        self.qualities = qualities
+        self.quality_key = quality_key
+        self._starts = None
+
+    def __len__(self):
+        """Return the number of records in the batch."""
+        return len(self.seqs)
+
+    def __repr__(self):
+        """Return a short summary of the batch."""
+        return "<%s with %i records>" % (self.__class__.__name__, len(self))
+
+    def quality(self, index):
+        """Return the quality scores for the given record as an array slice."""
+        if self.qualities is None:
+            raise ValueError("This batch has no quality scores")
+        if self._starts is None:
+            starts = array("l", [0])
+            total = 0
+            for seq in self.seqs:
+                total += len(seq)
+                starts.append(total)
+            self._starts = starts
+        if index < 0:
+            index += len(self)
+        return self.qualities[self._starts[index]:self._starts[index + 1]]
+
+    def record(self, index, alphabet=single_letter_alphabet):
+        """Return the given record as a SeqRecord object."""
+        identifier = self.ids[index]
+        record = SeqRecord(Seq(self.seqs[index], alphabet),
+                           id=identifier, name=identifier,
+                           description=self.descriptions[index])
+        if self.qualities is not None:
+            record.letter_annotations[self.quality_key] = \
+                self.quality(index).tolist()
+        return record
+
+    def __iter__(self):
+        """Iterate over the records in the batch as SeqRecord objects."""
+        for index in range(len(self)):
+            yield self.record(index)
+
+
+def _first_word(title):
+    """Return the first word of a title line, or an empty string (PRIVATE)."""
+    try:
+        return title.split(None, 1)[0]
+    except IndexError:
+        return ""
+
+
+def _fasta_batch_iterator(handle, batch_size):
+    """Iterate over a FASTA file as SeqBatch objects (PRIVATE)."""
+    ids = []
+    descriptions = []
+    seqs = []
+    for title, seq in SimpleFastaParser(handle):
+        ids.append(_first_word(title))
+        descriptions.append(title)
+        seqs.append(seq)
+        if len(seqs) == batch_size:
+            yield SeqBatch(ids, descriptions, seqs)
+            ids = []
+            descriptions = []
+            seqs = []
+    if seqs:
+        yield SeqBatch(ids, descriptions, seqs)
+
+
+def _fastq_batch_iterator(handle, batch_size, offset, min_score, max_score,
+                          quality_key):
+    """Iterate over a FASTQ file as SeqBatch objects (PRIVATE)."""
+    decode = _fastq_quality_decoder(offset, min_score, max_score, True)
+    ids = []
+    descriptions = []
+    seqs = []
+    quals = []
+    for title, seq, qual in FastqGeneralIterator(handle):
+        ids.append(_first_word(title))
+        descriptions.append(title)
+        seqs.append(seq)
+        quals.append(qual)
+        if len(seqs) == batch_size:
+            yield SeqBatch(ids, descriptions, seqs,
+                           decode("".join(quals)), quality_key)
+            ids = []
+            descriptions = []
+            seqs = []
+            quals = []
+    if seqs:
+        yield SeqBatch(ids, descriptions, seqs,
+                       decode("".join(quals)), quality_key)
+
+
+def _fastq_phred_batch_iterator(handle, batch_size):
+    """Iterate over a Sanger style FASTQ file as SeqBatch objects (PRIVATE)."""
+    return _fastq_batch_iterator(handle, batch_size, SANGER_SCORE_OFFSET,
+                                 0, 93, "phred_quality")
+
+
+def _fastq_solexa_batch_iterator(handle, batch_size):
+    """Iterate over a Solexa style FASTQ file as SeqBatch objects (PRIVATE)."""
+    return _fastq_batch_iterator(handle, batch_size, SOLEXA_SCORE_OFFSET,
+                                 -5, 62, "solexa_quality")
+
+
+def _fastq_illumina_batch_iterator(handle, batch_size):
+    """Iterate over an Illumina 1.3+ FASTQ file as SeqBatch objects (PRIVATE)."""
+    return _fastq_batch_iterator(handle, batch_size, SOLEXA_SCORE_OFFSET,
+                                 0, 62, "phred_quality")
+
+
+def _tab_batch_iterator(handle, batch_size):
+    """Iterate over a tab separated file as SeqBatch objects (PRIVATE).
+
+    This follows Bio.SeqIO.TabIO.TabIterator, including ignoring blank lines.
+    """
+    ids = []
+    seqs = []
+    for line in handle:
+        try:
+            title, seq = line.split("\t")  # will fail if more than one tab!
+        except ValueError:
+            if line.strip() == "":
+                # It's a blank line, ignore it
+                continue
+            raise ValueError("Each line should have one tab separating the" +
+                             " title and sequence, this line has %i tabs: %r"
+                             % (line.count("\t"), line))
+        ids.append(title.strip())
+        seqs.append(seq.strip())
+        if len(seqs) == batch_size:
+            yield SeqBatch(ids, [""] * len(ids), seqs)
+            ids = []
+            seqs = []
+    if seqs:
+        yield SeqBatch(ids, [""] * len(ids), seqs)
+
+
+_FormatToBatchIterator = {"fasta": _fasta_batch_iterator,
+                          "fastq": _fastq_phred_batch_iterator,
+                          "fastq-sanger": _fastq_phred_batch_iterator,
+                          "fastq-solexa": _fastq_solexa_batch_iterator,
+                          "fastq-illumina": _fastq_illumina_batch_iterator,
+                          "tab": _tab_batch_iterator,
+                          }
@@ -25,20 +25,34 @@ temp lookup file might be one idea (e.g. using SQLite or an OBDA style index).
 
 from __future__ import print_function
 
+import mmap
+import os
 import re
+import struct
+from bisect import bisect_right
 from Bio._py3k import StringIO
 from Bio._py3k import _bytes_to_string, _as_bytes
 
 from Bio import SeqIO
 from Bio import Alphabet
+from Bio import bgzf
 from Bio.File import _IndexedSeqFileProxy, _open_for_random_access
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
 
 __docformat__ = "restructuredtext en"
 
 
 class SeqFileRandomAccess(_IndexedSeqFileProxy):
-    def __init__(self, filename, format, alphabet):
-        self._handle = _open_for_random_access(filename)
+    """Base class for random access to sequence files (PRIVATE).
+
+    With use_mmap=True an uncompressed file is memory mapped, and the mmap
+    object is used as the handle. This avoids the system calls for each
+    seek, read and readline in the subclasses, and some subclasses scan
+    the mapped file directly for record boundaries.
+    """
+    def __init__(self, filename, format, alphabet, use_mmap=False):
+        self._handle = _open_for_random_access(filename, use_mmap)
         self._alphabet = alphabet
         self._format = format
         # Load the parser class/function once an avoid the dict lookup in each
@@ -75,8 +89,9 @@ class SeqFileRandomAccess(_IndexedSeqFileProxy):
 # number of flows.
 class SffRandomAccess(SeqFileRandomAccess):
     """Random access to a Standard Flowgram Format (SFF) file."""
-    def __init__(self, filename, format, alphabet):
-        SeqFileRandomAccess.__init__(self, filename, format, alphabet)
+    def __init__(self, filename, format, alphabet, use_mmap=False):
+        SeqFileRandomAccess.__init__(self, filename, format, alphabet,
+                                     use_mmap)
         header_length, index_offset, index_length, number_of_reads, \
             self._flows_per_read, self._flow_chars, self._key_sequence \
             = SeqIO.SffIO._sff_file_header(self._handle)
@@ -166,8 +181,9 @@ class SffTrimedRandomAccess(SffRandomAccess):
 ###################
 
 class SequentialSeqFileRandomAccess(SeqFileRandomAccess):
-    def __init__(self, filename, format, alphabet):
-        SeqFileRandomAccess.__init__(self, filename, format, alphabet)
+    def __init__(self, filename, format, alphabet, use_mmap=False):
+        SeqFileRandomAccess.__init__(self, filename, format, alphabet,
+                                     use_mmap)
         marker = {"ace": "CO ",
                   "embl": "ID ",
                   "fasta": ">",
@@ -182,9 +198,48 @@ class SequentialSeqFileRandomAccess(SeqFileRandomAccess):
                   }[format]
         self._marker = marker
         self._marker_re = re.compile(_as_bytes("^%s" % marker))
+        # Can scan a memory mapped file for a new line plus the marker,
+        # except for PIR where the marker is a regular expression
+        if isinstance(self._handle, mmap.mmap) and "." not in marker:
+            self._mmap_marker = _as_bytes("\n" + marker)
+        else:
+            self._mmap_marker = None
 
     def __iter__(self):
         """Returns (id,offset) tuples."""
+        if self._mmap_marker:
+            return self._mmap_iter()
+        return self._handle_iter()
+
+    def _mmap_iter(self):
+        """Returns (id,offset) tuples by scanning the mapped file (PRIVATE)."""
+        data = self._handle
+        marker_offset = len(self._marker)
+        new_marker = self._mmap_marker
+        newline = new_marker[:1]
+        if data[:marker_offset] == new_marker[1:]:
+            start_offset = 0
+        else:
+            # Skip any header before first record
+            start_offset = data.find(new_marker)
+            if start_offset == -1:
+                return
+            start_offset += 1
+        while start_offset != -1:
+            end_of_line = data.find(newline, start_offset)
+            if end_of_line == -1:
+                end_of_line = len(data)
+            id = data[start_offset + marker_offset:end_of_line].strip().split(None, 1)[0]
+            end_offset = data.find(new_marker, end_of_line)
+            if end_offset == -1:
+                yield _bytes_to_string(id), start_offset, len(data) - start_offset
+                break
+            end_offset += 1
+            yield _bytes_to_string(id), start_offset, end_offset - start_offset
+            start_offset = end_offset
+
+    def _handle_iter(self):
+        """Returns (id,offset) tuples reading the file line by line (PRIVATE)."""
         marker_offset = len(self._marker)
         marker_re = self._marker_re
         handle = self._handle
@@ -217,6 +272,13 @@ class SequentialSeqFileRandomAccess(SeqFileRandomAccess):
         """Return the raw record from the file as a bytes string."""
         # For non-trivial file formats this must be over-ridden in the subclass
         handle = self._handle
+        if self._mmap_marker:
+            # Find the start of the next record (the end of this one),
+            # and take a single slice of the mapped file
+            end_offset = handle.find(self._mmap_marker, offset)
+            if end_offset == -1:
+                return handle[offset:]
+            return handle[offset:end_offset + 1]
         marker_re = self._marker_re
         handle.seek(offset)
         lines = [handle.readline()]
@@ -453,8 +515,9 @@ class UniprotRandomAccess(SequentialSeqFileRandomAccess):
 
 class IntelliGeneticsRandomAccess(SeqFileRandomAccess):
     """Random access to a IntelliGenetics file."""
-    def __init__(self, filename, format, alphabet):
-        SeqFileRandomAccess.__init__(self, filename, format, alphabet)
+    def __init__(self, filename, format, alphabet, use_mmap=False):
+        SeqFileRandomAccess.__init__(self, filename, format, alphabet,
+                                     use_mmap)
         self._marker_re = re.compile(_as_bytes("^;"))
 
     def __iter__(self):
@@ -637,6 +700,280 @@ class FastqRandomAccess(SeqFileRandomAccess):
         return data
 
 
+#############################################
+# FASTA sub-sequences via a samtools index #
+#############################################
+
+class FastaFaidxRandomAccess(SeqFileRandomAccess):
+    """Random access to regions of sequences in a FASTA file (.fai index).
+
+    This uses a samtools faidx compatible index, with one tab separated line
+    per sequence giving the name, length in bases, offset of the first base,
+    bases per line and bytes per line (including the line terminator). From
+    these any region can be located and read directly, without loading the
+    whole sequence. This requires all the sequence lines of each record to
+    be the same length, except the last.
+
+    If the index file (by default the FASTA filename plus ".fai") exists it
+    is loaded, otherwise the FASTA file is scanned to build the index, which
+    can be saved with the write_fai method.
+
+    For BGZF compressed FASTA files, the index offsets are (as in samtools)
+    in the uncompressed data. These are mapped to BGZF virtual offsets using
+    a samtools style ".gzi" file if present, or by scanning the block headers.
+
+    Following the proxy interface, iterating gives (name, offset, length)
+    tuples where offset and length refer to the sequence lines (not the
+    header line), and get and get_raw take such an offset.
+    """
+
+    def __init__(self, filename, format="fasta", alphabet=None,
+                 use_mmap=False, fai_filename=None):
+        SeqFileRandomAccess.__init__(self, filename, format, alphabet,
+                                     use_mmap)
+        if fai_filename is None:
+            fai_filename = filename + ".fai"
+        self._fai_filename = fai_filename
+        self._blocks = None
+        self._names = []
+        self._entries = {}
+        self._by_offset = {}
+        try:
+            self._load_index(filename, fai_filename)
+        except Exception:
+            # Don't leave the FASTA file open
+            self._handle.close()
+            raise
+
+    def _load_index(self, filename, fai_filename):
+        """Load or build the .fai index, and any BGZF block table (PRIVATE)."""
+        if isinstance(self._handle, bgzf.BgzfReader):
+            gzi_filename = filename + ".gzi"
+            if os.path.isfile(gzi_filename):
+                with open(gzi_filename, "rb") as handle:
+                    self._blocks = _read_gzi(handle)
+            else:
+                self._blocks = _bgzf_block_table(self._handle._handle)
+        if os.path.isfile(fai_filename):
+            with open(fai_filename) as handle:
+                entries = _read_fai(handle)
+        else:
+            entries = self._build_fai()
+        for name, length, offset, line_bases, line_width in entries:
+            if name in self._entries:
+                raise ValueError("Duplicate key '%s'" % name)
+            self._names.append(name)
+            self._entries[name] = (length, offset, line_bases, line_width)
+            self._by_offset[offset] = name
+
+    def _build_fai(self):
+        """Scan the FASTA file, returning the .fai entries as tuples (PRIVATE)."""
+        handle = self._handle
+        handle.seek(0)
+        gt_char = _as_bytes(">")
+        new_line = _as_bytes("\n")
+        line_ends = _as_bytes("\r\n")
+        entries = []
+        pos = 0  # in the uncompressed data
+        name = None
+        for line in iter(handle.readline, _as_bytes("")):
+            pos += len(line)
+            if line[:1] == gt_char:
+                if name is not None:
+                    entries.append((name, length, offset, line_bases,
+                                    line_width))
+                try:
+                    name = _bytes_to_string(line[1:].split(None, 1)[0])
+                except IndexError:
+                    raise ValueError("Missing sequence name at offset %i"
+                                     % (pos - len(line)))
+                offset = pos
+                length = line_bases = line_width = 0
+                last_line = False
+                continue
+            if name is None:
+                if line.strip():
+                    raise ValueError("Expected FASTA '>' line, not %r"
+                                     % line)
+                continue
+            bases = len(line.rstrip(line_ends))
+            if not bases:
+                # Blank lines are only allowed at the end of a record
+                last_line = True
+                continue
+            if last_line:
+                raise ValueError("Different line length in sequence '%s'"
+                                 % name)
+            if not line_width:
+                line_bases = bases
+                line_width = len(line)
+            elif bases != line_bases or len(line) != line_width:
+                # The last line of the file may have no line terminator
+                if bases > line_bases or \
+                        (len(line) - bases != line_width - line_bases and
+                         line[-1:] == new_line):
+                    raise ValueError("Different line length in sequence '%s'"
+                                     % name)
+                # A shorter line, must be the last one
+                last_line = True
+            length += bases
+        if name is not None:
+            entries.append((name, length, offset, line_bases, line_width))
+        return entries
+
+    def write_fai(self, filename=None):
+        """Save the index in samtools .fai format (by default FASTA filename plus ".fai")."""
+        if filename is None:
+            filename = self._fai_filename
+        with open(filename, "w") as handle:
+            for name in self._names:
+                handle.write("%s\t%i\t%i\t%i\t%i\n"
+                             % ((name,) + self._entries[name]))
+
+    def __iter__(self):
+        """Iterate over (name, offset, length) tuples for the sequence lines."""
+        last = len(self._names) - 1
+        for i, name in enumerate(self._names):
+            entry = self._entries[name]
+            size = self._raw_size(entry)
+            if i == last and size:
+                # The last line of the file may have no line terminator
+                end = size - (entry[3] - entry[2])
+                if not self._read(entry[1] + end, 1):
+                    size = end
+            yield name, entry[1], size
+
+    def keys(self):
+        """Return a list of the sequence names in file order."""
+        return list(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def length(self, name):
+        """Return the length in bases of the named sequence."""
+        return self._entries[name][0]
+
+    def _raw_position(self, entry, position):
+        """Bytes from the first base to the given base position (PRIVATE)."""
+        line_bases, line_width = entry[2:]
+        if not line_bases:
+            return 0
+        return (position // line_bases) * line_width + position % line_bases
+
+    def _raw_size(self, entry):
+        """Bytes in the sequence lines, including line terminators (PRIVATE)."""
+        length, offset, line_bases, line_width = entry
+        if not line_bases:
+            return 0
+        lines = -(-length // line_bases)
+        return length + lines * (line_width - line_bases)
+
+    def _read(self, offset, size):
+        """Read bytes starting at the (uncompressed) offset (PRIVATE)."""
+        handle = self._handle
+        if self._blocks is None:
+            handle.seek(offset)
+        else:
+            starts, raw_starts = self._blocks
+            i = bisect_right(starts, offset) - 1
+            handle.seek(bgzf.make_virtual_offset(raw_starts[i],
+                                                 offset - starts[i]))
+        return handle.read(size)
+
+    def fetch(self, name, start=None, end=None):
+        """Return a region of the named sequence as a Seq object.
+
+        The start and end follow Python slicing, i.e. zero based with the
+        end excluded, and can be negative or omitted. Only the bytes for the
+        region are read from the file.
+        """
+        try:
+            entry = self._entries[name]
+        except KeyError:
+            raise KeyError(name)
+        start, end, step = slice(start, end).indices(entry[0])
+        alphabet = self._alphabet or Alphabet.single_letter_alphabet
+        if start >= end:
+            return Seq("", alphabet)
+        first = self._raw_position(entry, start)
+        last = self._raw_position(entry, end)
+        data = self._read(entry[1] + first, last - first)
+        data = data.replace(_as_bytes("\n"), _as_bytes("")) \
+            .replace(_as_bytes("\r"), _as_bytes(""))
+        return Seq(_bytes_to_string(data), alphabet)
+
+    def get_raw(self, offset):
+        """Return the raw sequence lines (bytes) given the sequence offset."""
+        entry = self._entries[self._by_offset[offset]]
+        return self._read(offset, self._raw_size(entry))
+
+    def get(self, offset):
+        """Return the whole sequence as a SeqRecord given the sequence offset."""
+        name = self._by_offset[offset]
+        return SeqRecord(self.fetch(name), id=name, name=name,
+                         description="")
+
+    def close(self):
+        """Close the file handle being used to read the data."""
+        self._handle.close()
+
+
+def _read_fai(handle):
+    """Parse a samtools .fai index, returning a list of tuples (PRIVATE)."""
+    entries = []
+    for line in handle:
+        if not line.strip():
+            continue
+        parts = line.rstrip("\n").split("\t")
+        if len(parts) < 5:
+            raise ValueError("Invalid .fai line: %r" % line)
+        entries.append((parts[0],) + tuple(int(x) for x in parts[1:5]))
+    return entries
+
+
+def _read_gzi(handle):
+    """Parse a samtools .gzi BGZF index, returning two lists (PRIVATE).
+
+    The lists give the uncompressed and compressed start offsets of the
+    BGZF blocks (the first block at zero is implicit in the file).
+    """
+    count, = struct.unpack("<Q", handle.read(8))
+    starts = [0]
+    raw_starts = [0]
+    for i in range(count):
+        raw_start, start = struct.unpack("<QQ", handle.read(16))
+        starts.append(start)
+        raw_starts.append(raw_start)
+    return starts, raw_starts
+
+
+def _bgzf_block_table(handle):
+    """Scan a BGZF file, returning two lists of block start offsets (PRIVATE).
+
+    The lists give the uncompressed and compressed start offsets of the
+    non-empty BGZF blocks. The blocks are not decompressed.
+    """
+    handle.seek(0)
+    starts = []
+    raw_starts = []
+    start = raw_start = 0
+    while True:
+        try:
+            block_size, raw = bgzf._read_bgzf_block(handle)
+        except StopIteration:
+            break
+        if raw[2]:
+            starts.append(start)
+            raw_starts.append(raw_start)
+        start += raw[2]
+        raw_start += block_size
+    return starts, raw_starts
+
+
 ###############################################################################
 
 _FormatToRandomAccess = {"ace": SequentialSeqFileRandomAccess,
@@ -233,6 +233,7 @@ import struct
 
 from Bio._py3k import _as_bytes, _as_string
 from Bio._py3k import open as _open
+from Bio._py3k import OrderedDict
 
 __docformat__ = "restructuredtext en"
 
@@ -244,12 +245,16 @@ _bgzf_eof = b"\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00BC\x02\x00\x1b\x00
 _bytes_BC = b"BC"
 
 
-def open(filename, mode="rb"):
-    """Open a BGZF file for reading, writing or appending."""
+def open(filename, mode="rb", threads=1):
+    """Open a BGZF file for reading, writing or appending.
+
+    The optional threads argument is passed to the BgzfReader or BgzfWriter
+    to decompress or compress several blocks in parallel.
+    """
     if "r" in mode.lower():
-        return BgzfReader(filename, mode)
+        return BgzfReader(filename, mode, threads=threads)
     elif "w" in mode.lower() or "a" in mode.lower():
-        return BgzfWriter(filename, mode)
+        return BgzfWriter(filename, mode, threads=threads)
     else:
         raise ValueError("Bad mode %r" % mode)
 
@@ -404,6 +409,17 @@ def BgzfBlocks(handle):
 
 def _load_bgzf_block(handle, text_mode=False):
     """Internal function to load the next BGZF function (PRIVATE)."""
+    block_size, raw = _read_bgzf_block(handle)
+    return block_size, _inflate_bgzf_block(raw, text_mode)
+
+
+def _read_bgzf_block(handle):
+    """Internal function to read the next raw BGZF block (PRIVATE).
+
+    Returns the block size and a tuple of the compressed data, the expected
+    CRC and the expected decompressed size, for _inflate_bgzf_block. This
+    split allows the decompression to be done in another thread.
+    """
     magic = handle.read(4)
     if not magic:
         # End of file
@@ -430,10 +446,17 @@ def _load_bgzf_block(handle, text_mode=False):
     assert block_size is not None, "Missing BC, this isn't a BGZF file!"
     # Now comes the compressed data, CRC, and length of uncompressed data.
     deflate_size = block_size - 1 - extra_len - 19
-    d = zlib.decompressobj(-15)  # Negative window size means no headers
-    data = d.decompress(handle.read(deflate_size)) + d.flush()
+    deflated = handle.read(deflate_size)
     expected_crc = handle.read(4)
     expected_size = struct.unpack("<I", handle.read(4))[0]
+    return block_size, (deflated, expected_crc, expected_size)
+
+
+def _inflate_bgzf_block(raw, text_mode=False):
+    """Internal function to decompress a raw BGZF block (PRIVATE)."""
+    deflated, expected_crc, expected_size = raw
+    d = zlib.decompressobj(-15)  # Negative window size means no headers
+    data = d.decompress(deflated) + d.flush()
     assert expected_size == len(data), \
            "Decompressed to %i, not %i" % (len(data), expected_size)
     # Should cope with a mix of Python platforms...
@@ -445,9 +468,44 @@ def _load_bgzf_block(handle, text_mode=False):
     assert expected_crc == crc, \
            "CRC is %s, not %s" % (crc, expected_crc)
     if text_mode:
-        return block_size, _as_string(data)
+        return _as_string(data)
     else:
-        return block_size, data
+        return data
+
+
+def _make_bgzf_block(block, compresslevel):
+    """Internal function to compress data as a complete BGZF block (PRIVATE)."""
+    assert len(block) <= 65536
+    # Giving a negative window bits means no gzip/zlib headers, -15 used in samtools
+    c = zlib.compressobj(compresslevel,
+                         zlib.DEFLATED,
+                         -15,
+                         zlib.DEF_MEM_LEVEL,
+                         0)
+    compressed = c.compress(block) + c.flush()
+    del c
+    assert len(compressed) < 65536, "TODO - Didn't compress enough, try less data in this block"
+    bsize = struct.pack("<H", len(compressed) + 25)  # includes -1
+    crc = struct.pack("<I", zlib.crc32(block) & 0xffffffff)
+    uncompressed_length = struct.pack("<I", len(block))
+    # Fixed 16 bytes,
+    # gzip magic bytes (4) mod time (4),
+    # gzip flag (1), os (1), extra length which is six (2),
+    # sub field which is BC (2), sub field length of two (2),
+    # Variable data,
+    # 2 bytes: block length as BC sub field (2)
+    # X bytes: the data
+    # 8 bytes: crc (4), uncompressed data length (4)
+    return _bgzf_header + bsize + compressed + crc + uncompressed_length
+
+
+def _thread_pool(threads):
+    """Internal function to create a thread pool, or None for one thread (PRIVATE)."""
+    if threads == 1:
+        return None
+    # zlib releases the GIL while (de)compressing, so threads help here
+    from multiprocessing.pool import ThreadPool
+    return ThreadPool(threads)
 
 
 class BgzfReader(object):
@@ -517,13 +575,42 @@ class BgzfReader(object):
     block can be up to 64kb, the default cache could take up to 6MB of
     RAM. The cache is not important for reading through the file in one
     pass, but is important for improving performance of random access.
+    The cache is least recently used (LRU), so frequently revisited blocks
+    are kept. If your blocks vary in size, you may prefer to limit the
+    total size of the decompressed data held in the cache instead, using
+    the max_cache_bytes argument (both limits apply if given).
+
+    For sequential reading, the read_ahead argument (default zero) sets
+    how many of the following blocks to load and decompress into the cache
+    whenever a block is loaded from disk in order. The cache_hits and
+    cache_misses attributes count how often a block was found in the
+    cache or had to be loaded from disk, which is useful for tuning these
+    settings:
+
+    >>> handle = BgzfReader("SamBam/ex1.bam", "rb", read_ahead=4)
+    >>> data = handle.read(300000)
+    >>> print("%i hits, %i misses" % (handle.cache_hits, handle.cache_misses))
+    4 hits, 1 misses
+    >>> handle.close()
+
+    With threads greater than one, the blocks read ahead are decompressed
+    in parallel using a pool of threads (reading ahead at least threads - 1
+    blocks). This only helps when reading through large parts of the file
+    in order.
     """
 
-    def __init__(self, filename=None, mode="r", fileobj=None, max_cache=100):
+    def __init__(self, filename=None, mode="r", fileobj=None, max_cache=100,
+                 max_cache_bytes=None, read_ahead=0, threads=1):
         # TODO - Assuming we can seek, check for 28 bytes EOF empty block
         # and if missing warn about possible truncation (as in samtools)?
         if max_cache < 1:
             raise ValueError("Use max_cache with a minimum of 1")
+        if max_cache_bytes is not None and max_cache_bytes < 1:
+            raise ValueError("Use max_cache_bytes with a minimum of 1")
+        if read_ahead < 0:
+            raise ValueError("Use read_ahead with a minimum of 0")
+        if threads < 1:
+            raise ValueError("Use threads with a minimum of 1")
         # Must open the BGZF file in binary mode, but we may want to
         # treat the contents as either text or binary (unicode or
         # bytes under Python 3)
@@ -543,10 +630,81 @@ class BgzfReader(object):
             self._newline = b"\n"
         self._handle = handle
         self.max_cache = max_cache
-        self._buffers = {}
+        self.max_cache_bytes = max_cache_bytes
+        self.read_ahead = read_ahead
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Maps block start offsets to (data, raw block length), with the
+        # least recently used block first:
+        self._buffers = OrderedDict()
+        self._cache_bytes = 0
         self._block_start_offset = None
         self._block_raw_length = None
-        self._load_block(handle.tell())
+        # Only start the threads once the file is open, and stop them again
+        # (closing the file if we opened it) if the first block can't be
+        # loaded
+        self._pool = _thread_pool(threads)
+        if self._pool is not None:
+            self.read_ahead = max(read_ahead, threads - 1)
+        try:
+            self._load_block(handle.tell())
+        except Exception:
+            if self._pool is not None:
+                self._pool.terminate()
+                self._pool.join()
+                self._pool = None
+            if not fileobj:
+                handle.close()
+            raise
+
+    def _cache_block(self, start_offset, buffer, block_size):
+        """Add a block to the cache, removing the least recently used (PRIVATE)."""
+        buffers = self._buffers
+        size = len(buffer)
+        while buffers and (len(buffers) >= self.max_cache or
+                           (self.max_cache_bytes is not None and
+                            self._cache_bytes + size > self.max_cache_bytes)):
+            old_buffer, old_size = buffers.popitem(last=False)[1]
+            self._cache_bytes -= len(old_buffer)
+        buffers[start_offset] = buffer, block_size
+        self._cache_bytes += size
+
+    def _read_ahead(self, start_offset, used):
+        """Load the blocks following the current block into the cache (PRIVATE).
+
+        Assumes the underlying handle is at start_offset. Stops early at
+        the end of the file, at a block already cached, or if there is not
+        room in the cache without evicting the blocks just loaded.
+        """
+        handle = self._handle
+        blocks = []
+        for i in range(min(self.read_ahead, self.max_cache - 1)):
+            if start_offset in self._buffers:
+                break
+            try:
+                block_size, raw = _read_bgzf_block(handle)
+            except StopIteration:
+                break
+            used += raw[2]  # decompressed size
+            if self.max_cache_bytes is not None and \
+                    used > self.max_cache_bytes:
+                break
+            blocks.append((start_offset, block_size, raw))
+            if not raw[2]:
+                break
+            start_offset += block_size
+        if self._pool is not None and len(blocks) > 1:
+            # Decompress the blocks in parallel (result order is preserved)
+            text = self._text
+            buffers = self._pool.map(_inflate_bgzf_block,
+                                     [raw for s, b, raw in blocks])
+            if text:
+                buffers = [_as_string(b) for b in buffers]
+        else:
+            buffers = [_inflate_bgzf_block(raw, self._text)
+                       for s, b, raw in blocks]
+        for (start_offset, block_size, raw), buffer in zip(blocks, buffers):
+            self._cache_block(start_offset, buffer, block_size)
 
     def _load_block(self, start_offset=None):
         if start_offset is None:
@@ -558,20 +716,22 @@ class BgzfReader(object):
             self._within_block_offset = 0
             return
         elif start_offset in self._buffers:
-            # Already in cache
-            self._buffer, self._block_raw_length = self._buffers[start_offset]
+            # Already in cache, move to the end as most recently used
+            self.cache_hits += 1
+            entry = self._buffers.pop(start_offset)
+            self._buffers[start_offset] = entry
+            self._buffer, self._block_raw_length = entry
             self._within_block_offset = 0
             self._block_start_offset = start_offset
             return
-        # Must hit the disk... first check cache limits,
-        while len(self._buffers) >= self.max_cache:
-            # TODO - Implemente LRU cache removal?
-            self._buffers.popitem()
-        # Now load the block
+        # Must hit the disk...
+        self.cache_misses += 1
+        # Treat the first block loaded as the start of sequential reading
+        sequential = self._block_raw_length is None or \
+            start_offset == self._block_start_offset + self._block_raw_length
         handle = self._handle
-        if start_offset is not None:
-            handle.seek(start_offset)
-        self._block_start_offset = handle.tell()
+        handle.seek(start_offset)
+        self._block_start_offset = start_offset
         try:
             block_size, self._buffer = _load_bgzf_block(handle, self._text)
         except StopIteration:
@@ -583,8 +743,11 @@ class BgzfReader(object):
                 self._buffer = b""
         self._within_block_offset = 0
         self._block_raw_length = block_size
-        # Finally save the block in our cache,
-        self._buffers[self._block_start_offset] = self._buffer, block_size
+        # Save the block in our cache,
+        self._cache_block(start_offset, self._buffer, block_size)
+        if sequential and self.read_ahead and self._buffer:
+            # Reading in order, so decompress the next few blocks now
+            self._read_ahead(start_offset + block_size, len(self._buffer))
 
     def tell(self):
         """Returns a 64-bit unsigned BGZF virtual offset."""
@@ -698,6 +861,10 @@ class BgzfReader(object):
         self._buffer = None
         self._block_start_offset = None
         self._buffers = None
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
 
     def seekable(self):
         return True
@@ -716,8 +883,19 @@ class BgzfReader(object):
 
 
 class BgzfWriter(object):
+    """BGZF writer, acts like a write only handle but tell differs.
 
-    def __init__(self, filename=None, mode="w", fileobj=None, compresslevel=6):
+    With threads greater than one, full blocks are compressed in parallel
+    using a pool of threads, while still being written to the file in
+    order. Calling tell (or flush) waits for any pending blocks to be
+    written, so avoid calling it more often than needed when using threads.
+    """
+
+    def __init__(self, filename=None, mode="w", fileobj=None, compresslevel=6,
+                 threads=1):
+        # Check this before opening (and so truncating) the file
+        if threads < 1:
+            raise ValueError("Use threads with a minimum of 1")
         if fileobj:
             assert filename is None
             handle = fileobj
@@ -733,39 +911,29 @@ class BgzfWriter(object):
         self._handle = handle
         self._buffer = b""
         self.compresslevel = compresslevel
+        self._pool = _thread_pool(threads)
+        # Blocks being compressed by the pool, in the order to write them:
+        self._pending = []
+        self._max_pending = 4 * threads
 
     def _write_block(self, block):
         # print("Saving %i bytes" % len(block))
-        start_offset = self._handle.tell()
-        assert len(block) <= 65536
-        # Giving a negative window bits means no gzip/zlib headers, -15 used in samtools
-        c = zlib.compressobj(self.compresslevel,
-                             zlib.DEFLATED,
-                             -15,
-                             zlib.DEF_MEM_LEVEL,
-                             0)
-        compressed = c.compress(block) + c.flush()
-        del c
-        assert len(compressed) < 65536, "TODO - Didn't compress enough, try less data in this block"
-        crc = zlib.crc32(block)
-        # Should cope with a mix of Python platforms...
-        if crc < 0:
-            crc = struct.pack("<i", crc)
-        else:
-            crc = struct.pack("<I", crc)
-        bsize = struct.pack("<H", len(compressed) + 25)  # includes -1
-        crc = struct.pack("<I", zlib.crc32(block) & 0xffffffff)
-        uncompressed_length = struct.pack("<I", len(block))
-        # Fixed 16 bytes,
-        # gzip magic bytes (4) mod time (4),
-        # gzip flag (1), os (1), extra length which is six (2),
-        # sub field which is BC (2), sub field length of two (2),
-        # Variable data,
-        # 2 bytes: block length as BC sub field (2)
-        # X bytes: the data
-        # 8 bytes: crc (4), uncompressed data length (4)
-        data = _bgzf_header + bsize + compressed + crc + uncompressed_length
-        self._handle.write(data)
+        if self._pool is None:
+            self._handle.write(_make_bgzf_block(block, self.compresslevel))
+            return
+        self._pending.append(self._pool.apply_async(
+            _make_bgzf_block, (block, self.compresslevel)))
+        if len(self._pending) >= self._max_pending:
+            # Don't let too much data build up in memory
+            self._write_pending(self._max_pending // 2)
+
+    def _write_pending(self, limit=None):
+        """Write out compressed blocks from the thread pool in order (PRIVATE)."""
+        if limit is None:
+            limit = len(self._pending)
+        for result in self._pending[:limit]:
+            self._handle.write(result.get())
+        del self._pending[:limit]
 
     def write(self, data):
         # TODO - Check bytes vs unicode
@@ -789,21 +957,29 @@ class BgzfWriter(object):
             self._buffer = self._buffer[65535:]
         self._write_block(self._buffer)
         self._buffer = b""
+        self._write_pending()
         self._handle.flush()
 
     def close(self):
         """Flush data, write 28 bytes empty BGZF EOF marker, and close the BGZF file."""
         if self._buffer:
             self.flush()
+        self._write_pending()
         # samtools will look for a magic EOF marker, just a 28 byte empty BGZF block,
         # and if it is missing warns the BAM file may be truncated. In addition to
         # samtools writing this block, so too does bgzip - so we should too.
         self._handle.write(_bgzf_eof)
         self._handle.flush()
         self._handle.close()
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
 
     def tell(self):
         """Returns a BGZF 64-bit virtual offset."""
+        if self._pending:
+            self._write_pending()
         return make_virtual_offset(self._handle.tell(), len(self._buffer))
 
     def seekable(self):
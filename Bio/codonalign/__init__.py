@@ -103,7 +103,9 @@ def build(pro_align, nucl_seqs, corr_dict=None, gap_char='-', unknown='X',
         # and nucl_seqs are the same. If nucl_seqs is a dict or read by
         # SeqIO.index(), we match seqs in pro_align and those in
         # nucl_seq by their id.
-        if nucl_seqs.__class__.__name__ in ("_IndexedSeqFileDict", "dict"):
+        if nucl_seqs.__class__.__name__ in ("_IndexedSeqFileDict",
+                                            "_CompactIndexedSeqFileDict",
+                                            "dict"):
             corr_method = 1
         elif nucl_seqs.__class__.__name__ in ("list", "tuple"):
             corr_method = 0
@@ -123,7 +125,8 @@ def build(pro_align, nucl_seqs, corr_dict=None, gap_char='-', unknown='X',
                 nucl_seqs = dict((i.id, i) for i in nucl_seqs)
                 # nucl_seqs = {i.id: i for i in nucl_seqs}
             elif nucl_seqs.__class__.__name__ in \
-                    ("_IndexedSeqFileDict", "dict"):
+                    ("_IndexedSeqFileDict", "_CompactIndexedSeqFileDict",
+                     "dict"):
                 pass
             else:
                 raise TypeError("Nucl Sequences Error, Unknown type of "
@@ -9,6 +9,12 @@ and position-specific scoring matrices.
 import math
 import platform
 
+try:
+    import numpy
+except ImportError:
+    # Only needed for the C code
+    numpy = None
+
 from Bio._py3k import range
 
 from Bio.Seq import Seq
@@ -355,17 +361,9 @@ class PositionSpecificScoringMatrix(GenericPositionMatrix):
            number is returned
          - otherwise, the result is a one-dimensional list or numpy array
         """
-        # TODO - Code itself tolerates ambiguous bases (as NaN).
-        if not isinstance(self.alphabet, IUPAC.IUPACUnambiguousDNA):
-            raise ValueError("PSSM has wrong alphabet: %s - Use only with DNA motifs"
-                                 % self.alphabet)
-        if not isinstance(sequence.alphabet, IUPAC.IUPACUnambiguousDNA):
-            raise ValueError("Sequence has wrong alphabet: %r - Use only with DNA sequences"
-                                 % sequence.alphabet)
-
         # TODO - Force uppercase here and optimise switch statement in C
         # by assuming upper case?
-        sequence = str(sequence)
+        sequence = self._check_alphabets(sequence)
         m = self.length
         n = len(sequence)
 
@@ -376,26 +374,28 @@ class PositionSpecificScoringMatrix(GenericPositionMatrix):
         else:
             return scores
 
+    def _check_alphabets(self, sequence):
+        """Check the PSSM and sequence are DNA, returns sequence as a string (PRIVATE)."""
+        # TODO - Code itself tolerates ambiguous bases (as NaN).
+        if not isinstance(self.alphabet, IUPAC.IUPACUnambiguousDNA):
+            raise ValueError("PSSM has wrong alphabet: %s - Use only with DNA motifs"
+                                 % self.alphabet)
+        if not isinstance(sequence.alphabet, IUPAC.IUPACUnambiguousDNA):
+            raise ValueError("Sequence has wrong alphabet: %r - Use only with DNA sequences"
+                                 % sequence.alphabet)
+        return str(sequence)
+
     def search(self, sequence, threshold=0.0, both=True):
         """Find hits with PWM score above given threshold.
 
         A generator function, returning found hits in the given sequence
         with the pwm score higher than the threshold.
+
+        The scores for all positions are calculated in a single pass over
+        the sequence for each strand, using the C code if available.
         """
-        sequence = sequence.upper()
-        n = len(sequence)
-        m = self.length
-        if both:
-            rc = self.reverse_complement()
-        for position in range(0, n - m + 1):
-            s = sequence[position:position + m]
-            score = self.calculate(s)
-            if score > threshold:
-                yield (position, score)
-            if both:
-                score = rc.calculate(s)
-                if score > threshold:
-                    yield (position - n, score)
+        self._check_alphabets(sequence)
+        return _search(self, str(sequence), threshold, both)
 
     @property
     def max(self):
@@ -530,3 +530,77 @@ class PositionSpecificScoringMatrix(GenericPositionMatrix):
         for letter in self._letters:
             background[letter] /= total
         return ScoreDistribution(precision=precision, pssm=self, background=background)
+
+
+def _positions_above(scores, threshold):
+    """Return the positions with scores above the threshold (PRIVATE)."""
+    if numpy is not None and isinstance(scores, numpy.ndarray):
+        # NaN (for ambiguous letters) compares as False
+        return numpy.flatnonzero(scores > threshold).tolist()
+    return [i for i, score in enumerate(scores) if score > threshold]
+
+
+def _search(pssm, sequence, threshold, both):
+    """Find hits in the sequence (a string) above the threshold (PRIVATE).
+
+    Generator function used by the PSSM search method and search_pssms.
+    Hits on both strands are returned in order of position, with those on
+    the reverse strand given as negative positions as in the search method.
+    """
+    m = pssm.length
+    n = len(sequence)
+    if n < m:
+        return
+    scores = pssm._calculate(sequence, m, n)
+    forward = _positions_above(scores, threshold)
+    if both:
+        rc = pssm.reverse_complement()
+        rc_scores = rc._calculate(sequence, m, n)
+        reverse = _positions_above(rc_scores, threshold)
+    else:
+        reverse = []
+    # Merge the two sorted lists of hit positions
+    i = j = 0
+    while i < len(forward) or j < len(reverse):
+        if j == len(reverse) or (i < len(forward) and forward[i] <= reverse[j]):
+            yield (forward[i], scores[forward[i]])
+            i += 1
+        else:
+            yield (reverse[j] - n, rc_scores[reverse[j]])
+            j += 1
+
+
+def search_pssms(pssms, sequence, threshold=0.0, both=True):
+    """Search a sequence with several PSSMs, e.g. a JASPAR collection.
+
+    Arguments:
+
+     - pssms - list of PositionSpecificScoringMatrix objects
+     - sequence - DNA Seq object to search
+     - threshold - minimum score (exclusive), either a single value or a
+       list with one value for each PSSM
+     - both - also search the reverse strand (default True)
+
+    A generator function, returning (index, position, score) tuples where
+    index gives the PSSM in the list, and position is negative for hits on
+    the reverse strand (as in the PSSM search method). The hits are given
+    for each PSSM in turn. The sequence is checked and converted only once,
+    and each strand is scored in a single pass for each PSSM.
+    """
+    pssms = list(pssms)
+    try:
+        thresholds = list(threshold)
+    except TypeError:
+        thresholds = [threshold] * len(pssms)
+    if len(thresholds) != len(pssms):
+        raise ValueError("Got %i thresholds for %i PSSMs"
+                         % (len(thresholds), len(pssms)))
+    if not pssms:
+        return
+    sequence = pssms[0]._check_alphabets(sequence)
+    for index, (pssm, threshold) in enumerate(zip(pssms, thresholds)):
+        if not isinstance(pssm.alphabet, IUPAC.IUPACUnambiguousDNA):
+            raise ValueError("PSSM has wrong alphabet: %s - Use only with DNA motifs"
+                             % pssm.alphabet)
+        for position, score in _search(pssm, sequence, threshold, both):
+            yield index, position, score
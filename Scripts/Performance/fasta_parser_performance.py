@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""Compare the throughput of the block and line based FASTA parsers.
+
+Usage::
+
+    python fasta_parser_performance.py [filename.fasta]
+
+Without a filename, a temporary FASTA file of short and long records is
+generated and used instead.
+"""
+from __future__ import print_function
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from Bio.SeqIO.FastaIO import SimpleFastaParser, FASTA_BLOCK_SIZE
+
+__docformat__ = "restructuredtext en"
+
+
+def make_example(filename, short_records=200000, long_records=20):
+    """Write a mixture of short reads and long wrapped sequences."""
+    random.seed(0)
+    with open(filename, "w") as handle:
+        for i in range(short_records):
+            seq = "".join(random.choice("ACGT") for j in range(100))
+            handle.write(">read%i some description\n%s\n" % (i, seq))
+        for i in range(long_records):
+            line = "".join(random.choice("ACGT") for j in range(60))
+            handle.write(">chrom%i\n" % i)
+            handle.write((line + "\n") * 20000)
+
+
+def time_parser(filename, block_size):
+    """Return the record count, characters parsed and seconds taken."""
+    start_time = time.time()
+    count = 0
+    chars = 0
+    with open(filename) as handle:
+        for title, seq in SimpleFastaParser(handle, block_size=block_size):
+            count += 1
+            chars += len(seq)
+    return count, chars, time.time() - start_time
+
+
+if len(sys.argv) > 1:
+    filename = sys.argv[1]
+    temp = None
+else:
+    temp, filename = tempfile.mkstemp(suffix=".fasta")
+    os.close(temp)
+    print("Generating example file %s" % filename)
+    make_example(filename)
+
+size = os.path.getsize(filename) / 1048576.0
+try:
+    for name, block_size in [("Line loop", None),
+                             ("Block reader", FASTA_BLOCK_SIZE),
+                             ("Block reader (1MB)", 1048576)]:
+        count, chars, elapsed_time = time_parser(filename, block_size)
+        print(name)
+        print("\tDid %i records (%i letters) in %0.2f seconds for\n"
+              "\t%0.1f MB per second"
+              % (count, chars, elapsed_time, size / elapsed_time))
+finally:
+    if temp is not None:
+        os.remove(filename)
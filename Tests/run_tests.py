@@ -139,8 +139,14 @@ DOCTEST_MODULES = [
 if is_numpy():
     DOCTEST_MODULES.extend(["Bio.Affy.CelFile",
                             "Bio.Statistics.lowess",
+                            "Bio.PDB.AtomArray",
+                            "Bio.PDB.CellList",
+                            "Bio.PDB.MMCIFIO",
                             "Bio.PDB.Polypeptide",
+                            "Bio.PDB.SASA",
                             "Bio.PDB.Selection",
+                            "Bio.PDB.Superimposer",
+                            "Bio.PDB.Trajectory",
                             "Bio.SeqIO.PdbIO",
                             ])
 
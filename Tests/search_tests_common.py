@@ -79,6 +79,10 @@ class CheckIndex(unittest.TestCase):
         self.assertEqual(len(parsed), len(indexed),
                          "Should be %i records in %s, index says %i"
                          % (len(parsed), filename, len(indexed)))
+        # and by the compact index
+        compact = SearchIO.index(filename, format, backend="compact",
+                                 **kwargs)
+        self.assertEqual(sorted(indexed), sorted(compact))
         # compare values by index_db, only if sqlite3 is present
         if sqlite3 is not None:
             db_indexed = SearchIO.index_db(':memory:', [filename], format, **kwargs)
@@ -92,6 +96,7 @@ class CheckIndex(unittest.TestCase):
             self.assertNotEqual(id(qres), id(idx_qres))
             # but they should have the same attribute values
             self.assertTrue(compare_search_obj(qres, idx_qres))
+            self.assertTrue(compare_search_obj(qres, compact[qres.id]))
             # sqlite3 comparison, only if it's present
             if sqlite3 is not None:
                 dbidx_qres = db_indexed[qres.id]
@@ -99,6 +104,7 @@ class CheckIndex(unittest.TestCase):
                 self.assertTrue(compare_search_obj(qres, dbidx_qres))
 
         indexed.close()
+        compact.close()
         if sqlite3 is not None:
             db_indexed.close()
             db_indexed._con.close()
@@ -109,6 +115,48 @@ class CheckIndex(unittest.TestCase):
             self.check_index(filename + ".bgz", format, **kwargs)
 
 
+class CheckFilters(unittest.TestCase):
+    """Base class for testing the filters applied by the parsers."""
+    fmt = None  # define this in subclasses!
+
+    def check_filters(self, filename, drop_empty=False, max_hits=None,
+                      max_hsps_per_hit=None, evalue=None, bitscore=None,
+                      **kwargs):
+        """Compare parsing with the filters to filtering the full parse.
+
+        If drop_empty is true, queries left without any hits are expected
+        to be missing (for formats with no rows for queries without hits).
+        """
+        filtered = list(SearchIO.parse(filename, self.fmt, max_hits=max_hits,
+                                       max_hsps_per_hit=max_hsps_per_hit,
+                                       evalue=evalue, bitscore=bitscore,
+                                       **kwargs))
+        expected = []
+        for qres in SearchIO.parse(filename, self.fmt, **kwargs):
+            hits = []
+            for hit in qres:
+                hsps = [hsp for hsp in hit.hsps
+                        if (evalue is None or hsp.evalue <= evalue) and
+                        (bitscore is None or hsp.bitscore >= bitscore)]
+                # only hits with all their HSPs rejected are dropped
+                if hsps or not hit.hsps:
+                    hits.append((hit, hsps[:max_hsps_per_hit]))
+            hits = hits[:max_hits]
+            if hits or not drop_empty:
+                expected.append((qres, hits))
+
+        self.assertEqual([qres.id for qres, hits in expected],
+                         [qres.id for qres in filtered])
+        for (qres, hits), filtered_qres in zip(expected, filtered):
+            self.assertEqual([hit.id for hit, hsps in hits],
+                             [hit.id for hit in filtered_qres])
+            for (hit, hsps), filtered_hit in zip(hits, filtered_qres):
+                self.assertEqual(len(hsps), len(filtered_hit))
+                for hsp, filtered_hsp in zip(hsps, filtered_hit):
+                    self.assertTrue(compare_search_obj(hsp, filtered_hsp))
+        return filtered
+
+
 def _num_difference(obj_a, obj_b):
     """Returns the number of instance attributes presence only in one object."""
     attrs_a = set(obj_a.__dict__)
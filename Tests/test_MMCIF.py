@@ -10,6 +10,9 @@
 """Unit tests for the MMCIF portion of the Bio.PDB module."""
 
 import unittest
+import warnings
+
+from Bio._py3k import StringIO
 
 try:
     import numpy
@@ -22,12 +25,16 @@ except ImportError:
         "Install NumPy if you want to use Bio.PDB.")
 
 
+from Bio import BiopythonWarning
 from Bio.Seq import Seq
 from Bio.Alphabet import generic_protein
 from Bio.PDB.PDBExceptions import PDBConstructionException, PDBConstructionWarning
 
 from Bio.PDB import PPBuilder, CaPPBuilder
 from Bio.PDB.MMCIFParser import MMCIFParser
+from Bio.PDB.MMCIF2Dict import MMCIF2Dict
+from Bio.PDB.MMCIFIO import MMCIFIO
+from Bio.PDB import PDBParser, Select
 
 
 class ParseReal(unittest.TestCase):
@@ -142,6 +149,176 @@ class ParseReal(unittest.TestCase):
         structure = parser.get_structure("example", open("PDB/1A8O.cif"))
         self.assertEqual(len(structure), 1)
 
+class TrajectoryTests(unittest.TestCase):
+    """Read the models of an mmCIF file as a trajectory."""
+
+    def test_trajectory(self):
+        """Compare the frames of 1LCD with the full structure."""
+        structure = MMCIFParser(QUIET=True).get_structure("1LCD", "PDB/1LCD.cif")
+        trajectory = MMCIFParser(QUIET=True).get_trajectory("1LCD", "PDB/1LCD.cif")
+        self.assertEqual(3, len(trajectory))
+        self.assertEqual([1, 2, 3], trajectory.serial_nums)
+        self.assertEqual(1, len(trajectory.structure))
+        atoms = trajectory.structure.get_atom_array().atoms
+        self.assertEqual((3, len(atoms), 3), trajectory.coord.shape)
+        rows = dict((atom.get_full_id()[2:], row)
+                    for row, atom in enumerate(atoms))
+        for frame, model in zip(trajectory, structure):
+            # Atoms only in later models are ignored, while those missing
+            # from later models are left as NaN
+            found = numpy.zeros(len(atoms), bool)
+            for atom in model.get_atoms():
+                row = rows.get(atom.get_full_id()[2:])
+                if row is None:
+                    continue
+                found[row] = True
+                self.assertTrue(numpy.allclose(atom.coord, frame[row]))
+            self.assertTrue(numpy.isnan(frame[~found]).all())
+        self.assertEqual(0, numpy.isnan(trajectory[0]).sum())
+        self.assertEqual(72 * 3, numpy.isnan(trajectory[1]).sum())
+
+
+class WriteTest(unittest.TestCase):
+    """Write mmCIF files with MMCIFIO."""
+
+    def check_round_trip(self, structure, select=Select()):
+        handle = StringIO()
+        io = MMCIFIO()
+        io.set_structure(structure)
+        io.save(handle, select)
+        handle.seek(0)
+        return MMCIFParser(QUIET=True).get_structure("copy", handle)
+
+    def get_atoms(self, structure):
+        return [(atom.get_full_id()[2], atom.get_parent().id[1:],
+                 atom.get_parent().resname, atom.get_id(), atom.get_altloc())
+                for atom in structure.get_atoms()]
+
+    def test_round_trip(self):
+        """Read back the written structures."""
+        parser = PDBParser(QUIET=True)
+        for structure in (parser.get_structure("1MOT", "PDB/1MOT.pdb"),
+                          parser.get_structure("1A8O", "PDB/1A8O.pdb"),
+                          MMCIFParser(QUIET=True).get_structure("1LCD", "PDB/1LCD.cif")):
+            copy = self.check_round_trip(structure)
+            self.assertEqual(len(structure), len(copy))
+            self.assertEqual(self.get_atoms(structure), self.get_atoms(copy))
+            self.assertTrue(numpy.allclose(structure.get_coord_array(),
+                                           copy.get_coord_array()))
+            self.assertTrue(numpy.allclose(structure.get_bfactor_array(),
+                                           copy.get_bfactor_array(), atol=0.005))
+
+    def test_missing_occupancy(self):
+        """Read back missing occupancies."""
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", BiopythonWarning)
+            structure = PDBParser(QUIET=True).get_structure("test", "PDB/occupancy.pdb")
+            copy = self.check_round_trip(structure)
+        self.assertEqual([None, 1.0, 0.0],
+                         [atom.get_occupancy() for atom in copy.get_atoms()])
+
+    def test_hetatm(self):
+        """Write no label_seq_id for HETATM rows."""
+        structure = PDBParser(QUIET=True).get_structure("1A8O", "PDB/1A8O.pdb")
+        handle = StringIO()
+        io = MMCIFIO()
+        io.set_structure(structure)
+        io.save(handle)
+        rows = [line.split() for line in handle.getvalue().splitlines()
+                if line.startswith(("ATOM ", "HETATM "))]
+        self.assertEqual(644, len(rows))
+        for row in rows:
+            if row[0] == "HETATM":
+                self.assertEqual(".", row[7])
+            else:
+                self.assertEqual(row[14], row[7])
+
+    def test_atom_name_alignment(self):
+        """Atom names differing only in their alignment can't be read back."""
+        structure = PDBParser(QUIET=True).get_structure("example", "PDB/a_structure.pdb")
+        residue = structure[0]["A"][("H_PCA", 1, " ")]
+        self.assertEqual(set([" CA ", "CA  "]),
+                         set(atom.get_fullname() for atom in residue
+                             if atom.get_fullname().strip() == "CA"))
+        self.assertRaises(PDBConstructionException,
+                          self.check_round_trip, structure)
+
+    def test_select(self):
+        """Write only some of the atoms."""
+        structure = PDBParser(QUIET=True).get_structure("1A8O", "PDB/1A8O.pdb")
+
+        class OnlyCA(Select):
+            def accept_atom(self, atom):
+                return atom.get_id() == "CA"
+
+        copy = self.check_round_trip(structure, OnlyCA())
+        self.assertEqual(70, len(list(copy.get_atoms())))
+        mask = structure.get_atom_mask(OnlyCA())
+        copy = self.check_round_trip(structure, mask)
+        self.assertEqual(mask.sum(), len(list(copy.get_atoms())))
+
+    def test_quoting(self):
+        """Quote names which are not single tokens."""
+        from Bio.PDB.MMCIFIO import _quote
+        self.assertEqual("CA", _quote("CA"))
+        self.assertEqual('"O5\'"', _quote("O5'"))
+        self.assertEqual("'A \"B\"'", _quote('A "B"'))
+        self.assertEqual('"_x"', _quote("_x"))
+        self.assertEqual("?", _quote(" "))
+        self.assertEqual(".", _quote(" ", "."))
+
+
+class MMCIF2DictTests(unittest.TestCase):
+    """Tokenizing and loop handling in MMCIF2Dict."""
+
+    def test_loops(self):
+        """Parse loops with quoted, multi-line and unquoted values."""
+        data = """data_TEST
+#
+_entry.id   TEST
+_struct.title 'A "quoted" title'
+loop_
+_atom_type.symbol
+_atom_type.name
+C carbon
+N 'nitrogen atom'
+O
+;oxygen
+atom
+;
+loop_
+_atom_site.group_PDB
+_atom_site.id
+_atom_site.label_atom_id
+ATOM 1 N ATOM 2 CA
+HETATM 3 "O5'"
+_cell.length_a 10.0
+"""
+        mmcif_dict = MMCIF2Dict(StringIO(data))
+        self.assertEqual("TEST", mmcif_dict["data_"])
+        self.assertEqual("TEST", mmcif_dict["_entry.id"])
+        self.assertEqual('A "quoted" title', mmcif_dict["_struct.title"])
+        self.assertEqual(["C", "N", "O"], mmcif_dict["_atom_type.symbol"])
+        self.assertEqual(["carbon", "nitrogen atom", "oxygenatom"],
+                         mmcif_dict["_atom_type.name"])
+        self.assertEqual(["ATOM", "ATOM", "HETATM"],
+                         mmcif_dict["_atom_site.group_PDB"])
+        self.assertEqual(["1", "2", "3"], mmcif_dict["_atom_site.id"])
+        self.assertEqual(["N", "CA", "O5'"],
+                         mmcif_dict["_atom_site.label_atom_id"])
+        self.assertEqual("10.0", mmcif_dict["_cell.length_a"])
+
+    def test_bad_bfactor(self):
+        """Reject an invalid B factor."""
+        with open("PDB/1A8O.cif") as handle:
+            data = handle.read()
+        self.assertTrue("28.012 1.00 18.03 ?" in data)
+        data = data.replace("28.012 1.00 18.03 ?", "28.012 1.00 ? ?", 1)
+        parser = MMCIFParser()
+        self.assertRaises(PDBConstructionException, parser.get_structure,
+                          "example", StringIO(data))
+
+
 if __name__ == '__main__':
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
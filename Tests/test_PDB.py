@@ -34,9 +34,15 @@ from Bio.Alphabet import generic_protein
 from Bio.PDB import PDBParser, PPBuilder, CaPPBuilder, PDBIO, Select
 from Bio.PDB import HSExposureCA, HSExposureCB, ExposureCN
 from Bio.PDB.PDBExceptions import PDBConstructionException, PDBConstructionWarning
+from Bio.PDB.PDBExceptions import PDBException
+from Bio.PDB.StructureBuilder import StructureBuilder
 from Bio.PDB import rotmat, Vector
+from Bio.PDB import calc_angle, calc_dihedral, calc_angles, calc_dihedrals
 from Bio.PDB import Residue, Atom
 from Bio.PDB import make_dssp_dict
+from Bio.PDB.Superimposer import superimpose_frames, rmsd_matrix
+from Bio.PDB.SASA import ShrakeRupley, shrake_rupley, shrake_rupley_models
+from Bio.SVDSuperimposer import SVDSuperimposer
 from Bio.PDB.NACCESS import process_asa_data, process_rsa_data
 
 
@@ -735,6 +741,73 @@ class ParseReal(unittest.TestCase):
             os.remove(filename)
 
 
+class FastParseTest(unittest.TestCase):
+    """Compare the fast mode of the PDBParser with line by line parsing."""
+
+    def get_atom_details(self, structure):
+        details = []
+        for residue in structure.get_residues():
+            for atom in residue.get_unpacked_list():
+                anisou = atom.get_anisou()
+                if anisou is not None:
+                    anisou = list(anisou)
+                coord = atom.get_coord()
+                details.append((atom.get_full_id(), list(coord), coord.dtype,
+                                atom.get_bfactor(), atom.get_occupancy(),
+                                atom.element, atom.serial_number, anisou))
+        return details
+
+    def compare(self, filename, permissive=True):
+        results = []
+        for fast in (False, True):
+            parser = PDBParser(PERMISSIVE=permissive, fast=fast)
+            with warnings.catch_warnings(record=True) as w:
+                warnings.simplefilter("always", PDBConstructionWarning)
+                structure = parser.get_structure("example", filename)
+                # All the warnings are given while parsing
+                messages = [str(warning.message) for warning in w]
+                details = self.get_atom_details(structure)
+                self.assertEqual(len(messages), len(w))
+            results.append((details, messages, structure.header,
+                            parser.get_trailer()))
+        self.assertEqual(results[0][0], results[1][0])
+        self.assertEqual(results[0][1], results[1][1])
+        self.assertEqual(results[0][2], results[1][2])
+        self.assertEqual(results[0][3], results[1][3])
+
+    def test_files(self):
+        """Fast parsing of PDB files."""
+        for filename in ["PDB/1A8O.pdb", "PDB/2BEG.pdb", "PDB/2XHE.pdb",
+                         "PDB/1MOT.pdb", "PDB/a_structure.pdb",
+                         "PDB/occupancy.pdb", "PDB/ions.pdb"]:
+            self.compare(filename)
+        self.compare("PDB/1A8O.pdb", permissive=False)
+
+    def test_custom_builder(self):
+        """Fast parsing with a given structure builder."""
+        parser = PDBParser(structure_builder=StructureBuilder(), fast=True)
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always", PDBConstructionWarning)
+            structure = parser.get_structure("example", "PDB/a_structure.pdb")
+            self.assertEqual(14, len(w))
+        self.assertEqual(2, len(structure))
+
+    def test_strict(self):
+        """Fast parsing in strict mode raises errors at once."""
+        parser = PDBParser(PERMISSIVE=False, fast=True)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", PDBConstructionWarning)
+            self.assertRaises(PDBConstructionException, parser.get_structure,
+                              "example", "PDB/a_structure.pdb")
+            self.assertRaises(PDBConstructionException, parser.get_structure,
+                              "example", "PDB/occupancy.pdb")
+        data = "ATOM      9  N   ASP A 152      21.ish  34.953  27.691  1.00 19.26           N\n"
+        for permissive in (True, False):
+            parser = PDBParser(PERMISSIVE=permissive, fast=True)
+            self.assertRaises(PDBConstructionException, parser.get_structure,
+                              "example", StringIO(data))
+
+
 class WriteTest(unittest.TestCase):
     def setUp(self):
         with warnings.catch_warnings():
@@ -848,6 +921,53 @@ class WriteTest(unittest.TestCase):
             os.remove(filename)
 
 
+class FastWriteTest(unittest.TestCase):
+    """Compare PDBIO in fast mode with the usual output."""
+
+    def setUp(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", PDBConstructionWarning)
+            self.structure = PDBParser().get_structure("1MOT", "PDB/1MOT.pdb")
+
+    def write(self, fast, select=Select()):
+        handle = StringIO()
+        io = PDBIO(fast=fast)
+        io.set_structure(self.structure)
+        io.save(handle, select)
+        return handle.getvalue()
+
+    def test_same_output(self):
+        """Write the same file in fast mode."""
+        class NotChainBorModel3(Select):
+            def accept_model(self, model):
+                return model.serial_num != 3
+
+            def accept_chain(self, chain):
+                return chain.id != "B"
+
+            def accept_atom(self, atom):
+                return atom.element != "H"
+
+        self.assertEqual(self.write(False), self.write(True))
+        select = NotChainBorModel3()
+        output = self.write(True, select)
+        self.assertEqual(self.write(False, select), output)
+        self.assertFalse("MODEL      3\n" in output)
+
+    def test_mask(self):
+        """Select atoms with a mask."""
+        atom_array = self.structure.get_atom_array()
+        mask = atom_array.bfactor >= 0
+        mask[numpy.array([a.get_id() == "CA" for a in atom_array.atoms])] = False
+
+        class NotCA(Select):
+            def accept_atom(self, atom):
+                return atom.get_id() != "CA"
+
+        self.assertEqual(self.write(False, NotCA()), self.write(True, mask))
+        self.assertRaises(ValueError, self.write, True, mask[:10])
+
+
 class Exposure(unittest.TestCase):
     "Testing Bio.PDB.HSExposure."
     def setUp(self):
@@ -931,6 +1051,119 @@ class Exposure(unittest.TestCase):
         self.assertEqual(38, residues[-1].xtra["EXP_CN"])
 
 
+class BackboneGeometryTests(unittest.TestCase):
+    """Compare the array based angles with the Vector based ones."""
+
+    def setUp(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", PDBConstructionWarning)
+            structure = PDBParser().get_structure("1A8O", "PDB/1A8O.pdb")
+        self.pp = PPBuilder().build_peptides(structure)[0]
+
+    def test_calc_dihedrals(self):
+        """Calculate many dihedral angles and angles at once."""
+        points = numpy.random.RandomState(3).randn(50, 4, 3)
+        dihedrals = calc_dihedrals(points)
+        angles = calc_angles(points[:, :3])
+        self.assertEqual((50,), dihedrals.shape)
+        for i, p in enumerate(points):
+            v = [Vector(x) for x in p]
+            self.assertAlmostEqual(calc_dihedral(*v), dihedrals[i])
+            self.assertAlmostEqual(calc_angle(*v[:3]), angles[i])
+        # Extra leading dimensions are allowed
+        self.assertEqual((5, 10), calc_dihedrals(points.reshape((5, 10, 4, 3))).shape)
+        self.assertRaises(ValueError, calc_dihedrals, points[:, :3])
+        self.assertRaises(ValueError, calc_angles, points)
+
+    def test_phi_psi_omega(self):
+        """Get all the backbone dihedral angles of a polypeptide."""
+        pp = self.pp
+        phi, psi, omega = pp.get_phi_psi_omega()
+        self.assertEqual((len(pp),), phi.shape)
+        self.assertTrue(numpy.isnan(phi[0]))
+        self.assertTrue(numpy.isnan(psi[-1]))
+        self.assertTrue(numpy.isnan(omega[-1]))
+        # Trans peptide bonds
+        self.assertTrue((numpy.abs(omega[:-1]) > 2.5).all())
+        for i, (phi_i, psi_i) in enumerate(pp.get_phi_psi_list()):
+            if i > 0:
+                self.assertAlmostEqual(phi_i, phi[i])
+                self.assertEqual(phi_i, pp[i].xtra["PHI"])
+                v = [pp[i - 1]["C"], pp[i]["N"], pp[i]["CA"], pp[i]["C"]]
+                self.assertAlmostEqual(calc_dihedral(*[a.get_vector() for a in v]),
+                                       phi_i)
+            if i < len(pp) - 1:
+                self.assertAlmostEqual(psi_i, psi[i])
+        tau = pp.get_tau_list()
+        theta = pp.get_theta_list()
+        self.assertEqual(len(pp) - 3, len(tau))
+        self.assertEqual(len(pp) - 2, len(theta))
+        ca = [a.get_vector() for a in pp.get_ca_list()]
+        self.assertAlmostEqual(calc_dihedral(*ca[:4]), tau[0])
+        self.assertAlmostEqual(calc_angle(*ca[:3]), theta[0])
+        self.assertEqual(theta[0], pp[1].xtra["THETA"])
+
+
+class SASATests(unittest.TestCase):
+    """Testing Bio.PDB.SASA."""
+
+    def setUp(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", PDBConstructionWarning)
+            structure = PDBParser().get_structure("1A8O", "PDB/1A8O.pdb")
+        self.model = structure[0]
+
+    def test_isolated_atoms(self):
+        """Atoms too far apart to touch are fully exposed."""
+        area = shrake_rupley([[0, 0, 0], [10, 0, 0], [3, 0, 0]],
+                             [1.6, 1.6, 1.0], probe_radius=1.4)
+        self.assertAlmostEqual(4 * numpy.pi * 3.0 ** 2, area[1])
+        # The first and last atoms overlap, burying some of their points
+        self.assertTrue(0 < area[0] < 4 * numpy.pi * 3.0 ** 2)
+        self.assertTrue(0 < area[2] < 4 * numpy.pi * 2.4 ** 2)
+        # Hidden inside a larger atom
+        area = shrake_rupley([[0, 0, 0], [0, 0, 0.1]], [3.0, 1.0])
+        self.assertEqual(0.0, area[1])
+
+    def test_levels(self):
+        """Sum the atomic areas at each level."""
+        atoms = ShrakeRupley(self.model, "A")
+        residues = ShrakeRupley(self.model)
+        chains = ShrakeRupley(self.model, "C")
+        models = ShrakeRupley(self.model, "M")
+        self.assertEqual(644, len(atoms))
+        self.assertEqual(158, len(residues))
+        self.assertEqual(1, len(chains))
+        residue = self.model["A"][152]
+        self.assertAlmostEqual(85.76, residues[("A", 152)], places=2)
+        self.assertEqual(residues[("A", 152)], residue.xtra["EXP_SASA"])
+        self.assertAlmostEqual(sum(a.xtra["EXP_SASA"] for a in residue),
+                               residue.xtra["EXP_SASA"])
+        self.assertAlmostEqual(residues[("A", 152)],
+                               sum(atoms[("A", 152, a.get_id())] for a in residue))
+        self.assertAlmostEqual(sum(area for entity, area in residues),
+                               chains["A"])
+        self.assertAlmostEqual(chains["A"], models[0])
+        self.assertAlmostEqual(chains["A"], self.model.xtra["EXP_SASA"])
+        # A residue on its own is more exposed
+        alone = ShrakeRupley(residue)
+        self.assertTrue(alone[("A", 152)] > residues[("A", 152)])
+        self.assertRaises(PDBException, ShrakeRupley, residue, "C")
+        self.assertRaises(PDBException, ShrakeRupley, self.model, "S")
+
+    def test_models(self):
+        """Calculate for several models using worker processes."""
+        chain = self.model["A"]
+        expected = ShrakeRupley(self.model)
+        for processes in (1, 2):
+            results = shrake_rupley_models([self.model, chain],
+                                           processes=processes)
+            self.assertEqual(2, len(results))
+            self.assertEqual(expected.keys(), results[0].keys())
+            for key in expected.keys():
+                self.assertAlmostEqual(expected[key], results[0][key])
+
+
 class Atom_Element(unittest.TestCase):
     """induces Atom Element from Atom Name"""
 
@@ -1065,6 +1298,54 @@ class TransformTests(unittest.TestCase):
             for i in range(0, 3):
                 self.assertAlmostEqual(newpos[i], newpos_check[i])
 
+    def test_transform_snapshot(self):
+        """Coordinates taken before a transform are not changed by it."""
+        for make_array in (False, True):
+            structure = PDBParser().get_structure("1A8O", "PDB/1A8O.pdb")
+            if make_array:
+                structure.get_atom_array()
+            atom = next(structure.get_atoms())
+            translation = numpy.array((1.0, 0, 0))
+            structure.transform(numpy.identity(3), translation)
+            old = atom.get_coord()
+            old_x = old[0]
+            structure.transform(numpy.identity(3), translation)
+            self.assertEqual(old_x, old[0])
+            self.assertAlmostEqual(old_x + 1, atom.get_coord()[0], places=5)
+
+    def test_transform_child(self):
+        """Transforming part of a structure makes no AtomArray."""
+        residue = self.r
+        coord = residue.get_list()[0].get_coord()
+        residue.transform(numpy.identity(3, "f"), numpy.array((1.0, 0, 0), "f"))
+        self.assertEqual(None, self.s._atom_array)
+        self.assertEqual(numpy.float32, residue.get_list()[0].get_coord().dtype)
+        self.assertTrue(numpy.allclose(coord + (1, 0, 0),
+                                       residue.get_list()[0].get_coord()))
+
+    def test_transform_disordered(self):
+        """Transform all the alternative locations of disordered atoms."""
+        translation = numpy.array((1.0, 0, 0))
+        # The same result with or without an AtomArray made beforehand
+        for make_array in (False, True):
+            structure = PDBParser(PERMISSIVE=True).get_structure(
+                'X', "PDB/a_structure.pdb")
+            if make_array:
+                structure.get_atom_array()
+            disordered = [atom for atom in structure.get_atoms()
+                          if atom.is_disordered() and
+                          len(atom.disordered_get_list()) > 1]
+            self.assertTrue(disordered)
+            old = [[altloc.get_coord().copy()
+                    for altloc in atom.disordered_get_list()]
+                   for atom in disordered]
+            structure.transform(numpy.identity(3), translation)
+            for atom, old_coords in zip(disordered, old):
+                for altloc, old_coord in zip(atom.disordered_get_list(),
+                                             old_coords):
+                    self.assertTrue(numpy.allclose(old_coord + translation,
+                                                   altloc.get_coord()))
+
 
 class CopyTests(unittest.TestCase):
 
@@ -1089,6 +1370,232 @@ class CopyTests(unittest.TestCase):
             self.assertFalse(e.get_list()[0] is ee.get_list()[0])
 
 
+class AtomArrayTests(unittest.TestCase):
+
+    def setUp(self):
+        self.s = PDBParser().get_structure("1A8O", "PDB/1A8O.pdb")
+        self.m = self.s.get_list()[0]
+
+    def test_disordered(self):
+        """All alternative atoms and residues are included."""
+        warnings.simplefilter("ignore", PDBConstructionWarning)
+        try:
+            s = PDBParser(PERMISSIVE=True).get_structure(
+                'X', "PDB/a_structure.pdb")
+        finally:
+            warnings.filters.pop(0)
+        atoms = []
+        for residue in s.get_residues():
+            if residue.is_disordered() == 2:
+                for child in residue.disordered_get_list():
+                    atoms.extend(child.get_unpacked_list())
+            else:
+                atoms.extend(residue.get_unpacked_list())
+        self.assertEqual(len(atoms), len(s.get_atom_array()))
+        self.assertEqual((len(atoms), 3), s.get_coord_array().shape)
+
+    def test_shared(self):
+        """Atoms share the coordinate, B factor and occupancy arrays."""
+        atoms = list(self.s.get_atoms())
+        coord = self.s.get_coord_array()
+        self.assertEqual((644, 3), coord.shape)
+        atom_array = self.s.get_atom_array()
+        self.assertEqual(len(atoms), len(atom_array))
+        self.assertTrue(atom_array is self.m.get_atom_array())
+        for i, atom in enumerate(atom_array.atoms):
+            self.assertTrue(numpy.all(coord[i] == atom.get_coord()))
+            self.assertEqual(atom_array.bfactor[i], atom.get_bfactor())
+        atom = atom_array.atoms[10]
+        atom.set_coord(numpy.array((1.0, 2.0, 3.0)))
+        self.assertEqual([1.0, 2.0, 3.0], list(coord[10]))
+        coord[10] = (4.0, 5.0, 6.0)
+        self.assertEqual([4.0, 5.0, 6.0], list(atom.get_coord()))
+        atom.set_bfactor(12.5)
+        self.assertEqual(12.5, atom_array.bfactor[10])
+        atom.set_occupancy(None)
+        self.assertTrue(numpy.isnan(atom_array.occupancy[10]))
+        self.assertEqual(None, atom.get_occupancy())
+        copied = atom.copy()
+        copied.set_coord(numpy.array((0.0, 0.0, 0.0)))
+        self.assertEqual([4.0, 5.0, 6.0], list(atom.get_coord()))
+        self.assertEqual(12.5, copied.get_bfactor())
+
+    def test_entity_views(self):
+        """Child entities see a slice of the arrays."""
+        chain = self.m.get_list()[0]
+        residue = chain.get_list()[3]
+        coord = residue.get_coord_array()
+        self.assertEqual(len(residue.get_unpacked_list()), len(coord))
+        for row, atom in zip(coord, residue.get_unpacked_list()):
+            self.assertTrue(numpy.all(row == atom.get_coord()))
+        mask = residue.get_atom_mask(lambda atom: atom.get_id() == "CA")
+        self.assertEqual(1, mask.sum())
+        self.assertTrue(numpy.all(residue.get_coord_array(mask)[0] ==
+                                  residue["CA"].get_coord()))
+        bfactors = chain.get_bfactor_array()
+        self.assertEqual(len(chain.get_coord_array()), len(bfactors))
+
+    def test_transform(self):
+        """Vectorised transform of a model, with and without a mask."""
+        rotation = rotmat(Vector(1, 3, 5), Vector(1, 0, 0))
+        translation = numpy.array((2.4, 0, 1), 'f')
+        old = self.m.get_coord_array().copy()
+        self.m.transform(rotation, translation)
+        new = self.m.get_coord_array()
+        self.assertTrue(numpy.allclose(numpy.dot(old, rotation) + translation,
+                                       new))
+        atom = self.s.get_atom_array().atoms[0]
+        self.assertTrue(numpy.allclose(new[0], atom.get_coord()))
+        mask = self.m.get_bfactor_array() > 20.0
+        self.assertTrue(0 < mask.sum() < len(mask))
+        old = new.copy()
+        self.m.transform(numpy.identity(3), numpy.array((1.0, 0, 0)), mask)
+        new = self.m.get_coord_array()
+        self.assertTrue(numpy.allclose(new[mask][:, 0], old[mask][:, 0] + 1))
+        self.assertTrue(numpy.all(new[~mask] == old[~mask]))
+
+    def test_changes(self):
+        """Adding or removing atoms makes a new AtomArray."""
+        atom_array = self.s.get_atom_array()
+        chain = self.m.get_list()[0]
+        residue = chain.get_list()[0]
+        atom = residue.get_list()[0]
+        residue.detach_child(atom.get_id())
+        new_array = self.s.get_atom_array()
+        self.assertFalse(atom_array is new_array)
+        self.assertEqual(len(atom_array) - 1, len(new_array))
+        # The detached atom keeps its coordinates
+        self.assertTrue(numpy.all(atom.get_coord() == atom_array.coord[0]))
+        new_array.release()
+        self.assertEqual(None, atom_array.atoms[1]._atom_array)
+        self.assertEqual(len(new_array), len(self.s.get_coord_array()))
+
+
+class SuperimposeFramesTests(unittest.TestCase):
+    """Compare the batch functions with SVDSuperimposer."""
+
+    def setUp(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", PDBConstructionWarning)
+            structure = PDBParser().get_structure("1MOT", "PDB/1MOT.pdb")
+        self.frames = numpy.array([[residue["CA"].get_coord()
+                                    for residue in model.get_residues()]
+                                   for model in structure], "d")
+        # Add a mirror image, which can't be superimposed exactly
+        self.frames = numpy.concatenate([self.frames,
+                                         self.frames[:1] * [1, 1, -1]])
+
+    def test_superimpose_frames(self):
+        """Superimpose all frames onto a reference."""
+        reference = self.frames[3]
+        rot, tran, rms = superimpose_frames(reference, self.frames)
+        self.assertEqual((21, 3, 3), rot.shape)
+        self.assertEqual((21, 3), tran.shape)
+        self.assertEqual((21,), rms.shape)
+        self.assertAlmostEqual(0.0, rms[3])
+        sup = SVDSuperimposer()
+        for i, frame in enumerate(self.frames):
+            sup.set(reference, frame)
+            sup.run()
+            old_rot, old_tran = sup.get_rotran()
+            self.assertTrue(numpy.allclose(old_rot, rot[i]))
+            self.assertTrue(numpy.allclose(old_tran, tran[i]))
+            self.assertAlmostEqual(sup.get_rms(), rms[i])
+            self.assertTrue(numpy.allclose(sup.get_transformed(),
+                                           numpy.dot(frame, rot[i]) + tran[i]))
+
+    def test_rmsd_matrix(self):
+        """Calculate the pairwise RMSD matrix."""
+        matrix = rmsd_matrix(self.frames)
+        self.assertEqual((21, 21), matrix.shape)
+        sup = SVDSuperimposer()
+        for i in range(21):
+            self.assertEqual(0.0, matrix[i, i])
+            for j in range(21):
+                sup.set(self.frames[i], self.frames[j])
+                sup.run()
+                self.assertAlmostEqual(sup.get_rms(), matrix[i, j], places=5)
+        # Calculating the rows in blocks (and processes) gives the same answer
+        for block_size in (1, 4, 100):
+            self.assertTrue(numpy.allclose(matrix, rmsd_matrix(
+                self.frames, block_size=block_size)))
+        self.assertTrue(numpy.allclose(matrix, rmsd_matrix(
+            self.frames, processes=2, block_size=8)))
+
+    def test_bad_frames(self):
+        """Reject coordinates of the wrong shape."""
+        self.assertRaises(ValueError, rmsd_matrix, self.frames[0])
+        self.assertRaises(ValueError, rmsd_matrix, self.frames[:, :, :2])
+        self.assertRaises(ValueError, rmsd_matrix, self.frames, 0)
+        self.assertRaises(ValueError, superimpose_frames,
+                          self.frames[0, :10], self.frames)
+
+
+class TrajectoryTests(unittest.TestCase):
+    """Read the models of a PDB file as a trajectory."""
+
+    def setUp(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", PDBConstructionWarning)
+            self.structure = PDBParser().get_structure("1MOT", "PDB/1MOT.pdb")
+            self.trajectory = PDBParser().get_trajectory("1MOT", "PDB/1MOT.pdb")
+
+    def test_frames(self):
+        """Compare the frames with the full structure."""
+        trajectory = self.trajectory
+        self.assertEqual(20, len(trajectory))
+        self.assertEqual(1, len(trajectory.structure))
+        self.assertEqual(list(range(1, 21)), trajectory.serial_nums)
+        self.assertEqual((20, 408, 3), trajectory.coord.shape)
+        self.assertEqual(self.structure.header, trajectory.structure.header)
+        for frame, model in zip(trajectory, self.structure):
+            coord = numpy.array([a.get_coord() for a in model.get_atoms()])
+            self.assertTrue(numpy.allclose(coord, frame))
+
+    def test_iter_models(self):
+        """Update the topology to each frame in turn."""
+        models = list(self.structure)
+        for i, model in enumerate(self.trajectory.iter_models()):
+            self.assertTrue(model is self.trajectory.structure[0])
+            self.assertTrue(numpy.allclose(models[i]["A"][250]["CA"].coord,
+                                           model["A"][250]["CA"].coord))
+        self.assertEqual(19, i)
+
+    def test_missing_atoms(self):
+        """Atoms missing from a later model have NaN coordinates."""
+        with open("PDB/1MOT.pdb") as handle:
+            lines = handle.readlines()
+        # Drop the first atom of the second model
+        start = [line.split() for line in lines].index(["MODEL", "2"])
+        del lines[start + 1]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", PDBConstructionWarning)
+            trajectory = PDBParser().get_trajectory("1MOT",
+                                                    StringIO("".join(lines)))
+        self.assertEqual(20, len(trajectory))
+        self.assertTrue(numpy.isnan(trajectory[1][0]).all())
+        self.assertFalse(numpy.isnan(trajectory[1][1:]).any())
+        self.assertTrue(numpy.allclose(self.trajectory.coord[2:],
+                                       trajectory.coord[2:]))
+
+    def test_coord_file(self):
+        """Store the frames in a memory mapped file."""
+        handle, filename = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", PDBConstructionWarning)
+                trajectory = PDBParser().get_trajectory("1MOT", "PDB/1MOT.pdb",
+                                                        coord_file=filename)
+            self.assertTrue(isinstance(trajectory.coord, numpy.memmap))
+            self.assertTrue(numpy.allclose(self.trajectory.coord,
+                                           trajectory.coord))
+            self.assertEqual(20 * 408 * 3 * 4, os.path.getsize(filename))
+            del trajectory
+        finally:
+            os.remove(filename)
+
+
 class DsspTests(unittest.TestCase):
     """Tests for DSSP parsing etc which don't need the binary tool.
 
@@ -0,0 +1,196 @@
+# Copyright 2016 by Biopython contributors.  All rights reserved.
+#
+# This code is part of the Biopython distribution and governed by its
+# license. Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Tests for downloading structures with Bio.PDB.PDBList, using local servers.
+
+Rather than the real PDB, these use a copy of a few files of the archive
+layout in a temporary directory, served as file:// URLs or by a small HTTP
+server (which supports Range requests, and can be made to fail).
+"""
+import gzip
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+try:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+except ImportError:
+    # Python 2
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingExternalDependencyError
+    raise MissingExternalDependencyError(
+        "Install NumPy if you want to use Bio.PDB.")
+
+from Bio.PDB.PDBList import PDBList
+
+CODES = {"1a8o": "PDB/1A8O.pdb", "2beg": "PDB/2BEG.pdb", "1mot": "PDB/1MOT.pdb"}
+
+
+def archive_path(root, code):
+    """Return where the archive of an entry is in the mirror."""
+    return os.path.join(root, "pub", "pdb", "data", "structures", "divided",
+                        "pdb", code[1:3], "pdb%s.ent.gz" % code)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serve files from the mirror, recording and optionally failing requests."""
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, self.headers.get("Range")))
+        if server.failures:
+            server.failures -= 1
+            self.send_error(500)
+            return
+        filename = os.path.join(server.root, self.path.lstrip("/"))
+        if not os.path.isfile(filename):
+            self.send_error(404)
+            return
+        with open(filename, "rb") as handle:
+            data = handle.read()
+        start = 0
+        if self.headers.get("Range"):
+            start = int(self.headers.get("Range").split("=")[1].rstrip("-"))
+            if start >= len(data):
+                self.send_error(416)
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", "bytes %i-%i/%i"
+                             % (start, len(data) - 1, len(data)))
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(data) - start))
+        self.end_headers()
+        self.wfile.write(data[start:])
+
+    def log_message(self, *args):
+        pass
+
+
+class DownloadTests(unittest.TestCase):
+    """Download structures from a local stand-in for the PDB."""
+
+    def setUp(self):
+        self.mirror = tempfile.mkdtemp()
+        self.local = tempfile.mkdtemp()
+        for code, filename in CODES.items():
+            path = archive_path(self.mirror, code)
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with open(filename, "rb") as handle:
+                data = handle.read()
+            gz = gzip.open(path, "wb")
+            gz.write(data)
+            gz.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.mirror)
+        shutil.rmtree(self.local)
+
+    def start_server(self, failures=0):
+        """Start serving the mirror over HTTP, returning its base URL."""
+        server = HTTPServer(("127.0.0.1", 0), StandInHandler)
+        server.root = self.mirror
+        server.requests = []
+        server.failures = failures
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.server = server
+        return "http://127.0.0.1:%i" % server.server_address[1]
+
+    def pdblist(self, server, **kwargs):
+        kwargs.setdefault("retry_delay", 0)
+        pdblist = PDBList(server=server, pdb=self.local, **kwargs)
+        pdblist.flat_tree = 1
+        return pdblist
+
+    def check_file(self, code, filename):
+        self.assertEqual(filename, os.path.join(self.local, "pdb%s.ent" % code))
+        with open(CODES[code], "rb") as expected:
+            with open(filename, "rb") as handle:
+                self.assertEqual(expected.read(), handle.read())
+        # Only the uncompressed file is left
+        self.assertFalse(os.path.exists(filename + ".gz"))
+        self.assertFalse(os.path.exists(filename + ".part"))
+
+    def test_file_url(self):
+        """Download several structures at once from a file:// URL."""
+        server = "file://" + self.mirror.replace(os.sep, "/")
+        pdblist = self.pdblist(server, threads=3)
+        codes = sorted(CODES)
+        filenames = pdblist.retrieve_pdb_files(codes)
+        for code, filename in zip(codes, filenames):
+            self.check_file(code, filename)
+
+    def test_http(self):
+        """Download several structures at once over HTTP."""
+        pdblist = self.pdblist(self.start_server(), threads=2)
+        codes = sorted(CODES)
+        filenames = pdblist.retrieve_pdb_files(codes)
+        for code, filename in zip(codes, filenames):
+            self.check_file(code, filename)
+        self.assertEqual(len(self.server.requests), len(codes))
+
+    def test_resume(self):
+        """Continue a partial download from where it stopped."""
+        pdblist = self.pdblist(self.start_server())
+        with open(archive_path(self.mirror, "1mot"), "rb") as handle:
+            data = handle.read()
+        partial = os.path.join(self.local, "pdb1mot.ent.gz")
+        with open(partial, "wb") as handle:
+            handle.write(data[:1000])
+        self.check_file("1mot", pdblist.retrieve_pdb_file("1MOT"))
+        self.assertEqual(self.server.requests[0][1], "bytes=1000-")
+        # A complete archive left behind just needs uncompressing
+        with open(partial, "wb") as handle:
+            handle.write(data)
+        pdblist.overwrite = 1
+        self.check_file("1mot", pdblist.retrieve_pdb_file("1MOT"))
+
+    def test_retry(self):
+        """Try again after errors from the server."""
+        pdblist = self.pdblist(self.start_server(failures=2), retries=2)
+        self.check_file("1a8o", pdblist.retrieve_pdb_file("1a8o"))
+        self.assertEqual(len(self.server.requests), 3)
+        # Give up when the retries run out
+        pdblist = self.pdblist(self.start_server(failures=3), retries=2)
+        self.assertRaises(IOError, pdblist.retrieve_pdb_file, "2beg")
+        self.server.failures = 3
+        self.assertEqual(pdblist.retrieve_pdb_files(["2beg"]), [None])
+
+    def test_missing(self):
+        """Do not retry structures which are not on the server."""
+        pdblist = self.pdblist(self.start_server(), retries=2)
+        self.assertEqual(pdblist.retrieve_pdb_files(["9xyz", "2beg"])[0], None)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_corrupt(self):
+        """Reject an archive which fails the gzip CRC check."""
+        path = archive_path(self.mirror, "2beg")
+        with open(path, "rb") as handle:
+            data = bytearray(handle.read())
+        # Change a byte of the stored CRC
+        data[-8] ^= 0xFF
+        with open(path, "wb") as handle:
+            handle.write(data)
+        pdblist = self.pdblist(self.start_server(), retries=1)
+        self.assertRaises(IOError, pdblist.retrieve_pdb_file, "2beg")
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(os.listdir(self.local), ["obsolete"])
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
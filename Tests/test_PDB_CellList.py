@@ -0,0 +1,117 @@
+# Copyright 2016 by Biopython contributors.  All rights reserved.
+#
+# This code is part of the Biopython distribution and governed by its
+# license. Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Unit tests for the grid based neighbor search in Bio.PDB.CellList."""
+import unittest
+import warnings
+
+try:
+    import numpy
+    from numpy.random import RandomState
+except ImportError:
+    from Bio import MissingExternalDependencyError
+    raise MissingExternalDependencyError(
+        "Install NumPy if you want to use Bio.PDB.")
+
+from Bio.PDB import PDBParser
+from Bio.PDB.CellList import CellList, contact_map
+from Bio.PDB.PDBExceptions import PDBException, PDBConstructionWarning
+
+
+def brute_force_pairs(coord, radius, box=None):
+    """Return all the pairs within radius by checking every pair."""
+    delta = coord[:, None, :] - coord[None, :, :]
+    if box is not None:
+        delta -= box * numpy.round(delta / box)
+    close = (delta * delta).sum(axis=2) <= radius * radius
+    return numpy.array(numpy.nonzero(numpy.triu(close, 1))).T
+
+
+class CellListTests(unittest.TestCase):
+    """Compare the CellList with a brute force search."""
+
+    def setUp(self):
+        self.coord = 30 * RandomState(1).random_sample((500, 3))
+
+    def test_search_all(self):
+        """Find all pairs of nearby points."""
+        cells = CellList(self.coord, 4.0, block_size=37)
+        for radius in (1.0, 2.5, 4.0):
+            pairs = cells.search_all(radius)
+            self.assertTrue(numpy.array_equal(
+                brute_force_pairs(self.coord, radius), pairs))
+            self.assertTrue((cells.distances(pairs) <= radius).all())
+        self.assertRaises(ValueError, cells.search_all, 4.5)
+
+    def test_search(self):
+        """Find the neighbors of many points at once."""
+        cells = CellList(self.coord, 3.0)
+        centers = 40 * RandomState(2).random_sample((100, 3)) - 5
+        indptr, indices = cells.search(centers)
+        self.assertEqual((101,), indptr.shape)
+        for i, center in enumerate(centers):
+            distances = numpy.sqrt(((self.coord - center) ** 2).sum(axis=1))
+            expected = numpy.flatnonzero(distances <= 3.0)
+            self.assertTrue(numpy.array_equal(
+                expected, indices[indptr[i]:indptr[i + 1]]))
+        # A single center, and one far away
+        indptr, indices = cells.search(centers[0])
+        self.assertEqual(2, len(indptr))
+        indptr, indices = cells.search([[250, 250, 250]])
+        self.assertEqual([0, 0], list(indptr))
+        self.assertEqual(0, len(indices))
+
+    def test_periodic(self):
+        """Use the minimum image in a periodic box."""
+        box = numpy.array([30.0, 30.0, 12.0])
+        # Include points outside the box, which are wrapped into it
+        coord = self.coord + [0, 30, -6]
+        for cutoff in (2.0, 4.0, 6.0):
+            cells = CellList(coord, cutoff, box)
+            self.assertTrue(numpy.array_equal(
+                brute_force_pairs(self.coord, cutoff, box),
+                cells.search_all()))
+        self.assertRaises(ValueError, CellList, coord, 6.5, box)
+        self.assertRaises(ValueError, CellList, coord, 1.0, [1, 2])
+
+    def test_empty(self):
+        """Search with no points."""
+        cells = CellList(numpy.zeros((0, 3)), 2.0)
+        self.assertEqual((0, 2), cells.search_all().shape)
+        indptr, indices = cells.search(self.coord[:5])
+        self.assertEqual([0] * 6, list(indptr))
+
+
+class ContactMapTests(unittest.TestCase):
+    """Residue contacts in a structure."""
+
+    def test_contact_map(self):
+        """Compare with the pairs of atoms in contact."""
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", PDBConstructionWarning)
+            structure = PDBParser().get_structure("1A8O", "PDB/1A8O.pdb")
+        atoms = list(structure.get_atoms())
+        residues, contacts = contact_map(atoms, 4.0)
+        self.assertEqual(list(structure.get_residues()), residues)
+        self.assertFalse(contacts.diagonal().any())
+        self.assertTrue(numpy.array_equal(contacts, contacts.T))
+        coord = numpy.array([atom.coord for atom in atoms])
+        expected = set()
+        for i, j in brute_force_pairs(coord, 4.0):
+            r1 = atoms[i].get_parent()
+            r2 = atoms[j].get_parent()
+            if r1 is not r2:
+                expected.add((residues.index(r1), residues.index(r2)))
+                expected.add((residues.index(r2), residues.index(r1)))
+        self.assertEqual(expected, set(zip(*numpy.nonzero(contacts))))
+        chains, contacts = contact_map(atoms, 4.0, "C")
+        self.assertEqual(1, len(chains))
+        self.assertRaises(PDBException, contact_map, atoms, 4.0, "X")
+
+
+if __name__ == '__main__':
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
@@ -17,6 +17,9 @@ with warnings.catch_warnings():
     warnings.simplefilter('ignore', BiopythonExperimentalWarning)
     from Bio.SearchIO import parse
     from Bio.SearchIO.BlastIO.blast_tab import _LONG_SHORT_MAP as all_fields
+    from Bio.SearchIO.BlastIO.blast_tab import BlastTabParser
+
+from search_tests_common import CheckFilters
 
 # test case files are in the Blast directory
 TEST_DIR = 'Blast'
@@ -956,6 +959,112 @@ class BlastTabCases(unittest.TestCase):
         self.assertEqual(1, counter)
 
 
+class BlastTabRowsCases(unittest.TestCase):
+    """Tests for the lightweight rows from BlastTabParser.parse_rows."""
+
+    def get_rows(self, filename, **kwargs):
+        with open(get_file(filename)) as handle:
+            return list(BlastTabParser(handle, **kwargs).parse_rows())
+
+    def check_rows(self, filename, **kwargs):
+        """Compare the rows with the HSPs of the full parser."""
+        rows = self.get_rows(filename, **kwargs)
+        qresults = list(parse(get_file(filename), FMT, **kwargs))
+        self.assertEqual([qresult.id for qresult in qresults],
+                         [qid for qid, query_rows in rows])
+        for qresult, (qid, query_rows) in zip(qresults, rows):
+            self.assertEqual(len(qresult.hsps), len(query_rows))
+            for hsp, row in zip(qresult.hsps, query_rows):
+                self.assertEqual(hsp.hit_id, row.sseqid)
+                if hasattr(row, 'evalue'):
+                    self.assertEqual(hsp.evalue, row.evalue)
+                    self.assertEqual(hsp.bitscore, row.bitscore)
+                    self.assertEqual(hsp.aln_span, row.length)
+                    self.assertEqual(hsp.query_start, min(row.qstart, row.qend) - 1)
+                    self.assertEqual(hsp.hit_end, max(row.sstart, row.send))
+        return rows
+
+    def test_uncommented(self):
+        "Test parsing rows of an uncommented file (tab_2226_tblastn_004)"
+        rows = self.check_rows('tab_2226_tblastn_004.txt')
+        self.assertEqual(1, len(rows))
+        qid, query_rows = rows[0]
+        self.assertEqual('gi|11464971:4-101', qid)
+        self.assertEqual(9, len(query_rows))
+        row = query_rows[0]
+        self.assertEqual(95.92, row.pident)
+        self.assertEqual(98, row.length)
+        self.assertEqual(1, row.qstart)
+        self.assertEqual(95, row.sstart)
+        self.assertEqual(2e-67, row.evalue)
+        self.assertEqual(199, row.bitscore)
+
+    def test_commented(self):
+        "Test parsing rows of a commented file (tab_2226_tblastn_005)"
+        rows = self.check_rows('tab_2226_tblastn_005.txt', comments=True)
+        self.assertEqual(['random_s00', 'gi|16080617|ref|NP_391444.1|',
+                          'gi|11464971:4-101'], [qid for qid, _ in rows])
+        # the query without hits has no rows
+        self.assertEqual([0, 3, 9], [len(query_rows) for _, query_rows in rows])
+
+    def test_custom_fields(self):
+        "Test parsing rows with custom fields (tab_2226_tblastn_009)"
+        rows = self.check_rows('tab_2226_tblastn_009.txt',
+                               fields='qseqid sseqid')
+        self.assertEqual(2, len(rows))
+        row = rows[0][1][0]
+        self.assertEqual(('qseqid', 'sseqid'), row._fields)
+        self.assertEqual('gi|145479850|ref|XM_001425911.1|', row.sseqid)
+
+    def test_list_fields(self):
+        "Test parsing rows with list columns (tab_2228_tblastn_001)"
+        rows = self.get_rows('tab_2228_tblastn_001.txt', comments=True)
+        self.assertEqual(1, len(rows))
+        row = rows[0][1][0]
+        self.assertTrue(isinstance(row.sallseqid, list))
+        self.assertEqual(row.sallseqid[0],
+                         next(parse(get_file('tab_2228_tblastn_001.txt'), FMT,
+                                    comments=True))[0].id)
+
+
+class BlastTabFilterCases(CheckFilters):
+
+    fmt = 'blast-tab'
+
+    def test_max_hits_evalue(self):
+        "Test parsing blast-tab with max_hits and evalue filters (mirna.tab)"
+        filtered = self.check_filters(get_file('mirna.tab'), comments=True,
+                                      max_hits=5, evalue=1e-10)
+        self.assertEqual([5, 5, 5], [len(qresult) for qresult in filtered])
+
+    def test_max_hsps_bitscore(self):
+        "Test parsing blast-tab with max_hsps_per_hit and bitscore filters (tab_2226_tblastn_004.txt)"
+        self.check_filters(get_file('tab_2226_tblastn_004.txt'),
+                           drop_empty=True, max_hsps_per_hit=1, bitscore=100)
+
+    def test_all_dropped(self):
+        "Test parsing blast-tab with filters dropping every hit (tab_2226_tblastn_005.txt)"
+        filtered = self.check_filters(get_file('tab_2226_tblastn_005.txt'),
+                                      comments=True, evalue=1e-300)
+        self.assertEqual([0, 0, 0], [len(qresult) for qresult in filtered])
+        self.check_filters(get_file('tab_2226_tblastn_001.txt'),
+                           drop_empty=True, evalue=1e-300)
+
+    def test_rows(self):
+        "Test parse_rows with max_hits and evalue filters (mirna.tab)"
+        with open(get_file('mirna.tab')) as handle:
+            parser = BlastTabParser(handle, comments=True, max_hits=5,
+                                    evalue=1e-10)
+            for qid, rows in parser.parse_rows():
+                self.assertEqual(5, len(set(row.sseqid for row in rows)))
+                self.assertTrue(all(row.evalue <= 1e-10 for row in rows))
+
+    def test_invalid(self):
+        "Test parsing blast-tab with an invalid max_hits value"
+        self.assertRaises(ValueError, next,
+                          parse(get_file('mirna.tab'), FMT, max_hits=0))
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
@@ -17,6 +17,9 @@ from Bio import BiopythonExperimentalWarning
 with warnings.catch_warnings():
     warnings.simplefilter('ignore', BiopythonExperimentalWarning)
     from Bio.SearchIO import parse
+    from Bio.SearchIO.BlastIO import BlastXmlParser
+
+from search_tests_common import CheckFilters
 
 # test case files are in the Blast directory
 TEST_DIR = 'Blast'
@@ -3183,6 +3186,55 @@ class BlastXmlSpecialCases(unittest.TestCase):
         self.assertEqual('gi|347972582|ref|XM_309352.4| Anopheles gambiae str. PEST AGAP011294-PA (DEFI_ANOGA) mRNA, complete cds', hit2.description)
 
 
+class BlastXmlStreamingCases(unittest.TestCase):
+
+    def test_finished_queries_discarded(self):
+        "Test parsing BLAST XML keeps only the current query's elements"
+        with open(get_file('wnts.xml'), 'rb') as handle:
+            parser = BlastXmlParser(handle)
+            counter = 0
+            for qresult in parser:
+                counter += 1
+                # the <Iteration> elements are removed as they are parsed
+                self.assertEqual(0, len(parser._iterations_elem))
+        self.assertEqual(5, counter)
+
+    def test_hsp_fields(self):
+        "Test Hsp elements are all parsed from the precompiled table"
+        qresult = next(parse(get_file('xml_2226_blastp_004.xml'), FMT))
+        hsp = qresult[0][0]
+        # values from every kind of table entry are set
+        self.assertEqual(0, hsp.query_start)
+        self.assertEqual(98, hsp.query_end)
+        self.assertEqual(2.24956e-69, hsp.evalue)
+        self.assertEqual(98, hsp.aln_span)
+        self.assertEqual(len(hsp.query), len(hsp.aln_annotation['similarity']))
+
+
+class BlastXmlFilterCases(CheckFilters):
+
+    fmt = FMT
+
+    def test_max_hits_evalue(self):
+        "Test parsing BLAST XML with max_hits and evalue filters (mirna.xml)"
+        filtered = self.check_filters(get_file('mirna.xml'), max_hits=5,
+                                      evalue=1e-10)
+        self.assertEqual([5, 5, 5], [len(qresult) for qresult in filtered])
+
+    def test_max_hsps_bitscore(self):
+        "Test parsing BLAST XML with max_hsps_per_hit and bitscore filters (xml_2212L_tblastx_001.xml)"
+        self.check_filters(get_file('xml_2212L_tblastx_001.xml'),
+                           max_hsps_per_hit=2, bitscore=40)
+        self.check_filters(get_file('xml_2226_blastx_001.xml'), max_hits=2,
+                           max_hsps_per_hit=1)
+
+    def test_all_dropped(self):
+        "Test parsing BLAST XML with filters dropping every hit (xml_2226_blastp_005.xml)"
+        filtered = self.check_filters(get_file('xml_2226_blastp_005.xml'),
+                                      evalue=1e-300)
+        self.assertEqual([0, 0, 0], [len(qresult) for qresult in filtered])
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
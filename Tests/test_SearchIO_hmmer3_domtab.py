@@ -16,6 +16,8 @@ with warnings.catch_warnings():
    warnings.simplefilter('ignore', BiopythonExperimentalWarning)
    from Bio.SearchIO import parse
 
+from search_tests_common import CheckFilters
+
 # test case files are in the Blast directory
 TEST_DIR = 'Hmmer'
 
@@ -646,6 +648,22 @@ class HmmersearchCases(unittest.TestCase):
         self.assertEqual(318, hsp.env_end)
         self.assertEqual(0.95, hsp.acc_avg)
 
+
+class HmmerDomtabFilterCases(CheckFilters):
+
+    fmt = 'hmmscan3-domtab'
+
+    def test_filters(self):
+        "Test parsing hmmer3-domtab with filters (domtab_31b1_hmmscan_001.out)"
+        self.check_filters(get_file('domtab_31b1_hmmscan_001.out'),
+                           drop_empty=True, max_hits=2, max_hsps_per_hit=1)
+        self.check_filters(get_file('domtab_31b1_hmmscan_001.out'),
+                           drop_empty=True, evalue=1e-5)
+        filtered = self.check_filters(get_file('domtab_31b1_hmmscan_001.out'),
+                                      drop_empty=True, bitscore=1000)
+        self.assertEqual([], filtered)
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
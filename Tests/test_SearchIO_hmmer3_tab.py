@@ -18,6 +18,8 @@ with warnings.catch_warnings():
     warnings.simplefilter('ignore', BiopythonExperimentalWarning)
     from Bio.SearchIO import parse
 
+from search_tests_common import CheckFilters
+
 # test case files are in the Blast directory
 TEST_DIR = 'Hmmer'
 FMT = 'hmmer3-tab'
@@ -496,6 +498,21 @@ class HmmsearchCases(unittest.TestCase):
         self.assertEqual(0.0, hsp.bias)
 
 
+class HmmerTabFilterCases(CheckFilters):
+
+    fmt = FMT
+
+    def test_filters(self):
+        "Test parsing hmmer3-tab with filters (tab_31b1_hmmscan_001.out)"
+        filtered = self.check_filters(get_file('tab_31b1_hmmscan_001.out'),
+                                      drop_empty=True, max_hits=2,
+                                      evalue=1e-5)
+        self.assertEqual([1, 2, 1, 2], [len(qresult) for qresult in filtered])
+        filtered = self.check_filters(get_file('tab_31b1_hmmscan_001.out'),
+                                      drop_empty=True, bitscore=1000)
+        self.assertEqual([], filtered)
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
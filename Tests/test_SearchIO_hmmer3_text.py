@@ -18,6 +18,8 @@ with warnings.catch_warnings():
     warnings.simplefilter('ignore', BiopythonExperimentalWarning)
     from Bio.SearchIO import parse
 
+from search_tests_common import CheckFilters
+
 # test case files are in the Blast directory
 TEST_DIR = 'Hmmer'
 FMT = 'hmmer3-text'
@@ -2346,6 +2348,41 @@ class PhmmerCases(unittest.TestCase):
                 hsp.aln_annotation['PP'])
 
 
+class HmmerTextFilterCases(CheckFilters):
+
+    fmt = FMT
+
+    def test_max_hits_evalue(self):
+        "Test parsing hmmer3-text with max_hits and evalue filters (text_30_hmmscan_010.out)"
+        filtered = self.check_filters(get_file('text_30_hmmscan_010.out'),
+                                      max_hits=3, evalue=1e-5)
+        self.assertEqual([3, 3, 3], [len(qresult) for qresult in filtered])
+
+    def test_max_hsps_bitscore(self):
+        "Test parsing hmmer3-text with max_hsps_per_hit and bitscore filters (text_31b2_hmmscan_001.out)"
+        filtered = self.check_filters(get_file('text_31b2_hmmscan_001.out'),
+                                      max_hsps_per_hit=1, bitscore=20)
+        # the alignments of the HSPs kept are still parsed
+        for hit in filtered[0]:
+            for hsp in hit.hsps:
+                self.assertEqual(len(hsp.query), len(hsp.hit))
+
+    def test_all_dropped(self):
+        "Test parsing hmmer3-text with filters dropping every hit (text_30_hmmscan_001.out)"
+        filtered = self.check_filters(get_file('text_30_hmmscan_001.out'),
+                                      bitscore=1000)
+        self.assertEqual([0] * 5, [len(qresult) for qresult in filtered])
+
+    def test_hits_without_domains(self):
+        "Test parsing hmmer3-text with filters keeping hits without domains (text_30_hmmscan_010.out)"
+        for evalue in (1e300, 1e-300):
+            filtered = self.check_filters(get_file('text_30_hmmscan_010.out'),
+                                          evalue=evalue)
+            self.assertEqual('NRPS-COM_Cterm', filtered[0][-1].id)
+            self.assertEqual(0, len(filtered[0][-1]))
+            self.assertEqual('NRPS-COM_Cterm', filtered[1][-1].id)
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
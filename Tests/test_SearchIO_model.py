@@ -12,6 +12,7 @@ to all formats.
 """
 
 import unittest
+import weakref
 from copy import deepcopy
 
 from search_tests_common import compare_search_obj
@@ -1336,6 +1337,47 @@ class HSPFragmentCases(unittest.TestCase):
         self.assertRaises(TypeError, HSPFragment, 'hit_id', 'query_id',
                 wrong_hit, wrong_query)
 
+    def test_lazy_seqs(self):
+        """Test HSPFragment sequences are only made into SeqRecords when used"""
+        # the strings are kept until the sequences are accessed
+        self.assertEqual('ATGCTAGCTACA', self.fragment._hit)
+        self.assertEqual(12, self.fragment.aln_span)
+        self.assertTrue('ATG--AGCTAGG' in str(self.fragment))
+        # changes made before then are picked up by the SeqRecords
+        self.fragment.hit_id = 'new_hit_id'
+        self.fragment.query_description = 'new description'
+        self.fragment.alphabet = generic_dna
+        self.assertEqual('ATGCTAGCTACA', self.fragment._hit)
+        self.assertEqual('new_hit_id', self.fragment.hit.id)
+        self.assertEqual('new description', self.fragment.query.description)
+        self.assertEqual(generic_dna, self.fragment.query.seq.alphabet)
+        self.assertTrue(isinstance(self.fragment._hit, SeqRecord))
+        # and later changes are made to the SeqRecords directly
+        self.fragment.hit_description = 'hit description'
+        self.assertEqual('hit description', self.fragment.hit.description)
+
+    def test_lazy_aln(self):
+        """Test HSPFragment.aln made from sequences kept as strings"""
+        aln = self.fragment.aln
+        self.assertTrue(isinstance(aln, MultipleSeqAlignment))
+        self.assertEqual('ATG--AGCTAGG', str(aln[0].seq))
+        self.assertEqual('ATGCTAGCTACA', str(aln[1].seq))
+
+    def test_slots(self):
+        """Test HSPFragment keeps its standard attributes in slots"""
+        self.assertFalse(self.fragment.__dict__)
+        self.fragment.query_start = 0
+        self.fragment.query_end = 12
+        self.assertFalse(self.fragment.__dict__)
+        # other attributes may still be added
+        self.fragment.custom = 1
+        self.assertEqual({'custom': 1}, self.fragment.__dict__)
+
+    def test_weakref(self):
+        """Test the model objects can be weakly referenced"""
+        for obj in (self.fragment, hsp111, hit11, QueryResult([hit11])):
+            self.assertTrue(weakref.ref(obj)() is obj)
+
     def test_seqmodel(self):
         """Test HSPFragment sequence attribute types and default values"""
         # check hit
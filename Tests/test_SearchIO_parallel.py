@@ -0,0 +1,91 @@
+# Copyright 2016 by Biopython contributors.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Tests for parsing search output files with several worker processes."""
+
+import pickle
+import unittest
+import warnings
+
+from Bio import BiopythonExperimentalWarning
+
+with warnings.catch_warnings():
+    warnings.simplefilter('ignore', BiopythonExperimentalWarning)
+    from Bio import SearchIO
+
+from search_tests_common import compare_search_obj
+
+
+class ParallelParseCases(unittest.TestCase):
+    """Compare SearchIO.parse with several workers to a single process."""
+
+    def check_parallel(self, filename, fmt, **kwargs):
+        expected = list(SearchIO.parse(filename, fmt, **kwargs))
+        qresults = list(SearchIO.parse(filename, fmt, workers=2, **kwargs))
+        self.assertEqual(len(expected), len(qresults))
+        for qres1, qres2 in zip(expected, qresults):
+            self.assertTrue(compare_search_obj(qres1, qres2))
+        # Unordered, all the queries are still returned once
+        qresults = SearchIO.parse(filename, fmt, workers=3, ordered=False,
+                                  **kwargs)
+        self.assertEqual(sorted(qres.id for qres in expected),
+                         sorted(qres.id for qres in qresults))
+
+    def test_blast_tab(self):
+        """Test parallel parsing of blast-tab (tab_2226_tblastn_001.txt)"""
+        self.check_parallel('Blast/tab_2226_tblastn_001.txt', 'blast-tab')
+
+    def test_blast_tab_comments(self):
+        """Test parallel parsing of blast-tab with comments (mirna.tab)"""
+        self.check_parallel('Blast/mirna.tab', 'blast-tab', comments=True)
+
+    def test_blast_xml(self):
+        """Test parallel parsing of blast-xml (wnts.xml)"""
+        self.check_parallel('Blast/wnts.xml', 'blast-xml')
+
+    def test_blat_psl(self):
+        """Test parallel parsing of blat-psl (psl_34_001.psl)"""
+        self.check_parallel('Blat/psl_34_001.psl', 'blat-psl')
+
+    def test_exonerate_vulgar(self):
+        """Test parallel parsing of exonerate-vulgar (exn_22_o_vulgar.exn)"""
+        self.check_parallel('Exonerate/exn_22_o_vulgar.exn', 'exonerate-vulgar')
+
+    def test_fasta_m10(self):
+        """Test parallel parsing of fasta-m10 (output002.m10)"""
+        self.check_parallel('Fasta/output002.m10', 'fasta-m10')
+
+    def test_hmmer3_text(self):
+        """Test parallel parsing of hmmer3-text (text_30_hmmscan_001.out)"""
+        self.check_parallel('Hmmer/text_30_hmmscan_001.out', 'hmmer3-text')
+
+    def test_hmmer3_tab(self):
+        """Test parallel parsing of hmmer3-tab (tab_30_hmmscan_001.out)"""
+        self.check_parallel('Hmmer/tab_30_hmmscan_001.out', 'hmmer3-tab')
+
+    def test_pickle(self):
+        """Test pickling of QueryResult objects with every protocol"""
+        qresult = next(SearchIO.parse('Blast/wnts.xml', 'blast-xml'))
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            copy = pickle.loads(pickle.dumps(qresult, protocol))
+            self.assertTrue(compare_search_obj(qresult, copy),
+                            "Mismatch with protocol %i" % protocol)
+
+    def test_errors(self):
+        """Test invalid use of parallel parsing"""
+        with open('Blast/mirna.tab') as handle:
+            self.assertRaises(TypeError, list,
+                              SearchIO.parse(handle, 'blast-tab', workers=2))
+        self.assertRaises(ValueError, list,
+                          SearchIO.parse('Blast/mirna.tab', 'blast-tab',
+                                         workers=0))
+        self.assertRaises(ValueError, list,
+                          SearchIO.parse('Blast/text_2226_blastn_001.txt',
+                                         'blast-text', workers=2))
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
@@ -6,11 +6,12 @@
 
 from __future__ import print_function
 
+import io
 import unittest
 from Bio._py3k import StringIO
 
 from Bio import SeqIO
-from Bio.SeqIO.FastaIO import FastaIterator
+from Bio.SeqIO.FastaIO import FastaIterator, SimpleFastaParser
 from Bio.Alphabet import generic_protein, generic_nucleotide, generic_dna
 
 
@@ -120,6 +121,49 @@ class TitleFunctions(unittest.TestCase):
         self.assertEqual("", record.description)
 
 
+class BlockParser(unittest.TestCase):
+    """Compare the block based and line based SimpleFastaParser."""
+
+    def check_modes(self, handle_factory):
+        expected = list(SimpleFastaParser(handle_factory(), block_size=None))
+        for block_size in (1, 2, 3, 7, 64, 65536):
+            self.assertEqual(expected,
+                             list(SimpleFastaParser(handle_factory(),
+                                                    block_size=block_size)),
+                             "Mismatch with block_size=%i" % block_size)
+        return expected
+
+    def test_files(self):
+        """Check block parser on the FASTA test files."""
+        for filename in single_nucleic_files + multi_dna_files + \
+                single_amino_files + multi_amino_files + \
+                ["Fasta/dups.fasta", "Fasta/output001.m10"]:
+            with open(filename) as handle:
+                data = handle.read()
+            self.check_modes(lambda: StringIO(data))
+
+    def test_edge_cases(self):
+        """Check block parser on awkward white space and boundaries."""
+        self.assertEqual([], self.check_modes(lambda: StringIO("")))
+        self.assertEqual([], self.check_modes(lambda: StringIO("no records\n")))
+        self.assertEqual([("", "")], self.check_modes(lambda: StringIO(">")))
+        self.assertEqual([("a>b", "AC>GT"), ("c", "")],
+                         self.check_modes(lambda: StringIO(
+                             "#comment >\n>a>b \nAC>\nG T\r\n\n>c")))
+        self.assertEqual([("x", "AC\tGT")],
+                         self.check_modes(lambda: StringIO(">x\nAC\tGT\t\n")))
+
+    def test_other_white_space(self):
+        """Check block parser on other trailing white space characters."""
+        # What rstrip() removes depends on the Python version and on bytes
+        # versus unicode, so just compare to the line based parser. Use a
+        # unicode handle, as the Python 2 cStringIO only takes ASCII text.
+        for char in u"\x0b\x0c\x1c\x1d\x1e\x1f\x85\xa0\u2000\u3000":
+            data = u">x%s\nAC%s\nG%sT\n>y\nA%s" % (char, char, char, char)
+            expected = self.check_modes(lambda: io.StringIO(data))
+            self.assertEqual([u"x", u"y"], [title[:1] for title, seq in expected])
+
+
 single_nucleic_files = ['Fasta/lupine.nu', 'Fasta/elderberry.nu',
                         'Fasta/phlox.nu', 'Fasta/centaurea.nu',
                         'Fasta/wisteria.nu', 'Fasta/sweetpea.nu',
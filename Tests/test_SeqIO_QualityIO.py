@@ -453,6 +453,52 @@ class TestReadWrite(unittest.TestCase):
         self.assertEqual(data, handle.getvalue())
 
 
+class TestBlockParser(unittest.TestCase):
+    """Compare the block based and line based FASTQ parsers."""
+
+    def parse_all(self, data, block_size):
+        """Return list of tuples, ending with any ValueError message."""
+        answer = []
+        try:
+            for values in QualityIO.FastqGeneralIterator(StringIO(data),
+                                                         block_size):
+                answer.append(values)
+        except ValueError as err:
+            answer.append(str(err))
+        return answer
+
+    def test_files(self):
+        """Check block parser matches line parser on all FASTQ test files"""
+        for filename in os.listdir("Quality"):
+            if not filename.endswith(".fastq"):
+                continue
+            with open(os.path.join("Quality", filename),
+                      _universal_read_mode) as handle:
+                data = handle.read()
+            expected = self.parse_all(data, None)
+            for block_size in (1, 5, 64, 65536):
+                self.assertEqual(expected, self.parse_all(data, block_size),
+                                 "%s with block_size=%i"
+                                 % (filename, block_size))
+
+    def test_quality_array(self):
+        """Check qualities can be loaded as a compact array"""
+        from array import array
+        for format in ["fastq", "fastq-solexa", "fastq-illumina"]:
+            iterator = SeqIO._FormatToIterator[format]
+            with open("Quality/illumina_faked.fastq") as handle:
+                records = list(iterator(handle))
+            with open("Quality/illumina_faked.fastq") as handle:
+                arrays = list(iterator(handle, quality_array=True))
+            self.assertEqual(len(records), len(arrays))
+            for old, new in zip(records, arrays):
+                key = list(old.letter_annotations)[0]
+                self.assertTrue(isinstance(new.letter_annotations[key], array))
+                self.assertEqual(old.letter_annotations[key],
+                                 new.letter_annotations[key].tolist())
+                self.assertEqual(old.format(format), new.format(format))
+
+
 class TestWriteRead(unittest.TestCase):
     """Test can write and read back files."""
     def test_generated(self):
@@ -0,0 +1,88 @@
+# Copyright 2016 by Biopython contributors.  All rights reserved.
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Unit tests for Bio.SeqIO.parse_batches (columnar record batches)."""
+
+import unittest
+from array import array
+
+from Bio._py3k import StringIO
+
+from Bio import SeqIO
+
+
+class BatchTests(unittest.TestCase):
+    """Compare batches with the SeqRecord objects from SeqIO.parse."""
+
+    def check(self, filename, format, batch_size=3):
+        records = list(SeqIO.parse(filename, format))
+        batches = list(SeqIO.parse_batches(filename, format, batch_size))
+        self.assertEqual(len(records),
+                         sum(len(batch) for batch in batches))
+        for batch in batches[:-1]:
+            self.assertEqual(batch_size, len(batch))
+        ids = [i for batch in batches for i in batch.ids]
+        seqs = [s for batch in batches for s in batch.seqs]
+        self.assertEqual([r.id for r in records], ids)
+        self.assertEqual([str(r.seq) for r in records], seqs)
+        if format.startswith("fastq"):
+            key = list(records[0].letter_annotations)[0]
+            self.assertEqual(key, batches[0].quality_key)
+            for batch in batches:
+                self.assertTrue(isinstance(batch.qualities, array))
+                self.assertEqual(len(batch.qualities),
+                                 sum(len(s) for s in batch.seqs))
+            quals = [list(batch.quality(i)) for batch in batches
+                     for i in range(len(batch))]
+            self.assertEqual([r.letter_annotations[key] for r in records],
+                             quals)
+        else:
+            for batch in batches:
+                self.assertEqual(None, batch.qualities)
+                self.assertRaises(ValueError, batch.quality, 0)
+        # Check can get back SeqRecord objects too
+        old = records[-1]
+        new = batches[-1].record(-1)
+        self.assertEqual(old.id, new.id)
+        self.assertEqual(old.description, new.description)
+        self.assertEqual(str(old.seq), str(new.seq))
+        self.assertEqual(old.letter_annotations, new.letter_annotations)
+
+    def test_fasta(self):
+        """Batches from FASTA files."""
+        self.check("Fasta/f002", "fasta", 2)
+        self.check("Quality/example.fasta", "fasta")
+
+    def test_fastq(self):
+        """Batches from FASTQ files."""
+        self.check("Quality/example.fastq", "fastq")
+        self.check("Quality/tricky.fastq", "fastq-sanger", 1)
+        self.check("Quality/solexa_faked.fastq", "fastq-solexa")
+        self.check("Quality/illumina_faked.fastq", "fastq-illumina")
+
+    def test_tab(self):
+        """Batches from tab separated files."""
+        self.check("GenBank/NC_005816.tsv", "tab", 4)
+
+    def test_bad_quality(self):
+        """Reject invalid quality characters."""
+        batches = SeqIO.parse_batches("Quality/solexa_faked.fastq",
+                                      "fastq-illumina")
+        self.assertRaises(ValueError, next, batches)
+
+    def test_bad_arguments(self):
+        """Reject unsupported formats and batch sizes."""
+        handle = StringIO(">X\nACGT\n")
+        self.assertRaises(ValueError, next,
+                          SeqIO.parse_batches(handle, "genbank"))
+        self.assertRaises(ValueError, next,
+                          SeqIO.parse_batches(handle, "FASTA"))
+        self.assertRaises(ValueError, next,
+                          SeqIO.parse_batches(handle, "fasta", 0))
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
@@ -13,10 +13,12 @@ except ImportError:
     sqlite3 = None
 
 import sys
+import gc
 import os
 import unittest
 import tempfile
 import gzip
+import struct
 import warnings
 from io import BytesIO
 
@@ -32,6 +34,7 @@ except NameError:
 
 from Bio.SeqRecord import SeqRecord
 from Bio import SeqIO
+from Bio import bgzf
 from Bio.SeqIO._index import _FormatToRandomAccess
 from Bio.Alphabet import generic_protein, generic_nucleotide, generic_dna
 
@@ -292,6 +295,46 @@ if sqlite3:
                         os.path.abspath("Roche/paired.sff")],
                        expt_sff_files)
 
+    class ParallelIndexTest(unittest.TestCase):
+        """Check building an index with several worker processes."""
+
+        files = ["Roche/E3MFGYR02_no_manifest.sff",
+                 "Roche/greek.sff",
+                 "Roche/paired.sff",
+                 "Quality/example.fastq"]
+
+        def rows(self, d):
+            return sorted(d._con.execute("SELECT * FROM offset_data;"))
+
+        def test_workers(self):
+            """Index several files in parallel."""
+            files = self.files[:3]
+            d = SeqIO.index_db(":memory:", files, "sff")
+            expected = self.rows(d)
+            d.close()
+            d = SeqIO.index_db(":memory:", files, "sff", workers=2)
+            self.assertEqual(expected, self.rows(d))
+            self.assertEqual(len(expected), len(d))
+            self.assertEqual(395, len(d["alpha"]))
+            d.close()
+
+        def test_key_function(self):
+            """Index in parallel with a key function (called in parent)."""
+            d = SeqIO.index_db(":memory:", self.files[3], "fastq", workers=3,
+                               key_function=lambda name: name.lower())
+            self.assertEqual(["eas54_6_r1_2_1_413_324",
+                              "eas54_6_r1_2_1_443_348",
+                              "eas54_6_r1_2_1_540_792"], sorted(d))
+            d.close()
+
+        def test_errors(self):
+            """Check errors when indexing in parallel."""
+            self.assertRaises(ValueError, SeqIO.index_db, ":memory:",
+                              ["Fasta/dups.fasta", "Fasta/f002"], "fasta",
+                              workers=2)
+            self.assertRaises(ValueError, SeqIO.index_db, ":memory:",
+                              self.files[:2], "sff", workers=0)
+
 
 class IndexDictTests(unittest.TestCase):
     """Cunning unit test where methods are added at run time."""
@@ -319,6 +362,16 @@ class IndexDictTests(unittest.TestCase):
         rec_dict.close()
         del rec_dict
 
+        rec_dict = SeqIO.index(filename, format, alphabet, backend="compact")
+        self.check_dict_methods(rec_dict, id_list, id_list)
+        rec_dict.close()
+        del rec_dict
+
+        rec_dict = SeqIO.index(filename, format, alphabet, use_mmap=True)
+        self.check_dict_methods(rec_dict, id_list, id_list)
+        rec_dict.close()
+        del rec_dict
+
         if not sqlite3:
             return
 
@@ -386,6 +439,12 @@ class IndexDictTests(unittest.TestCase):
         rec_dict.close()
         del rec_dict
 
+        rec_dict = SeqIO.index(filename, format, alphabet, add_prefix,
+                               backend="compact")
+        self.check_dict_methods(rec_dict, key_list, id_list)
+        rec_dict.close()
+        del rec_dict
+
         if not sqlite3:
             return
 
@@ -553,6 +612,29 @@ class IndexDictTests(unittest.TestCase):
             else:
                 rec2 = SeqIO.read(handle, format, alphabet)
             self.assertEqual(True, compare_record(rec1, rec2))
+
+        # The compact backend should give the same raw records
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', BiopythonParserWarning)
+            compact_dict = SeqIO.index(filename, format, alphabet,
+                                       key_function=lambda x: x.lower(),
+                                       backend="compact")
+        for key in id_list:
+            self.assertEqual(rec_dict.get_raw(key),
+                             compact_dict.get_raw(key))
+        self.assertRaises(KeyError, compact_dict.get_raw, "missing")
+        compact_dict.close()
+
+        # As should memory mapping the file
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', BiopythonParserWarning)
+            mmap_dict = SeqIO.index(filename, format, alphabet,
+                                    key_function=lambda x: x.lower(),
+                                    use_mmap=True)
+        self.assertEqual(sorted(rec_dict), sorted(mmap_dict))
+        for key in id_list:
+            self.assertEqual(rec_dict.get_raw(key), mmap_dict.get_raw(key))
+        mmap_dict.close()
         rec_dict.close()
         del rec_dict
 
@@ -565,6 +647,21 @@ class IndexDictTests(unittest.TestCase):
     def test_duplicates_index(self):
         """Index file with duplicate identifers with Bio.SeqIO.index()"""
         self.assertRaises(ValueError, SeqIO.index, "Fasta/dups.fasta", "fasta")
+        self.assertRaises(ValueError, SeqIO.index, "Fasta/dups.fasta", "fasta",
+                          backend="compact")
+
+    def test_compact_backend(self):
+        """Check the compact backend with non-string keys and bad names."""
+        self.assertRaises(ValueError, SeqIO.index, "Fasta/f002", "fasta",
+                          key_function=len, backend="compact")
+        self.assertRaises(ValueError, SeqIO.index, "Fasta/f002", "fasta",
+                          backend="tree")
+        rec_dict = SeqIO.index("Fasta/f002", "fasta", backend="compact")
+        self.assertEqual(3, len(rec_dict))
+        self.assertFalse(None in rec_dict)
+        self.assertFalse(("a", "b") in rec_dict)
+        self.assertRaises(KeyError, rec_dict.__getitem__, "missing")
+        rec_dict.close()
 
     def test_duplicates_to_dict(self):
         """Index file with duplicate identifers with Bio.SeqIO.to_dict()"""
@@ -663,6 +760,130 @@ for filename, format, alphabet in tests:
                 funct(filename, format, alphabet, comp))
         del funct
 
+class FaidxTests(unittest.TestCase):
+    """Check FASTA sub-sequence access via a samtools style .fai index."""
+
+    def setUp(self):
+        h, self.temp = tempfile.mkstemp(".fasta")
+        os.close(h)
+
+    def tearDown(self):
+        for ext in ("", ".fai", ".gzi"):
+            if os.path.isfile(self.temp + ext):
+                os.remove(self.temp + ext)
+
+    def check_fetch(self, faidx, filename):
+        records = list(SeqIO.parse(filename, "fasta"))
+        self.assertEqual([r.id for r in records], faidx.keys())
+        for record in records:
+            seq = str(record.seq)
+            self.assertTrue(record.id in faidx)
+            self.assertEqual(len(seq), faidx.length(record.id))
+            self.assertEqual(seq, str(faidx.fetch(record.id)))
+            for start, end in [(0, 1), (0, 70), (69, 71), (70, 140),
+                               (139, 211), (5, -5), (-1, None), (None, 3),
+                               (100, 50), (10, 10000)]:
+                self.assertEqual(seq[start:end],
+                                 str(faidx.fetch(record.id, start, end)))
+        for name, offset, length in faidx:
+            self.assertEqual(str(faidx.get(offset).seq),
+                             str(faidx.fetch(name)))
+            raw = faidx.get_raw(offset)
+            self.assertEqual(length, len(raw))
+            self.assertEqual(str(faidx.fetch(name)),
+                             _bytes_to_string(raw).replace("\r", "").replace("\n", ""))
+        self.assertRaises(KeyError, faidx.fetch, "missing")
+
+    def test_fetch(self):
+        """Fetch regions from FASTA files."""
+        for filename in ["GenBank/NC_005816.ffn", "GenBank/NC_005816.fna",
+                         "GenBank/NC_005816.faa"]:
+            faidx = SeqIO.index_faidx(filename, use_mmap=True)
+            self.check_fetch(faidx, filename)
+            faidx.close()
+
+    def test_fai(self):
+        """Write and reload the .fai file."""
+        with open("GenBank/NC_005816.ffn", "rb") as handle:
+            data = handle.read()
+        with open(self.temp, "wb") as handle:
+            handle.write(data.replace(_as_bytes("\n"), _as_bytes("\r\n")))
+        faidx = SeqIO.index_faidx(self.temp)
+        faidx.write_fai()
+        faidx.close()
+        with open(self.temp + ".fai") as handle:
+            lines = handle.readlines()
+        self.assertEqual(10, len(lines))
+        # Header is 93 bytes (with CR LF), 70 bases plus two byte new lines
+        self.assertEqual("ref|NC_005816.1|:87-1109\t1023\t93\t70\t72\n",
+                         lines[0])
+        faidx = SeqIO.index_faidx(self.temp)
+        self.check_fetch(faidx, self.temp)
+        faidx.close()
+
+    def test_bgzf(self):
+        """Fetch regions from a BGZF compressed FASTA file."""
+        with open("GenBank/NC_005816.ffn", "rb") as handle:
+            data = handle.read()
+        handle = bgzf.BgzfWriter(self.temp, "wb")
+        for i in range(0, len(data), 1000):
+            # Force lots of small blocks
+            handle.write(data[i:i + 1000])
+            handle.flush()
+        handle.close()
+        faidx = SeqIO.index_faidx(self.temp)
+        self.assertEqual(len(data) // 1000 + 1, len(faidx._blocks[0]))
+        self.check_fetch(faidx, "GenBank/NC_005816.ffn")
+        starts, raw_starts = faidx._blocks
+        faidx.close()
+        # Now with a samtools style .gzi file
+        with open(self.temp + ".gzi", "wb") as handle:
+            handle.write(struct.pack("<Q", len(starts) - 1))
+            for start, raw_start in zip(starts[1:], raw_starts[1:]):
+                handle.write(struct.pack("<QQ", raw_start, start))
+        faidx = SeqIO.index_faidx(self.temp)
+        self.assertEqual((starts, raw_starts), faidx._blocks)
+        self.check_fetch(faidx, "GenBank/NC_005816.ffn")
+        faidx.close()
+
+    def test_bad_lines(self):
+        """Reject FASTA files with varying line lengths."""
+        for data in [">a\nACGT\nAC\nACGT\n",
+                     ">a\nACGT\nACGTA\n",
+                     ">a\nACGT\nACGTA",
+                     ">a\nACGT\n\nACGT\n",
+                     "ACGT\n>a\nACGT\n"]:
+            with open(self.temp, "w") as handle:
+                handle.write(data)
+            self.assertRaises(ValueError, SeqIO.index_faidx, self.temp)
+        with open(self.temp, "w") as handle:
+            handle.write(">a\nACGT\nAC\n\n>b desc\n\n>a\nA\n")
+        self.assertRaises(ValueError, SeqIO.index_faidx, self.temp)
+
+    def test_no_final_new_line(self):
+        """Accept a FASTA file without a new line at the end."""
+        for data in [">a\nACGT\nAC", ">a\nACGT\nACGT", ">b\nAC\n>a\nACGT\nACGT",
+                     ">a\r\nACGT\r\nAC"]:
+            with open(self.temp, "wb") as handle:
+                handle.write(_as_bytes(data))
+            faidx = SeqIO.index_faidx(self.temp)
+            self.check_fetch(faidx, self.temp)
+            faidx.close()
+
+    def test_close_on_error(self):
+        """Close the FASTA file if the index can't be built."""
+        with open(self.temp, "w") as handle:
+            handle.write(">a\nACGT\nACGTA\n")
+        # Clean up after any earlier tests first
+        gc.collect()
+        with warnings.catch_warnings(record=True) as caught:
+            # Python 3 warns about files left open
+            warnings.simplefilter("always")
+            self.assertRaises(ValueError, SeqIO.index_faidx, self.temp)
+            gc.collect()
+        self.assertEqual([], [str(w.message) for w in caught])
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
@@ -10,7 +10,10 @@ See also the doctests in bgzf.py which are called via run_tests.py
 
 import unittest
 import gzip
+import gc
 import os
+import threading
+import warnings
 from random import shuffle
 
 from Bio._py3k import _as_bytes, _as_string
@@ -417,6 +420,171 @@ class BgzfTests(unittest.TestCase):
         h.close()
 
 
+class BgzfCacheTests(unittest.TestCase):
+    """Check the BgzfReader block cache and read ahead."""
+
+    filename = "SamBam/ex1.bam"
+
+    def block_starts(self):
+        """Return the raw start offsets of the BGZF blocks."""
+        starts = []
+        with open(self.filename, "rb") as handle:
+            while True:
+                start = handle.tell()
+                try:
+                    bgzf._load_bgzf_block(handle)
+                except StopIteration:
+                    break
+                starts.append(start)
+        return starts
+
+    def test_lru(self):
+        """Check the least recently used block is removed from the cache"""
+        starts = self.block_starts()
+        h = bgzf.BgzfReader(self.filename, "rb", max_cache=2)
+        self.assertEqual(0, h.cache_hits)
+        self.assertEqual(1, h.cache_misses)  # loads first block
+        for start in (starts[1], starts[0], starts[2], starts[0]):
+            h.seek(bgzf.make_virtual_offset(start, 0))
+        # The second block should have been removed, not the first
+        self.assertEqual([starts[2], starts[0]], list(h._buffers))
+        self.assertEqual(2, h.cache_hits)
+        self.assertEqual(3, h.cache_misses)
+        h.seek(bgzf.make_virtual_offset(starts[1], 0))
+        self.assertEqual(4, h.cache_misses)
+        h.close()
+
+    def test_max_cache_bytes(self):
+        """Check the cache size can be limited in bytes"""
+        with gzip.open(self.filename) as handle:
+            old = handle.read()
+        h = bgzf.BgzfReader(self.filename, "rb", max_cache_bytes=150000)
+        self.assertEqual(old, h.read(len(old) + 1))
+        # Full blocks are 65536 bytes, so only two fit in the cache
+        # (plus the empty EOF marker block)
+        self.assertTrue(len([b for b, l in h._buffers.values() if b]) <= 2)
+        self.assertTrue(0 < h._cache_bytes <= 150000)
+        self.assertEqual(h._cache_bytes,
+                         sum(len(b) for b, l in h._buffers.values()))
+        h.close()
+        self.assertRaises(ValueError, bgzf.BgzfReader, self.filename, "rb",
+                          max_cache_bytes=0)
+
+    def test_read_ahead(self):
+        """Check sequential read ahead loads following blocks"""
+        with gzip.open(self.filename) as handle:
+            old = handle.read()
+        starts = self.block_starts()
+        for read_ahead in (0, 1, 3, 20):
+            h = bgzf.BgzfReader(self.filename, "rb", read_ahead=read_ahead)
+            self.assertEqual(old, h.read(len(old) + 1))
+            # Each block (including the empty EOF block) is loaded once
+            self.assertEqual(len(starts), h.cache_hits + h.cache_misses)
+            self.assertEqual(-(-len(starts) // (read_ahead + 1)),
+                             h.cache_misses)
+            h.close()
+        # Random access should not trigger read ahead
+        h = bgzf.BgzfReader(self.filename, "rb", read_ahead=3)
+        h.seek(bgzf.make_virtual_offset(starts[-1], 0))
+        self.assertEqual(2, h.cache_misses)
+        self.assertEqual(5, len(h._buffers))
+        h.seek(bgzf.make_virtual_offset(starts[-3], 0))
+        self.assertEqual(3, h.cache_misses)
+        self.assertEqual(6, len(h._buffers))
+        h.close()
+
+
+class BgzfThreadTests(unittest.TestCase):
+    """Check BGZF compression and decompression using threads."""
+
+    def setUp(self):
+        self.temp_file = "temp.bgzf"
+        if os.path.isfile(self.temp_file):
+            os.remove(self.temp_file)
+
+    def tearDown(self):
+        if os.path.isfile(self.temp_file):
+            os.remove(self.temp_file)
+
+    def test_write(self):
+        """Check threaded writing matches single threaded output"""
+        with gzip.open("SamBam/ex1.bam") as handle:
+            data = handle.read()
+        offsets = {}
+        for threads in (1, 3):
+            h = bgzf.open(self.temp_file, "wb", threads=threads)
+            offsets[threads] = []
+            for i in range(0, len(data), 20000):
+                offsets[threads].append(h.tell())
+                h.write(data[i:i + 20000])
+            h.close()
+            with open(self.temp_file, "rb") as handle:
+                raw = handle.read()
+            if threads == 1:
+                expected = raw
+            else:
+                self.assertEqual(expected, raw)
+        self.assertEqual(offsets[1], offsets[3])
+        with gzip.open(self.temp_file) as handle:
+            self.assertEqual(data, handle.read())
+        # The existing file is left alone
+        self.assertRaises(ValueError, bgzf.BgzfWriter, self.temp_file,
+                          threads=0)
+        with open(self.temp_file, "rb") as handle:
+            self.assertEqual(raw, handle.read())
+
+    def test_read(self):
+        """Check threaded reading matches single threaded reading"""
+        with gzip.open("SamBam/ex1.bam") as handle:
+            data = handle.read()
+        h = bgzf.open("SamBam/ex1.bam", "rb", threads=4)
+        self.assertEqual(3, h.read_ahead)
+        self.assertEqual(data[:100000], h.read(100000))
+        offset = h.tell()
+        self.assertEqual(data[100000:], h.read(len(data)))
+        self.assertEqual(b"", h.read(1))
+        h.seek(offset)
+        self.assertEqual(data[100000:100010], h.read(10))
+        h.close()
+        # Text mode
+        h = bgzf.BgzfReader("SamBam/ex1.bam", "r", threads=2)
+        self.assertEqual(_as_string(data[:70000]), h.read(70000))
+        h.close()
+
+    def test_failed_open(self):
+        """Check no threads are left behind when opening for reading fails"""
+        # Clean up after any earlier tests first
+        gc.collect()
+        before = threading.active_count()
+        with warnings.catch_warnings(record=True) as caught:
+            # Recent versions of Python warn about pools left running
+            warnings.simplefilter("always")
+            self.assertRaises(ValueError, bgzf.BgzfReader, "SamBam/ex1.bam",
+                              "w", threads=3)
+            self.assertRaises(IOError, bgzf.BgzfReader, "SamBam/missing.bam",
+                              threads=3)
+            # Not a BGZF file, so loading the first block fails
+            self.assertRaises(ValueError, bgzf.BgzfReader, "Fasta/f002",
+                              threads=3)
+            self.assertRaises(ValueError, bgzf.BgzfReader, "SamBam/ex1.bam",
+                              threads=0)
+            gc.collect()
+        self.assertEqual(before, threading.active_count())
+        self.assertEqual([], [str(w.message) for w in caught])
+
+    def test_close(self):
+        """Check closing stops the threads"""
+        gc.collect()
+        before = threading.active_count()
+        h = bgzf.BgzfReader("SamBam/ex1.bam", threads=3)
+        h.read(1000)
+        h.close()
+        h = bgzf.BgzfWriter(self.temp_file, threads=3)
+        h.write(b"ACGT" * 50000)
+        h.close()
+        self.assertEqual(before, threading.active_count())
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
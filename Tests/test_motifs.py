@@ -1688,6 +1688,43 @@ class MotifTestPWM(unittest.TestCase):
         self.assertAlmostEqual(result[5], -25.18009186, places=5)
         self.assertTrue(math.isnan(result[6]), "Expected nan, not %r" % result[6])
 
+    def test_search(self):
+        """Test PSSM search on both strands compared to calculate."""
+        pssm = self.m.counts.normalize(pseudocounts=0.25).log_odds()
+        rc = pssm.reverse_complement()
+        seq = Seq("ACGTGTGCGTAGTGCGTNCCATATAAGGTCCATATAAGGN", self.m.alphabet)
+        n = len(seq)
+        for threshold in (-100.0, -20.0, 0.0, 5.0):
+            expected = []
+            for position in range(n - pssm.length + 1):
+                window = seq[position:position + pssm.length]
+                score = pssm.calculate(window)
+                if score > threshold:
+                    expected.append((position, score))
+                score = rc.calculate(window)
+                if score > threshold:
+                    expected.append((position - n, score))
+            self.assertEqual(expected, list(pssm.search(seq, threshold)))
+            self.assertEqual([hit for hit in expected if hit[0] >= 0],
+                             list(pssm.search(seq, threshold, both=False)))
+        self.assertEqual([], list(pssm.search(seq[:5])))
+        self.assertRaises(ValueError, pssm.search, Seq(str(seq)))
+
+    def test_search_pssms(self):
+        """Test searching with several PSSMs at once."""
+        from Bio.motifs.matrix import search_pssms
+        pssm = self.m.counts.normalize(pseudocounts=0.25).log_odds()
+        pssms = [pssm, pssm.reverse_complement()]
+        seq = Seq("ACGTGTGCGTAGTGCGTNCCATATAAGGTCCATATAAGGN", self.m.alphabet)
+        hits = list(search_pssms(pssms, seq, [-20.0, 0.0]))
+        self.assertEqual([(0, p, s) for p, s in pssm.search(seq, -20.0)] +
+                         [(1, p, s) for p, s in pssms[1].search(seq, 0.0)],
+                         hits)
+        self.assertEqual(list(search_pssms(pssms, seq, -20.0, both=False)),
+                         list(search_pssms(pssms, seq, [-20.0, -20.0], False)))
+        self.assertRaises(ValueError, list,
+                          search_pssms(pssms, seq, [-20.0]))
+
 
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)